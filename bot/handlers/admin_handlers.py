@@ -1,13 +1,11 @@
 from telegram import Update
 from telegram.ext import ContextTypes
-from services.database import FeedbackManager, UserManager, init_mongodb, AnalyticsManager
+from services.database import FeedbackManager, UserManager, AnalyticsManager, db
 from services.content_loader import content_loader
 from services.learning_insights import LearningInsightsManager
 from config.settings import Config
 import logging
 
-# Initialize database connection and load lessons
-db = init_mongodb()
 ADMIN_IDS = Config.ADMIN_IDS
 
 logger = logging.getLogger(__name__)
@@ -45,7 +43,10 @@ async def list_users(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
         await update.message.reply_text("This command is only available to admins.")
         return
 
-    users_list = list(db.users.find())
+    users_list = await db.users.find(
+        {},
+        {"_id": 0, "username": 1, "first_name": 1, "user_id": 1, "current_lesson": 1, "completed_lessons": 1}
+    ).to_list(length=None)
     
     report = "📊 Users Report:\n\n"
     for user in users_list:
@@ -65,7 +66,7 @@ async def analytics_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     try:
         # Get cohort metrics
-        cohort_metrics = AnalyticsManager.calculate_cohort_metrics()
+        cohort_metrics = await AnalyticsManager.get_cohort_metrics()
         
         # Format the analytics report
         report = "📊 Learning Analytics Dashboard\n\n"
@@ -92,6 +93,15 @@ async def analytics_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         report += "\n📚 Current Lesson Distribution:\n"
         for lesson, count in lesson_dist.items():
             report += f"- {lesson}: {count} users\n"
+
+        # Streaks for all users in one batch
+        streaks = await AnalyticsManager.calculate_streak_report()
+        if streaks:
+            report += "\n🔥 Streaks:\n"
+            report += f"- Users on a streak: {streaks.get('users_on_streak', 0)}/{streaks.get('users_with_entries', 0)}\n"
+            report += f"- Average current streak: {streaks.get('average_current_streak', 0)} days\n"
+            for leader in streaks.get('longest_streaks', []):
+                report += f"- {leader['user_id']}: {leader['longest_streak']} days\n"
         
         await update.message.reply_text(report)
         
@@ -112,7 +122,7 @@ async def user_analytics_command(update: Update, context: ContextTypes.DEFAULT_T
             return
             
         user_id = int(context.args[0])
-        metrics = AnalyticsManager.calculate_user_metrics(user_id)
+        metrics = await AnalyticsManager.calculate_user_metrics(user_id)
         
         if not metrics:
             await update.message.reply_text("No data found for this user.")
@@ -160,7 +170,7 @@ async def lesson_analytics_command(update: Update, context: ContextTypes.DEFAULT
             return
             
         lesson_key = context.args[0]
-        analytics = AnalyticsManager.get_lesson_analytics(lesson_key)
+        analytics = await AnalyticsManager.get_lesson_analytics(lesson_key)
         
         if not analytics:
             await update.message.reply_text("No data found for this lesson.")
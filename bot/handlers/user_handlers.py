@@ -2,17 +2,24 @@ from uuid import uuid4
 import re
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ForceReply
 from telegram.ext import ContextTypes, ConversationHandler, CommandHandler, MessageHandler, filters
-from services.database import JournalManager, UserManager, FeedbackManager, db, FeedbackAnalyticsManager, AnalyticsManager
-from services.feedback_enhanced import evaluate_response_enhanced, analyze_response_quality, format_feedback_message
+from services.database import JournalManager, UserManager, FeedbackManager, FeedbackAnalyticsManager, AnalyticsManager
+from services.feedback_enhanced import format_feedback_message, SkillProgressTracker
 from services.progress_tracker import ProgressTracker
 from services.lesson_manager import LessonService
 from services.content_loader import content_loader
+from services.lesson_renderer import LessonRenderCache
 from services.feedback_config import LESSON_FEEDBACK_RULES
 from services.utils import extract_keywords_from_response
 from services.lesson_helpers import get_lesson_structure, is_actual_lesson, get_total_lesson_steps
 from services.learning_insights import LearningInsightsManager
+from services.unit_of_work import UnitOfWork
+from services.job_queue import job_queue
+from services.scoring_service import scoring_service
+from bson import ObjectId
+import asyncio
 import logging
 from datetime import datetime, timezone
+from typing import Dict, Any, Optional
 
 
 # Configure logging
@@ -285,31 +292,11 @@ async def handle_email(update: Update, context: ContextTypes.DEFAULT_TYPE) -> in
 async def show_lesson_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show the main lesson menu to users with enhanced error handling"""
     try:
-        # Get main lessons and log the result
-        lessons = content_loader.get_full_lessons(platform='telegram')
-        logger.info(f"Loaded {len(lessons)} total lessons")
-        
-        # Log available lessons before filtering
-        logger.info(f"Available lesson IDs: {list(lessons.keys())}")
-        
-        keyboard = []
-        filtered_count = 0
-        for lesson_id, lesson in lessons.items():
-            if (lesson_id != "lesson_1" and 
-                not "congratulations" in lesson_id.lower() and 
-                lesson.get("type") == "full_lesson"):
-                keyboard.append([
-                    InlineKeyboardButton(
-                        f"📚 {lesson.get('description')}",
-                        callback_data=lesson_id
-                    )
-                ])
-                filtered_count += 1
-        
-        logger.info(f"Created keyboard with {filtered_count} lessons after filtering")
+        # Lesson keyboard pre-rendered for the current content version
+        reply_markup = LessonRenderCache.current().telegram_menu_markup
         
         # Check if there are lessons to display
-        if not keyboard:
+        if reply_markup is None:
             logger.warning("No lessons available after filtering. Check lesson criteria.")
             # Send a clearer message to the user
             message = (
@@ -331,13 +318,13 @@ async def show_lesson_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if update.message:
             await update.message.reply_text(
                 welcome_message,
-                reply_markup=InlineKeyboardMarkup(keyboard)
+                reply_markup=reply_markup
             )
             logger.info("Sent lesson menu via reply_text")
         elif update.callback_query:
             await update.callback_query.message.edit_text(
                 welcome_message,
-                reply_markup=InlineKeyboardMarkup(keyboard)
+                reply_markup=reply_markup
             )
             logger.info("Sent lesson menu via edit_text")
             
@@ -452,29 +439,50 @@ Your responses are automatically saved to your learning journal.
     await update.message.reply_text(help_text)
 
 
+JOURNAL_ENTRIES_PER_PAGE = 5
+
+
 async def get_journal(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Send user their learning journal with pagination"""
+    """Send user their learning journal, starting from the first page"""
+    context.user_data['journal_page'] = 0
+    context.user_data['journal_cursors'] = {}
+    await send_journal_page(update, context)
+
+
+async def send_journal_page(update: Update, context: ContextTypes.DEFAULT_TYPE, cursor: str = None) -> None:
+    """
+    Send one page of the user's learning journal.
+
+    Pages are fetched with keyset cursors, which are kept in user_data since
+    callback data is limited to 64 bytes.
+    """
     # Get chat_id from either message or callback query
     chat_id = update.effective_chat.id  # This works for both message and callback query
-    
-    # Initialize page number in user data if not exists
-    if 'journal_page' not in context.user_data:
-        context.user_data['journal_page'] = 0
-    
-    # Fetch journal from MongoDB
-    journal = await db.journals.find_one({"user_id": chat_id})
-    
-    if journal and journal.get("entries"):
-        entries = journal["entries"]
-        entries_per_page = 5  # Number of entries per page
-        total_pages = (len(entries) + entries_per_page - 1) // entries_per_page
-        current_page = context.user_data['journal_page']
-        
-        # Get entries for current page
-        start_idx = current_page * entries_per_page
-        end_idx = start_idx + entries_per_page
-        page_entries = entries[start_idx:end_idx]
-        
+    current_page = context.user_data.setdefault('journal_page', 0)
+
+    try:
+        page, total = await asyncio.gather(
+            JournalManager.get_journal_page(
+                chat_id, cursor, per_page=JOURNAL_ENTRIES_PER_PAGE, newest_first=False
+            ),
+            JournalManager.count_user_entries(chat_id)
+        )
+    except ValueError:
+        # Stale cursor; start over from the first page
+        context.user_data['journal_page'] = current_page = 0
+        page, total = await asyncio.gather(
+            JournalManager.get_journal_page(chat_id, per_page=JOURNAL_ENTRIES_PER_PAGE, newest_first=False),
+            JournalManager.count_user_entries(chat_id)
+        )
+    page_entries = page['entries']
+
+    if page_entries:
+        context.user_data['journal_cursors'] = {
+            "prev": page['prev_cursor'],
+            "next": page['next_cursor']
+        }
+        total_pages = max(current_page + 1, (total + JOURNAL_ENTRIES_PER_PAGE - 1) // JOURNAL_ENTRIES_PER_PAGE)
+
         # Format entries for current page
         entries_text = f"📚 Your Learning Journal (Page {current_page + 1}/{total_pages}):\n\n"
         
@@ -489,12 +497,12 @@ async def get_journal(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         keyboard = []
         navigation_buttons = []
         
-        if current_page > 0:
+        if page['prev_cursor']:
             navigation_buttons.append(
                 InlineKeyboardButton("◀️ Previous", callback_data="journal_prev")
             )
         
-        if current_page < total_pages - 1:
+        if page['next_cursor']:
             navigation_buttons.append(
                 InlineKeyboardButton("Next ▶️", callback_data="journal_next")
             )
@@ -528,42 +536,66 @@ async def handle_journal_navigation(update: Update, context: ContextTypes.DEFAUL
     query = update.callback_query
     await query.answer()
     
-    if query.data == "journal_prev":
+    cursors = context.user_data.get('journal_cursors') or {}
+    cursor = None
+    if query.data == "journal_prev" and cursors.get("prev"):
+        cursor = cursors["prev"]
         context.user_data['journal_page'] = max(0, context.user_data.get('journal_page', 0) - 1)
-    elif query.data == "journal_next":
+    elif query.data == "journal_next" and cursors.get("next"):
+        cursor = cursors["next"]
         context.user_data['journal_page'] = context.user_data.get('journal_page', 0) + 1
+    else:
+        # Buttons from a message sent before a restart; start from the first page
+        context.user_data['journal_page'] = 0
     
-    # Re-render journal page
-    await get_journal(update, context)
+    # Render the requested page
+    await send_journal_page(update, context, cursor)
 
 
 
 async def save_journal_entry(user_id: int, lesson_key: str, response: str) -> bool:
     """
-    Save a user's response to their journal and update analytics.
+    Save a user's response to their journal.
+
+    The user's running analytics are updated in the same call by
+    JournalManager, so nothing needs to be recomputed here.
     """
     try:
-        # First save the journal entry
-        save_success = await JournalManager.save_journal_entry(user_id, lesson_key, response)
-        
-        if save_success:
-            # Update analytics after successful save
-            try:
-                metrics = await AnalyticsManager.calculate_user_metrics(user_id)
-                logger.info(f"Journal entry and analytics updated for user {user_id}")
-            except Exception as metrics_error:
-                logger.error(f"Error calculating metrics but entry was saved: {metrics_error}")
-                # Don't fail the whole operation if just metrics calculation fails
-                
-            return True
-        
-        return False
+        return await JournalManager.save_journal_entry(user_id, lesson_key, response)
         
     except Exception as e:
         logger.error(f"Error saving journal entry: {e}", exc_info=True)
         return False
 
 
+async def record_response_analytics(user_id: int, lesson_id: str, insights: Dict[str, Any],
+                                   feedback_results: Dict[str, Any], job_id: Optional[ObjectId] = None) -> None:
+    """
+    Background job: persist insights, feedback analytics and skill progress for
+    one response, then refresh the user's recurring patterns.
+
+    Every write is keyed on the job's id, so a retry after a partly failed
+    flush only applies what is missing.
+    """
+    uow = UnitOfWork()
+    await LearningInsightsManager.store_learning_insights(user_id, insights, uow=uow, job_id=job_id)
+    await FeedbackAnalyticsManager.save_feedback_analytics(
+        user_id, lesson_id, feedback_results, uow=uow, job_id=job_id
+    )
+
+    skills = feedback_results.get("quality_metrics", {}).get('skills')
+    if skills:
+        await SkillProgressTracker.update_skill_progress(user_id, skills, uow=uow, job_id=job_id)
+
+    if not await uow.flush():
+        raise RuntimeError(f"Failed to record analytics for user {user_id}")
+    # Recomputed from the stored entries and never raises, so it cannot trigger a retry
+    await FeedbackAnalyticsManager.update_recurring_patterns(user_id)
+
+
+job_queue.register("response_analytics", record_response_analytics, with_job_id=True)
+
+
 def extract_rating_from_response(response: str) -> str:
     """
     Extract a rating from the user's response.
@@ -606,13 +638,15 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
 
         current_lesson = user_data["current_lesson"]
-        lessons = content_loader.load_content('lessons')
+        # One content version for the whole update, even if a reload lands meanwhile
+        content = content_loader.snapshot
+        lessons = content.content['lessons']
 
         # Handle main lesson to first step transition
         if not '_step_' in current_lesson:
-            steps = content_loader.get_lesson_steps(current_lesson)
-            if steps:
-                current_lesson = list(steps.keys())[0]
+            first_step = content.index.first_step(current_lesson)
+            if first_step:
+                current_lesson = first_step
                 await UserManager.update_user_progress(chat_id, current_lesson)
 
         # Save journal entry
@@ -625,37 +659,31 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         lesson_data = lessons.get(current_lesson, {})
         next_step = lesson_data.get("next")
 
-        # Generate response feedback
-        feedback = evaluate_response_enhanced(current_lesson, user_response, chat_id)
-        quality_metrics = analyze_response_quality(user_response)
-
-        quality_metrics = analyze_response_quality(user_response)
-        
-        # Add learning insights storage
-        insights = {
-            "emerging_interests": quality_metrics.get('emerging_interests', []),
-            "unplanned_skills": quality_metrics.get('skill_analysis', {}).get('skills', []),
-            "support_areas": quality_metrics.get('semantic_analysis', {}).get('needs_support', []),
-            "learning_trajectory": {
-                "velocity": quality_metrics.get('semantic_analysis', {}).get('understanding_velocity', 0),
-                "suggested_paths": []  # Will be populated based on analysis
-            }
-        }
-        
-        # Store insights
-        await LearningInsightsManager.store_learning_insights(chat_id, insights)
+        # Generate response feedback off the event loop
+        feedback, quality_metrics = await asyncio.gather(
+            scoring_service.evaluate(current_lesson, user_response, chat_id),
+            scoring_service.analyze(user_response, chat_id, current_lesson)
+        )
 
-        # Get journal entries for streak tracking
-        journal = await JournalManager.get_user_journal(chat_id)
-        entries = journal.get('entries', []) if journal else []
+        # Read everything the reply needs in one concurrent round
+        journal, streak_info, previous_skills = await asyncio.gather(
+            JournalManager.get_journal_page(chat_id),
+            AnalyticsManager.get_streak_info(chat_id),
+            SkillProgressTracker.get_skill_progress(chat_id)
+        )
+        entries = journal['entries']
         
         # Create progress tracker and generate messages
         progress_tracker = ProgressTracker()
-        progress_message = progress_tracker.format_progress_message(entries, quality_metrics)
+        progress_message = progress_tracker.format_progress_message(
+            entries, quality_metrics, streak_info=streak_info
+        )
         
         if feedback:
             # Format feedback message with streak information
-            feedback_message = await format_feedback_message(feedback, quality_metrics, chat_id)
+            feedback_message = await format_feedback_message(
+                feedback, quality_metrics, chat_id, previous_skills=previous_skills, update_skills=False
+            )
             
             # Add progress and streak information
             feedback_message += "\n\n" + progress_message
@@ -667,18 +695,10 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 parse_mode='Markdown'
             )
 
-        # Save feedback analytics
-        feedback_results = {
-            "matches": extract_keywords_from_response(user_response, current_lesson),
-            "feedback": feedback,
-            "quality_metrics": quality_metrics
-        }
-        await FeedbackAnalyticsManager.save_feedback_analytics(chat_id, current_lesson, feedback_results)
-
         # Progress to next step if available
         if next_step:
             logger.info(f"User {chat_id} progressing from {current_lesson} to {next_step}")
-            success = await UserManager.update_user_progress(chat_id, next_step)
+            success = await UserManager.update_user_progress(chat_id, next_step, expected_lesson=current_lesson)
             if success:
                 await lesson_service.send_lesson(update, context, next_step)
             else:
@@ -687,6 +707,26 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         else:
             await update.message.reply_text("✅ Response saved! You've completed all lessons.")
 
+        # Analytics are recorded after the learner has their reply
+        await job_queue.enqueue("response_analytics", {
+            "user_id": chat_id,
+            "lesson_id": current_lesson,
+            "insights": {
+                "emerging_interests": quality_metrics.get('emerging_interests', []),
+                "unplanned_skills": quality_metrics.get('skill_analysis', {}).get('skills', []),
+                "support_areas": quality_metrics.get('semantic_analysis', {}).get('needs_support', []),
+                "learning_trajectory": {
+                    "velocity": quality_metrics.get('semantic_analysis', {}).get('understanding_velocity', 0),
+                    "suggested_paths": []  # Will be populated based on analysis
+                }
+            },
+            "feedback_results": {
+                "matches": extract_keywords_from_response(user_response, current_lesson),
+                "feedback": feedback,
+                "quality_metrics": quality_metrics
+            }
+        })
+
     except Exception as e:
         logger.error(f"Error handling message: {e}", exc_info=True)
         await update.message.reply_text(
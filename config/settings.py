@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -8,9 +9,48 @@ class Config:
     BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
     MONGODB_URI = os.getenv('MONGODB_URI')
     WEBHOOK_URL = os.getenv('WEBHOOK_URL')
+    WEBHOOK_SECRET_TOKEN = os.getenv('WEBHOOK_SECRET_TOKEN')  # Sent by Telegram in X-Telegram-Bot-Api-Secret-Token
     ADMIN_IDS = [int(id) for id in os.getenv('ADMIN_IDS', '471827125').split(',')]
     SLACK_BOT_TOKEN = os.getenv('SLACK_BOT_TOKEN')
     SLACK_SIGNING_SECRET = os.getenv('SLACK_SIGNING_SECRET')
     SLACK_APP_TOKEN = os.getenv('SLACK_APP_TOKEN')
     PORT = int(os.getenv('PORT', '8080'))
-    JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "default_unsafe_key")  # Used for authentication
\ No newline at end of file
+    JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "default_unsafe_key")  # Used for authentication
+    SKILL_INDEX_PATH = os.getenv('SKILL_INDEX_PATH', os.path.join(tempfile.gettempdir(), 'gclearnbot_skill_index.json'))
+    FEEDBACK_CACHE_MAX_ENTRIES = int(os.getenv('FEEDBACK_CACHE_MAX_ENTRIES', '5000'))
+    FEEDBACK_CACHE_MAX_BYTES = int(os.getenv('FEEDBACK_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+    FEEDBACK_CACHE_TTL_SECONDS = int(os.getenv('FEEDBACK_CACHE_TTL_SECONDS', '1800'))
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL')  # Shared cache across processes (optional)
+    JOURNAL_STORAGE_MODE = os.getenv('JOURNAL_STORAGE_MODE', 'dual')  # 'dual' while legacy journals are migrated, then 'entries'
+    COHORT_METRICS_REFRESH_SECONDS = int(os.getenv('COHORT_METRICS_REFRESH_SECONDS', '300'))
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '500'))
+    USER_CACHE_MAX_ENTRIES = int(os.getenv('USER_CACHE_MAX_ENTRIES', '2000'))
+    USER_CACHE_TTL_SECONDS = int(os.getenv('USER_CACHE_TTL_SECONDS', '30'))
+    JOB_QUEUE_WORKERS = int(os.getenv('JOB_QUEUE_WORKERS', '4'))
+    JOB_QUEUE_MAX_SIZE = int(os.getenv('JOB_QUEUE_MAX_SIZE', '1000'))
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '5'))
+    JOB_RETRY_BASE_SECONDS = float(os.getenv('JOB_RETRY_BASE_SECONDS', '5'))
+    JOB_LEASE_SECONDS = float(os.getenv('JOB_LEASE_SECONDS', '60'))
+    JOB_POLL_SECONDS = float(os.getenv('JOB_POLL_SECONDS', '10'))
+    SCORING_WORKERS = int(os.getenv('SCORING_WORKERS', '2'))  # 0 scores every response on the event loop
+    SCORING_INLINE_MAX_CHARS = int(os.getenv('SCORING_INLINE_MAX_CHARS', '400'))
+    SCORING_TIMEOUT_SECONDS = float(os.getenv('SCORING_TIMEOUT_SECONDS', '10'))
+    MONGODB_MAX_POOL_SIZE = int(os.getenv('MONGODB_MAX_POOL_SIZE', '50'))
+    MONGODB_MIN_POOL_SIZE = int(os.getenv('MONGODB_MIN_POOL_SIZE', '5'))
+    MONGODB_MAX_IDLE_TIME_MS = int(os.getenv('MONGODB_MAX_IDLE_TIME_MS', '300000'))
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGODB_WAIT_QUEUE_TIMEOUT_MS', '5000'))
+    CONTENT_RELOAD_SECONDS = int(os.getenv('CONTENT_RELOAD_SECONDS', '30'))  # 0 disables hot reload of data/*.json
+    UPDATE_CONCURRENCY = int(os.getenv('UPDATE_CONCURRENCY', '32'))  # Updates processed at once; same-chat updates stay in order
+    UPDATE_MAX_PENDING = int(os.getenv('UPDATE_MAX_PENDING', '1024'))  # Updates admitted at once, including those waiting for their chat
+    TELEGRAM_GLOBAL_RATE = float(os.getenv('TELEGRAM_GLOBAL_RATE', '30'))  # Outbound messages per second, all chats
+    TELEGRAM_CHAT_RATE = float(os.getenv('TELEGRAM_CHAT_RATE', '1'))  # Per private chat
+    TELEGRAM_CHAT_BURST = float(os.getenv('TELEGRAM_CHAT_BURST', '3'))
+    TELEGRAM_GROUP_RATE = float(os.getenv('TELEGRAM_GROUP_RATE', str(20 / 60)))  # Per group chat
+    TELEGRAM_MAX_RETRIES = int(os.getenv('TELEGRAM_MAX_RETRIES', '3'))  # Retries after a 429
+    REMINDER_CHECK_SECONDS = int(os.getenv('REMINDER_CHECK_SECONDS', '21600'))  # 0 disables reminder broadcasts
+    REMINDER_INACTIVE_DAYS = int(os.getenv('REMINDER_INACTIVE_DAYS', '3'))
+    REMINDER_BATCH_SIZE = int(os.getenv('REMINDER_BATCH_SIZE', '200'))
+    UPDATE_DEDUPE_MAX_ENTRIES = int(os.getenv('UPDATE_DEDUPE_MAX_ENTRIES', '10000'))
+    UPDATE_DEDUPE_TTL_SECONDS = int(os.getenv('UPDATE_DEDUPE_TTL_SECONDS', '86400'))
+    STARTUP_PROFILE = os.getenv('STARTUP_PROFILE', 'false').lower() == 'true'  # Log per-module import times at startup
+    STARTUP_PROFILE_TOP = int(os.getenv('STARTUP_PROFILE_TOP', '25'))
@@ -1,12 +1,22 @@
 import logging
 import asyncio
+import time
 from config.settings import Config
+from services.import_profile import ImportProfiler
+
+# Record per-module import times from here until startup has finished
+profiler = ImportProfiler().install() if Config.STARTUP_PROFILE else None
+
 from services.lock_manager import LockManager
 from services.application import create_app, start_app
 from services.lesson_manager import LessonService
 from services.content_loader import content_loader
+from services.lesson_renderer import LessonRenderCache
 from services.database import UserManager, get_db
-from services.slack.handlers import start_slack_bot
+from services.feedback_enhanced import DynamicSkillAnalyzer
+from services.skill_index import get_skill_index, ensure_wordnet
+from services.readiness import Readiness
+from services.api import static_assets
 from hypercorn.config import Config as HypercornConfig
 from hypercorn.asyncio import serve
 
@@ -17,6 +27,43 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+async def warm_up():
+    """
+    Load the NLP resources and start Slack after the web server is up, so cold
+    starts do not hold back health checks and webhook delivery.
+    """
+    # Load (or build once) the skill index, WordNet and the precompressed web
+    # assets off the event loop
+    for name, loader in (
+        ("skill_index", lambda: get_skill_index(DynamicSkillAnalyzer.SKILL_INDICATORS)),
+        ("wordnet", ensure_wordnet),
+        ("static_assets", lambda: static_assets.assets)
+    ):
+        started = time.monotonic()
+        try:
+            await asyncio.to_thread(loader)
+            Readiness.mark_ready(name, started)
+        except Exception as e:
+            Readiness.mark_failed(name, e)
+
+    # Start Slack bot if configured; Slack Bolt is only imported in that case
+    if Config.SLACK_BOT_TOKEN and Config.SLACK_APP_TOKEN:
+        started = time.monotonic()
+        try:
+            logger.info("Starting Slack bot...")
+            from services.slack.handlers import start_slack_bot
+            await start_slack_bot()
+            Readiness.mark_ready("slack", started)
+        except Exception as e:
+            Readiness.mark_failed("slack", e)
+            logger.info("Continuing with Telegram bot only")
+
+    if profiler is not None:
+        profiler.uninstall()
+        Readiness.set_import_profile(profiler.log_report(Config.STARTUP_PROFILE_TOP))
+
+
 async def async_main():
     try:
         with LockManager() as lock:
@@ -24,6 +71,10 @@ async def async_main():
                 logger.error("Could not acquire lock, exiting")
                 return 1
 
+            Readiness.expect("mongodb", "content", "skill_index", "wordnet", "static_assets")
+            if Config.SLACK_BOT_TOKEN and Config.SLACK_APP_TOKEN:
+                Readiness.expect("slack")
+
             # Initialize database first
             logger.info("Initializing database connection...")
             # Use get_db() instead of init_mongodb directly
@@ -48,33 +99,33 @@ async def async_main():
             # Validate content structure
             logger.info("Validating content structure...")
             content_loader.validate_content_structure()
+            LessonRenderCache.current()
+            Readiness.mark_ready("content")
 
-            # Initialize services
+            # Heavy, non-critical subsystems warm up in the background
+            warmup = asyncio.create_task(warm_up())
             try:
-                lesson_service = LessonService(user_manager=UserManager())
-            except Exception as e:
-                logger.error(f"Service initialization failed: {e}")
-                return 1
-
-            # Start Telegram bot
-            logger.info("Starting Telegram bot...")
-            await start_app(app)
-            
-            # Start Slack bot if configured
-            if Config.SLACK_BOT_TOKEN and Config.SLACK_APP_TOKEN:
+                # Initialize services
                 try:
-                    logger.info("Starting Slack bot...")
-                    start_slack_bot()
-                    logger.info("Slack bot started successfully")
+                    lesson_service = LessonService(user_manager=UserManager())
                 except Exception as e:
-                    logger.error(f"Slack bot initialization failed: {e}")
-                    logger.info("Continuing with Telegram bot only")
-            
-            # Keep the application running
-            await server
-
-            return 0
-                
+                    logger.error(f"Service initialization failed: {e}")
+                    return 1
+
+                # Start Telegram bot
+                logger.info("Starting Telegram bot...")
+                await start_app(app)
+
+                # Keep the application running
+                await server
+
+                return 0
+            finally:
+                # Don't leave warm-up running past shutdown
+                if not warmup.done():
+                    warmup.cancel()
+                    await asyncio.gather(warmup, return_exceptions=True)
+
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
         return 1
@@ -83,4 +134,4 @@ def main():
     asyncio.run(async_main())
 
 if __name__ == "__main__":
-    exit(main())
\ No newline at end of file
+    exit(main())
@@ -1,19 +1,34 @@
-from quart import Quart, request, jsonify, ResponseReturnValue, send_from_directory
-from services.database import get_db, AnalyticsManager, UserManager, JournalManager, FeedbackAnalyticsManager
+from quart import Quart, Response, request, jsonify, ResponseReturnValue
+from services.database import get_db, db, mongo, AnalyticsManager, UserManager, JournalManager, FeedbackAnalyticsManager
 from services.lesson_manager import LessonService
 from services.progress_tracker import ProgressTracker
 from services.learning_insights import LearningInsightsManager
 from services.content_loader import content_loader
+from services.lesson_renderer import LessonRenderCache
+from services.http_cache import StaticAssets, conditional_response
 from services.utils import verify_password
 from services.feedback_templates import FEEDBACK_TEMPLATES
+from services.feedback_enhanced import FeedbackCache
+from services.pagination import encode_cursor, decode_cursor
+from services.user_cache import UserCache
+from services.job_queue import job_queue
+from services.scoring_service import scoring_service
+from services.readiness import Readiness
+from services.update_intake import update_intake
+from services.update_processor import update_processor
+from services.send_scheduler import send_scheduler
+from services.reminders import reminder_broadcaster
 from config.settings import Config
 from datetime import datetime, timezone
 import os
 import asyncio
+from pathlib import Path
 import logging
-from telegram import Update
 from telegram.ext import Application
 import json
+import hmac
+from bson import ObjectId
+from bson.errors import InvalidId
 import bcrypt
 from flask_jwt_extended import decode_token, verify_jwt_in_request, JWTManager, create_access_token, jwt_required, get_jwt_identity
 import jwt
@@ -25,7 +40,7 @@ from uuid import uuid4
 logger = logging.getLogger(__name__)
 
 app = Quart(__name__)
-db = None
+static_assets = StaticAssets(Path(__file__).resolve().parent.parent / "web")
 JWT_SECRET_KEY = Config.JWT_SECRET_KEY
 app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY")  # Use Render environment variable
 # jwt = JWTManager(app)  # Initialize JWT authentication
@@ -33,8 +48,7 @@ app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY")  # Use Render environ
 @app.before_serving
 async def before_serving():
     """Initialize database connection before serving"""
-    global db
-    db = await get_db()
+    await get_db()
     logger.info("Database initialized")
 
 @app.before_request
@@ -92,11 +106,23 @@ def mask_email(email: str) -> str:
     
     return f"{masked_username}@{parts[1]}"
 
+def _to_utc_iso(value: str) -> str:
+    """Parse an ISO date/timestamp (naive means UTC) into a UTC isoformat string."""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if not parsed.tzinfo:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
 def setup_routes(app: Quart, application: Application) -> None:
 
     """Set up API routes for web access"""
 
     lesson_service = LessonService(user_manager=UserManager())
+
+    @app.before_request
+    async def begin_user_scope():
+        """Give each request its own user lookup cache"""
+        UserCache.begin_scope()
     progress_tracker = ProgressTracker()
 
     @app.route('/register', methods=['POST'])
@@ -129,6 +155,7 @@ def setup_routes(app: Quart, application: Application) -> None:
                         {"email": email},
                         {"$set": {"password": generate_password_hash(password)}}
                     )
+                    UserCache.invalidate("email", email)
                     if result.modified_count > 0:
                         token = jwt.encode(
                             {"sub": email},
@@ -253,19 +280,15 @@ def setup_routes(app: Quart, application: Application) -> None:
         current_user = get_jwt_identity()
         return jsonify(logged_in_as=current_user), 200
     
-    # ✅ Serve static files from the web directory
+    # ✅ Serve static files from the web directory (in memory, with ETags and precompressed variants)
     @app.route('/web/<path:filename>')
     async def serve_static(filename):
         try:
-            # Get absolute path to web directory
-            web_dir = os.path.join(os.getcwd(), "web")
-            
-            # Check if file exists
-            if not os.path.exists(os.path.join(web_dir, filename)):
+            response = static_assets.response(request, filename)
+            if response is None:
                 logger.error(f"File not found: {filename}")
                 return {"error": "File not found"}, 404
-                
-            return await send_from_directory(web_dir, filename)
+            return response
         except Exception as e:
             logger.error(f"Error serving static file {filename}: {e}")
             return {"error": "Internal server error"}, 500
@@ -274,10 +297,9 @@ def setup_routes(app: Quart, application: Application) -> None:
     async def list_lessons():
         """Return a list of all available lessons"""
         try:
-            lessons = content_loader.load_content('lessons')  # Load from JSON
-            lesson_list = [{"lesson_id": key, "title": value.get("title", f"Lesson {key}")} for key, value in lessons.items()]
-            
-            return jsonify({"status": "success", "lessons": lesson_list}), 200
+            rendered = LessonRenderCache.current()
+            return conditional_response(request, rendered.list_body, rendered.list_etag, "application/json",
+                                        last_modified=rendered.loaded_at)
 
         except Exception as e:
             logger.error(f"Error listing lessons: {e}")
@@ -287,31 +309,15 @@ def setup_routes(app: Quart, application: Application) -> None:
     async def get_lesson(lesson_id):
         """Fetch a lesson with progress details (similar to bot)."""
         try:
-            lessons = content_loader.load_content('lessons')
-            lesson = lessons.get(lesson_id)
+            # Pre-rendered body for the current content version
+            rendered_content = LessonRenderCache.current()
+            rendered = rendered_content.lessons.get(lesson_id)
 
-            if not lesson:
+            if not rendered:
                 return jsonify({"status": "error", "message": "Lesson not found"}), 404
 
-            # Extract progress details
-            parts = lesson_id.split('_')
-            lesson_num = parts[1] if len(parts) > 1 else '1'
-            step_num = parts[3] if len(parts) > 3 and 'step' in parts else None
-
-            # Format progress header
-            header = f"📚 Lesson {lesson_num} of 6"
-            if step_num:
-                header += f"\nStep {step_num}"
-
-            return jsonify({
-                "status": "success",
-                "lesson": {
-                    "lesson_id": lesson_id,
-                    "title": lesson.get("title", f"Lesson {lesson_num}"),
-                    "text": f"{header}\n\n{lesson['text']}",
-                    "next": lesson.get("next", None)  # Next lesson ID
-                }
-            }), 200
+            return conditional_response(request, rendered.web_body, rendered.web_etag, "application/json",
+                                        last_modified=rendered_content.loaded_at)
 
         except Exception as e:
             logger.error(f"Error fetching lesson {lesson_id}: {e}")
@@ -324,11 +330,8 @@ def setup_routes(app: Quart, application: Application) -> None:
         try:
             user_email = request.user_email
             
-            # Get database instance
-            db = await get_db()
-            
             # Get user data
-            user = await db.users.find_one({"email": user_email})
+            user = await UserManager.get_user_by_email(user_email)
             if not user:
                 return jsonify({"status": "error", "message": "User not found"}), 404
 
@@ -367,11 +370,8 @@ def setup_routes(app: Quart, application: Application) -> None:
         try:
             user_email = request.user_email
             
-            # Get database instance
-            db = await get_db()
-            
             # Get user data
-            user_data = await db.users.find_one({"email": user_email})
+            user_data = await UserManager.get_user_by_email(user_email)
             if not user_data:
                 return jsonify({"status": "error", "message": "User not found"}), 404
 
@@ -400,39 +400,40 @@ def setup_routes(app: Quart, application: Application) -> None:
     @app.route('/journal')
     @async_jwt_required()
     async def get_journal():
-        """Fetch user's journal entries with pagination"""
+        """
+        Fetch user's journal entries, newest first, with keyset pagination.
+
+        Query params: per_page, and cursor (next_cursor or prev_cursor from a
+        previous response) to move to the following or preceding page.
+        """
         try:
             user_email = request.user_email
-            page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
+            cursor = request.args.get('cursor') or None
+            per_page = min(max(request.args.get('per_page', 10, type=int), 1), 100)
             
-            # Get database instance
-            db = await get_db()
-                
-            user = await db.users.find_one({"email": user_email})
+            user = await UserManager.get_user_by_email(user_email)
             if not user:
                 return jsonify({"status": "error", "message": "User not found"}), 404
 
-            journal = await JournalManager.get_user_journal(user['user_id'], page, per_page)
-            
-            if journal:
-                return jsonify({
-                    "status": "success",
-                    "journal": journal['entries'],
-                    "pagination": {
-                        "current_page": journal['current_page'],
-                        "per_page": journal['per_page'],
-                        "total_pages": journal['total_pages'],
-                        "total_entries": journal['total']
-                    }
-                }), 200
-                
-            return jsonify({"status": "success", "journal": [], "pagination": {
-                "current_page": 1,
-                "per_page": per_page,
-                "total_pages": 0,
-                "total_entries": 0
-            }}), 200
+            try:
+                journal, total = await asyncio.gather(
+                    JournalManager.get_journal_page(user['user_id'], cursor, per_page),
+                    JournalManager.count_user_entries(user['user_id'])
+                )
+            except ValueError:
+                return jsonify({"status": "error", "message": "Invalid cursor"}), 400
+
+            return jsonify({
+                "status": "success",
+                "journal": journal['entries'],
+                "pagination": {
+                    "per_page": per_page,
+                    "next_cursor": journal['next_cursor'],
+                    "prev_cursor": journal['prev_cursor'],
+                    "total_pages": (total + per_page - 1) // per_page,
+                    "total_entries": total
+                }
+            }), 200
 
         except Exception as e:
             logger.error(f"Error fetching journal: {e}")
@@ -440,7 +441,12 @@ def setup_routes(app: Quart, application: Application) -> None:
 
     @app.route('/webhook', methods=['POST'])
     async def webhook() -> ResponseReturnValue:
-        """Handle incoming webhook updates"""
+        """
+        Accept an incoming webhook update.
+
+        The update is validated, deduplicated and queued; the bot application
+        processes it in the background, so Telegram is answered immediately.
+        """
         try:
             if not application:
                 logger.error("Application not initialized")
@@ -449,36 +455,33 @@ def setup_routes(app: Quart, application: Application) -> None:
             if not application.bot:
                 logger.error("Bot not initialized")
                 return jsonify({"status": "error", "message": "Bot not initialized"}), 500
+
+            if Config.WEBHOOK_SECRET_TOKEN and not hmac.compare_digest(
+                request.headers.get('X-Telegram-Bot-Api-Secret-Token', ''), Config.WEBHOOK_SECRET_TOKEN
+            ):
+                logger.warning("Webhook request with invalid secret token")
+                return jsonify({"status": "error", "message": "Forbidden"}), 403
             
             # Check content type
-            if request.headers.get('content-type') != 'application/json':
+            if request.mimetype != 'application/json':
                 logger.error(f"Invalid content type: {request.headers.get('content-type')}")
                 return jsonify({"status": "error", "message": "Invalid content type"}), 400
-                
-            # Get raw data first
-            raw_data = await request.get_data()
-            if not raw_data:
-                logger.error("Empty request body")
-                return jsonify({"status": "error", "message": "Empty request body"}), 400
-                
-            try:
-                json_data = await request.get_json(force=True)
-                if not json_data:
-                    logger.error("Empty JSON data")
-                    return jsonify({"status": "error", "message": "Empty JSON data"}), 400
-                    
-                logger.info(f"Received webhook data: {json_data}")
-                
-                update = Update.de_json(json_data, application.bot)
-                await application.process_update(update)
-                return jsonify({"status": "ok"})
-                
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON decode error: {e}")
-                return jsonify({"status": "error", "message": "Invalid JSON format"}), 400
+
+            json_data = await request.get_json(silent=True)
+            if not isinstance(json_data, dict) or not isinstance(json_data.get('update_id'), int):
+                logger.error("Webhook body is not a Telegram update")
+                return jsonify({"status": "error", "message": "Invalid update"}), 400
+
+            update = update_intake.accept(json_data, application.bot)
+            if update is None:
+                # Acknowledge duplicates too, so Telegram stops redelivering them
+                return jsonify({"status": "duplicate"})
+
+            logger.debug(f"Queued update {update.update_id}")
+            return jsonify({"status": "ok"})
                 
         except Exception as e:
-            logger.error(f"Error processing update: {e}", exc_info=True)
+            logger.error(f"Error accepting update: {e}", exc_info=True)
             return jsonify({"status": "error", "message": str(e)}), 500
 
 
@@ -486,7 +489,7 @@ def setup_routes(app: Quart, application: Application) -> None:
     @app.route('/')
     async def serve_frontend():
         """Serve index.html when users visit the base URL."""
-        return await send_from_directory(os.path.join(os.getcwd(), "web"), "index.html")
+        return static_assets.response(request, "index.html")
 
     @app.route('/status')
     def bot_status():
@@ -524,10 +527,9 @@ def setup_routes(app: Quart, application: Application) -> None:
             except ValueError:
                 return jsonify({"error": "Invalid user ID"}), 400
                 
-            journal = await db.journals.find_one({"user_id": user_id})
-            if journal:
-                journal.pop('_id', None)
-                return jsonify(journal)
+            entries = await JournalManager.get_user_entries(user_id)
+            if entries:
+                return jsonify({"user_id": user_id, "entries": entries})
             return jsonify({"error": "Journal not found"}), 404
         except Exception as e:
             logger.error(f"Error fetching journal: {e}")
@@ -535,7 +537,12 @@ def setup_routes(app: Quart, application: Application) -> None:
 
     @app.route('/journals')
     async def list_journals():
-        """Admin route to list all journals"""
+        """
+        Admin route to export all journal entries as NDJSON.
+
+        Query parameters: since, until (ISO timestamps), lesson, user_id,
+        batch_size and cursor (resume token taken from the last line received).
+        """
         try:
 
             # Get database instance
@@ -556,14 +563,42 @@ def setup_routes(app: Quart, application: Application) -> None:
                 if not admin_user or not admin_user.get('is_admin'):
                     return jsonify({"status": "error", "message": "Unauthorized"}), 403
 
-            # Use async operation
-            journals = await db.journals.find().to_list(length=None)
-            
-            # Remove MongoDB _id from each journal
-            for journal in journals:
-                journal.pop('_id', None)
-                
-            return jsonify({"status": "success", "journals": journals})
+            # Parse filters and resume token before the response starts streaming
+            args = request.args
+            try:
+                # Normalize to the UTC isoformat strings entries are stored with
+                since, until = (
+                    _to_utc_iso(args[name]) if args.get(name) else None
+                    for name in ('since', 'until')
+                )
+                after_id = None
+                if args.get('cursor'):
+                    after_id = ObjectId(decode_cursor(args['cursor'])['id'])
+            except (ValueError, KeyError, TypeError, InvalidId):
+                return jsonify({"status": "error", "message": "Invalid since, until or cursor"}), 400
+
+            batch_size = min(max(args.get('batch_size', Config.EXPORT_BATCH_SIZE, type=int), 1), 5000)
+            entries = JournalManager.iter_export(
+                since=since,
+                until=until,
+                lesson=args.get('lesson'),
+                user_id=args.get('user_id'),
+                after_id=after_id,
+                batch_size=batch_size
+            )
+
+            async def generate_ndjson():
+                # One JSON object per line; each carries the token to resume after it
+                try:
+                    async for entry in entries:
+                        entry_id = entry.pop('_id')
+                        entry['cursor'] = encode_cursor({"id": str(entry_id)})
+                        yield json.dumps(entry, default=str) + "\n"
+                except Exception as e:
+                    logger.error(f"Error streaming journal export: {e}")
+                    yield json.dumps({"error": "Export interrupted, resume with the last cursor"}) + "\n"
+
+            return Response(generate_ndjson(), mimetype="application/x-ndjson")
         except Exception as e:
             logger.error(f"Error listing journals: {e}")
             return jsonify({"error": "Server error"}), 500
@@ -573,7 +608,7 @@ def setup_routes(app: Quart, application: Application) -> None:
         """Health check endpoint"""
         try:
             # Test DB connection
-            await db.users.find_one
+            await db.command('ping')
             return {
                 "status": "healthy",
                 "timestamp": datetime.now(timezone.utc).isoformat(),
@@ -585,10 +620,34 @@ def setup_routes(app: Quart, application: Application) -> None:
                 "error": str(e)
             }, 500
         
+    @app.route('/ready')
+    async def readiness_check():
+        """Readiness endpoint: which subsystems are warm; 503 until the required ones are"""
+        snapshot = Readiness.snapshot()
+        return jsonify(snapshot), 200 if snapshot["ready"] else 503
+
+    @app.route('/metrics')
+    async def metrics():
+        """Runtime counters for monitoring"""
+        return jsonify({
+            "status": "success",
+            "feedback_cache": FeedbackCache.stats(),
+            "user_cache": UserCache.stats(),
+            "job_queue": job_queue.stats(),
+            "scoring": scoring_service.stats(),
+            "mongodb_pool": mongo.stats(),
+            "content": content_loader.stats(),
+            "static_assets": static_assets.stats(),
+            "telegram_updates": update_intake.stats(),
+            "update_processor": update_processor.stats(),
+            "telegram_send": send_scheduler.stats(),
+            "reminders": reminder_broadcaster.stats()
+        })
+
     async def keep_warm():
         """Periodic warm-up check"""
         try:
-            await db.users.find_one
+            await db.command('ping')
             logger.debug("Warm-up successful")
         except Exception as e:
             logger.error(f"Warm-up failed: {e}")
@@ -599,7 +658,7 @@ def setup_routes(app: Quart, application: Application) -> None:
         """Analytics endpoint for dashboard"""
         try:
             # Get analytics data
-            cohort_metrics = AnalyticsManager.calculate_cohort_metrics()
+            cohort_metrics = await AnalyticsManager.get_cohort_metrics()
             
             # Return formatted response
             return jsonify({
@@ -697,7 +756,7 @@ def setup_routes(app: Quart, application: Application) -> None:
             logger.info(f"Telegram ID: {telegram_id}")
 
             # Verify user exists
-            user = await db.users.find_one({"email": user_email})
+            user = await UserManager.get_user_by_email(user_email)
             if not user:
                 logger.error(f"No user found with email: {masked_email}")
                 return jsonify({
@@ -715,6 +774,7 @@ def setup_routes(app: Quart, application: Application) -> None:
                     }
                 }
             )
+            UserCache.invalidate("email", user_email)
 
             if result.modified_count > 0:
                 logger.info(f"Successfully linked Telegram account for {masked_email}")
@@ -1,9 +1,17 @@
 from quart import Quart
 from services.api import setup_routes
-from services.database import init_mongodb
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, filters, ConversationHandler
-from telegram import BotCommand
+from services.database import init_mongodb, mongo, JournalManager, AnalyticsManager
+from services.user_cache import UserCache
+from services.job_queue import job_queue
+from services.scoring_service import scoring_service
+from services.readiness import Readiness
+from services.content_loader import content_loader
+from services.update_intake import update_intake, claim_update
+from services.update_processor import update_processor
+from services.send_scheduler import send_scheduler, send_lane, Priority
+from services.reminders import reminder_broadcaster
+from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, TypeHandler, filters, ConversationHandler
+from telegram import BotCommand, Update
 from bot.handlers.user_handlers import (
     start, resume_command, get_journal, help_command, handle_response, 
     handle_message, handle_start_choice, progress_command, handle_journal_navigation, AWAITING_EMAIL,
@@ -11,9 +19,12 @@ from bot.handlers.user_handlers import (
 )
 from bot.handlers.admin_handlers import adminhelp_command, list_users, analytics_command, user_analytics_command, lesson_analytics_command, learning_insights_command
 from services.error_handler import error_handler
+import asyncio
 import logging
+import time
 import validators
 import os
+from datetime import datetime, timezone, timedelta
 from config.settings import Config
 
 BOT_TOKEN = Config.BOT_TOKEN
@@ -43,6 +54,11 @@ async def main() -> Application:
     return application
 
 
+async def begin_user_scope(update: Update, context) -> None:
+    """Start a per-update user lookup cache; other handler groups still run."""
+    UserCache.begin_scope()
+
+
 async def initialize_application() -> Application:
     try:
         # Initialize database
@@ -52,9 +68,21 @@ async def initialize_application() -> Application:
 
         if not BOT_TOKEN:
             raise ValueError("BOT_TOKEN environment variable is not set.")
-        application = Application.builder().token(BOT_TOKEN).build()
+        # Updates from different chats run concurrently, each chat's in order;
+        # outbound messages are throttled to Telegram's limits
+        application = (
+            Application.builder()
+            .token(BOT_TOKEN)
+            .concurrent_updates(update_processor)
+            .rate_limiter(send_scheduler)
+            .build()
+        )
 
         # Add command handlers
+        # Skip updates already processed (e.g. redelivered across a restart)
+        application.add_handler(TypeHandler(Update, claim_update), group=-2)
+        # Fresh user lookup cache for every update, ahead of all other handlers
+        application.add_handler(TypeHandler(Update, begin_user_scope), group=-1)
         application.add_handler(CommandHandler("start", start))
         application.add_handler(CommandHandler("resume", resume_command))
         application.add_handler(CommandHandler("progress", progress_command))
@@ -78,13 +106,13 @@ async def initialize_application() -> Application:
         )
         application.add_handler(conv_handler)
         
-        # Admin handlers
-        application.add_handler(CommandHandler("adminhelp", adminhelp_command))
-        application.add_handler(CommandHandler("users", list_users))
-        application.add_handler(CommandHandler("analytics", analytics_command))
-        application.add_handler(CommandHandler("useranalytics", user_analytics_command))
-        application.add_handler(CommandHandler("lessonanalytics", lesson_analytics_command))
-        application.add_handler(CommandHandler("learninginsights", learning_insights_command))
+        # Admin handlers; their reports queue behind replies to learners
+        application.add_handler(CommandHandler("adminhelp", send_lane(Priority.ADMIN, adminhelp_command)))
+        application.add_handler(CommandHandler("users", send_lane(Priority.ADMIN, list_users)))
+        application.add_handler(CommandHandler("analytics", send_lane(Priority.ADMIN, analytics_command)))
+        application.add_handler(CommandHandler("useranalytics", send_lane(Priority.ADMIN, user_analytics_command)))
+        application.add_handler(CommandHandler("lessonanalytics", send_lane(Priority.ADMIN, lesson_analytics_command)))
+        application.add_handler(CommandHandler("learninginsights", send_lane(Priority.ADMIN, learning_insights_command)))
 
         # Message handlers
         application.add_handler(CallbackQueryHandler(handle_start_choice, pattern='^start_'))
@@ -108,7 +136,7 @@ async def initialize_application() -> Application:
         if WEBHOOK_URL:
             if validators.url(WEBHOOK_URL):
                 webhook_path = f"{WEBHOOK_URL}"
-                await application.bot.set_webhook(webhook_path)
+                await application.bot.set_webhook(webhook_path, secret_token=Config.WEBHOOK_SECRET_TOKEN)
                 logger.info(f"Webhook set to {webhook_path}")
             else:
                 logger.error("Invalid WEBHOOK_URL provided. Webhook not configured.")
@@ -126,19 +154,75 @@ async def create_app() -> Quart:
     """Initialize and configure the Quart application"""
     app = Quart(__name__)
     
-    # Initialize services
-    init_mongodb()
+    # Initialize services (reuses the shared client if main already connected)
+    await init_mongodb()
     
     # Initialize the Telegram bot application
     global application
-    application = await initialize_application()
+    started = time.monotonic()
+    Readiness.expect("telegram", "scheduler", "job_queue", "scoring_pool")
+    try:
+        application = await initialize_application()
+        # Webhook updates are queued by the intake and processed by the application
+        await update_intake.start(application.update_queue)
+        await application.start()
+    except Exception as e:
+        Readiness.mark_failed("telegram", e)
+        raise
+    Readiness.mark_ready("telegram", started)
     
     # Setup routes
     setup_routes(app, application)  # Pass the application object here
     
-    # Setup scheduler
+    # Setup scheduler (APScheduler is only imported once the app is being built)
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
     scheduler = AsyncIOScheduler()
+    if Config.JOURNAL_STORAGE_MODE == 'dual':
+        # One-off background migration of legacy embedded journals
+        scheduler.add_job(JournalManager.migrate_embedded_journals, id="journal_migration", replace_existing=True)
+    # Materialized cohort metrics served to /analytics and the admin dashboard
+    scheduler.add_job(
+        AnalyticsManager.refresh_cohort_metrics,
+        "interval",
+        seconds=Config.COHORT_METRICS_REFRESH_SECONDS,
+        id="cohort_metrics_refresh",
+        next_run_time=datetime.now(timezone.utc),
+        replace_existing=True
+    )
+    # Pick up edits to the content files without a restart
+    if Config.CONTENT_RELOAD_SECONDS > 0:
+        scheduler.add_job(
+            content_loader.reload_async,
+            "interval",
+            seconds=Config.CONTENT_RELOAD_SECONDS,
+            id="content_reload",
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True
+        )
+    # Nudge inactive learners; an interrupted run resumes shortly after a restart
+    if Config.REMINDER_CHECK_SECONDS > 0:
+        scheduler.add_job(
+            reminder_broadcaster.run,
+            "interval",
+            seconds=Config.REMINDER_CHECK_SECONDS,
+            args=[application.bot],
+            id="inactive_reminders",
+            next_run_time=datetime.now(timezone.utc) + timedelta(seconds=60),
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True
+        )
     scheduler.start()
+    Readiness.mark_ready("scheduler")
+
+    # Background workers for analytics recorded after the reply
+    await job_queue.start()
+    Readiness.mark_ready("job_queue")
+
+    # Pre-warmed worker processes for NLP scoring; spawning them and loading
+    # WordNet is slow, so warm up in the background and score inline meanwhile
+    scoring_warmup = asyncio.create_task(scoring_service.start())
     
     # Add cleanup
     @app.while_serving
@@ -150,7 +234,13 @@ async def create_app() -> Quart:
         when the application stops serving.
         """
         yield
+        scoring_warmup.cancel()
+        await application.stop()
+        await application.shutdown()
+        await job_queue.stop()
+        scoring_service.stop()
         scheduler.shutdown()
+        mongo.close()
     
     return app
 
@@ -0,0 +1,260 @@
+"""
+Bounded caches with TTL eviction and hit/miss metrics.
+
+LRUTTLCache is the in-process store; it is synchronous so it can be used from
+CPU-bound code, including scoring worker processes. RedisCache is an optional
+tier shared between processes. It talks to Redis over the network, so its
+interface is async (redis.asyncio) and it is only used from coroutines.
+"""
+
+import json
+import logging
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    """Minimal interface shared by in-process cache stores"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        ...
+
+
+class AsyncCacheBackend(ABC):
+    """Interface of cache stores reached over the network"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        ...
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a cached value in bytes."""
+    if isinstance(value, str):
+        return sys.getsizeof(value)
+    try:
+        return sys.getsizeof(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return sys.getsizeof(value)
+
+
+class LRUTTLCache(CacheBackend):
+    """In-process LRU cache bounded by entry count and approximate memory, with TTL expiry"""
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 16 * 1024 * 1024,
+                 ttl_seconds: float = 1800):
+        """
+        Args:
+            max_entries: Maximum number of entries kept
+            max_bytes: Approximate memory ceiling for all cached values
+            ttl_seconds: Time after which an entry is treated as missing
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        # key -> (expires_at, size, value), least recently used first
+        self._data: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+
+        expires_at, _, value = item
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            logger.debug(f"Value for {key} exceeds cache ceiling, not cached")
+            return
+
+        if key in self._data:
+            self._remove(key)
+
+        self._data[key] = (time.monotonic() + self.ttl_seconds, size, value)
+        self._bytes += size
+        self._evict()
+
+    def delete(self, key: str) -> None:
+        if key in self._data:
+            self._remove(key)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache is within its bounds."""
+        now = time.monotonic()
+        while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+            key, (expires_at, _, _) = next(iter(self._data.items()))
+            self._remove(key)
+            if expires_at <= now:
+                self.expirations += 1
+            else:
+                self.evictions += 1
+
+
+class RedisCache(AsyncCacheBackend):
+    """Cache shared between processes, backed by an asyncio Redis client"""
+
+    def __init__(self, client: Any, prefix: str = "gclearnbot:", ttl_seconds: float = 1800):
+        """
+        Args:
+            client: Object exposing async get/setex/delete/scan_iter (e.g. redis.asyncio.Redis)
+            prefix: Namespace prepended to every key
+            ttl_seconds: Expiry applied to every entry by the server
+        """
+        self.client = client
+        self.prefix = prefix
+        self.ttl_seconds = int(ttl_seconds)
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = await self.client.get(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"Redis cache get failed: {e}")
+            self.errors += 1
+            self.misses += 1
+            return None
+
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any) -> None:
+        try:
+            await self.client.setex(self.prefix + key, self.ttl_seconds, json.dumps(value, default=str))
+        except Exception as e:
+            logger.warning(f"Redis cache set failed: {e}")
+            self.errors += 1
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self.client.delete(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"Redis cache delete failed: {e}")
+            self.errors += 1
+
+    async def clear(self) -> None:
+        try:
+            async for key in self.client.scan_iter(f"{self.prefix}*"):
+                await self.client.delete(key)
+        except Exception as e:
+            logger.warning(f"Redis cache clear failed: {e}")
+            self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            # Evictions happen server-side through TTL and maxmemory policy
+            "evictions": None,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+def create_shared_cache(redis_url: Optional[str], prefix: str = "gclearnbot:",
+                        ttl_seconds: float = 1800) -> Optional[AsyncCacheBackend]:
+    """
+    Create a Redis-backed cache shared between processes, if a URL is configured.
+
+    Args:
+        redis_url: Optional Redis connection URL
+        prefix: Key namespace
+        ttl_seconds: Expiry applied to every entry
+
+    Returns:
+        The shared cache, or None when no URL is set or redis is unavailable
+    """
+    if not redis_url:
+        return None
+    try:
+        import redis.asyncio as aioredis  # Optional dependency, only needed for multi-process deployments
+        client = aioredis.Redis.from_url(redis_url)
+        return RedisCache(client, prefix=prefix, ttl_seconds=ttl_seconds)
+    except ImportError:
+        logger.warning("redis package not installed, using the in-process cache only")
+    except Exception as e:
+        logger.warning(f"Could not set up Redis cache, using the in-process cache only: {e}")
+    return None
@@ -6,53 +6,267 @@ Note: Task processing is temporarily disabled. To re-enable:
 2. Remove temporary return {}
 3. Uncomment original handle_start_choice() code in user_handlers.py
 4. Restart the bot
+
+Content is served from an immutable, versioned ContentSnapshot. Edits to the
+data files are picked up by reload_if_changed(), which the scheduler polls
+every CONTENT_RELOAD_SECONDS, without a restart.
 """
 
+import asyncio
 import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Tuple
 import logging
 import os
-from functools import lru_cache
 
 
 logger = logging.getLogger(__name__)
 
+STEP_KEY_REGEX = re.compile(r"^(?P<lesson>.+)_step_(?P<number>\d+)$")
+
+
+def _frozen(mapping: Dict[str, Any]) -> Mapping[str, Any]:
+    return MappingProxyType(mapping)
+
+
+class ContentIndex:
+    """
+    Immutable lookup tables derived from the content files.
+
+    Built once per load so lesson navigation, progress totals and related
+    content are dictionary lookups instead of scans over every lesson key.
+    """
+
+    def __init__(self, lessons: Dict[str, Any], tasks: Dict[str, Any],
+                 guides: Dict[str, Any], pathways: Dict[str, Any]):
+        self.lessons = _frozen(dict(lessons))
+        self.items = _frozen({
+            'lessons': self.lessons,
+            'tasks': _frozen(dict(tasks)),
+            'guides': _frozen(dict(guides)),
+            'pathways': _frozen(dict(pathways))
+        })
+
+        # Main lesson -> its steps in step-number order
+        steps_by_lesson: Dict[str, List[Tuple[int, str]]] = {}
+        for key in lessons:
+            match = STEP_KEY_REGEX.match(key)
+            if match:
+                steps_by_lesson.setdefault(match.group('lesson'), []).append((int(match.group('number')), key))
+        self.lesson_steps: Mapping[str, Tuple[str, ...]] = _frozen({
+            lesson: tuple(key for _, key in sorted(steps))
+            for lesson, steps in steps_by_lesson.items()
+        })
+        self.step_lesson: Mapping[str, str] = _frozen({
+            step: lesson for lesson, steps in self.lesson_steps.items() for step in steps
+        })
+        # 1-based position of each step across the whole course, in lesson order
+        ordered_steps = [step for key in lessons for step in self.lesson_steps.get(key, ())]
+        self.step_ordinals: Mapping[str, int] = _frozen({
+            step: position for position, step in enumerate(ordered_steps, start=1)
+        })
+        self.total_steps = len(ordered_steps)
+
+        self.full_lessons = _frozen({
+            key: lesson for key, lesson in lessons.items() if '_step_' not in key
+        })
+
+        # Navigation chain from each lesson's "next" pointer
+        self.next_lesson: Mapping[str, Optional[str]] = _frozen({
+            key: lesson.get('next') if isinstance(lesson, dict) else None
+            for key, lesson in lessons.items()
+        })
+        self.prev_lesson: Mapping[str, str] = _frozen({
+            nxt: key for key, nxt in self.next_lesson.items() if nxt
+        })
+
+        # Pathways are referenced by id ("pathway_1"), by tag ("design_thinking")
+        # or by prefixed tag ("pathway_design_thinking")
+        pathway_refs: Dict[str, Dict[str, Any]] = {}
+        for pathway_id, pathway in pathways.items():
+            pathway_refs[pathway_id] = pathway
+            tag = pathway.get('pathway_tag') if isinstance(pathway, dict) else None
+            if tag:
+                pathway_refs.setdefault(tag, pathway)
+                pathway_refs.setdefault(f"pathway_{tag}", pathway)
+        self.pathway_refs = _frozen(pathway_refs)
+        self.pathway_content_order: Mapping[str, Tuple[Tuple[str, str], ...]] = _frozen({
+            pathway_id: tuple((entry.get('type'), entry.get('id')) for entry in pathway.get('content_order', []))
+            for pathway_id, pathway in pathways.items() if isinstance(pathway, dict)
+        })
+
+        # Related content ids per (content_type, id)
+        related: Dict[Tuple[str, str], Mapping[str, Tuple[str, ...]]] = {}
+        for content_type, items in self.items.items():
+            for item_id, item in items.items():
+                if not isinstance(item, dict):
+                    continue
+                related[(content_type, item_id)] = _frozen({
+                    'tasks': tuple(item.get('related_tasks', ())),
+                    'guides': tuple(item.get('related_guides', item.get('guides', ()))),
+                    'pathways': tuple(item.get('pathways', ()))
+                })
+        self._related = related
+
+    def first_step(self, lesson_id: str) -> Optional[str]:
+        steps = self.lesson_steps.get(lesson_id)
+        return steps[0] if steps else None
+
+    def related_ids(self, content_type: str, content_id: str) -> Mapping[str, Tuple[str, ...]]:
+        return self._related.get((content_type, content_id), _frozen({'tasks': (), 'guides': (), 'pathways': ()}))
+
+
+class ContentSnapshot:
+    """
+    One consistent, versioned view of all content files and their index.
+
+    Snapshots are never modified once built; a reload builds a new one and
+    swaps it in, so a request that holds a snapshot sees one content version
+    from start to finish.
+    """
+
+    def __init__(self, version: int, content: Dict[str, Dict[str, Any]], mtimes: Dict[str, Optional[int]]):
+        self.version = version
+        self.content = content
+        self.mtimes = mtimes
+        self.loaded_at = time.time()
+        self.index = ContentIndex(
+            lessons=content['lessons'],
+            tasks=content['tasks'].get('tasks', {}),
+            guides=content['guides'].get('guides', {}),
+            pathways=content['pathways'].get('pathways', {})
+        )
+
 
 class ContentLoader:
     """Handles loading of various content types (lessons, tasks, guides, pathways)"""
+
+    CONTENT_TYPES = ('lessons', 'tasks', 'guides', 'pathways')
     
     def __init__(self):
         self.base_dir = Path(__file__).resolve().parent.parent
         self.data_dir = self.base_dir / 'data'
+        self._snapshot: Optional[ContentSnapshot] = None
+        self._reload_lock = threading.Lock()
+        self._failed_mtimes: Optional[Dict[str, Optional[int]]] = None
+
+    @property
+    def snapshot(self) -> ContentSnapshot:
+        """The current content snapshot, loaded on first access."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._reload_lock:
+                if self._snapshot is None:
+                    self._snapshot = self._build_snapshot(version=1, strict=False)
+                snapshot = self._snapshot
+        return snapshot
+
+    @property
+    def index(self) -> ContentIndex:
+        """Index of the current content snapshot."""
+        return self.snapshot.index
 
-    @lru_cache(maxsize=1)
     def load_content(self, content_type: str) -> Dict[str, Any]:
+        """
+        Get one content file from the current snapshot.
+        """
+        return self.snapshot.content.get(content_type, {})
+
+    def reload_if_changed(self) -> bool:
+        """
+        Rebuild the snapshot if any content file changed on disk.
+
+        Blocking (file I/O and JSON parsing); run it off the event loop. A file
+        that fails to parse leaves the current snapshot in place.
+
+        Returns:
+            True if a new snapshot was swapped in
+        """
+        with self._reload_lock:
+            current = self._snapshot
+            mtimes = self._mtimes()
+            if current is not None and mtimes in (current.mtimes, self._failed_mtimes):
+                return False
+            version = current.version + 1 if current is not None else 1
+            try:
+                snapshot = self._build_snapshot(version, strict=current is not None)
+            except Exception as e:
+                # Don't retry until the files change again
+                self._failed_mtimes = mtimes
+                logger.error(f"Content reload failed, keeping version {current.version}: {e}")
+                return False
+            # Single reference assignment: readers see either the old or the new snapshot
+            self._snapshot = snapshot
+        logger.info(f"Content reloaded as version {snapshot.version}")
+        return True
+
+    async def reload_async(self) -> bool:
+        """reload_if_changed() on a worker thread, for the scheduler."""
+        return await asyncio.to_thread(self.reload_if_changed)
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self.snapshot
+        return {
+            "version": snapshot.version,
+            "loaded_at": datetime.fromtimestamp(snapshot.loaded_at, timezone.utc).isoformat(),
+            "lessons": len(snapshot.content['lessons']),
+            "steps": snapshot.index.total_steps
+        }
+
+    def _mtimes(self) -> Dict[str, Optional[int]]:
+        mtimes = {}
+        for content_type in self.CONTENT_TYPES:
+            try:
+                mtimes[content_type] = (self.data_dir / f"{content_type}.json").stat().st_mtime_ns
+            except OSError:
+                mtimes[content_type] = None
+        return mtimes
+
+    def _build_snapshot(self, version: int, strict: bool) -> ContentSnapshot:
+        # Stat before reading so an edit made during the read triggers another reload
+        mtimes = self._mtimes()
+        content = {
+            content_type: self._read_file(content_type, strict)
+            for content_type in self.CONTENT_TYPES
+        }
+        return ContentSnapshot(version, content, mtimes)
+
+    def _read_file(self, content_type: str, strict: bool) -> Dict[str, Any]:
         """
         Load content from JSON files with detailed error checking.
+
+        Args:
+            content_type: Name of the file in the data directory, without extension
+            strict: Raise on errors instead of returning empty content
         """
         try:
             file_path = self.data_dir / f"{content_type}.json"
             
             if not file_path.exists():
-                logger.error(f"{content_type} file not found at {file_path}")
-                return {}
+                raise FileNotFoundError(f"{content_type} file not found at {file_path}")
                 
             with open(file_path, 'r', encoding='utf-8') as f:
-                raw_content = f.read()
-                logger.info(f"Raw content from {content_type}.json: {raw_content[:200]}...")
-                
-                content = json.loads(raw_content)
-                logger.info(f"Parsed {content_type} structure: {list(content.keys()) if isinstance(content, dict) else 'not a dict'}")
+                content = json.load(f)
+                # Keys only, and only at debug level: logging the raw file on every load slows startup
+                logger.debug(f"Parsed {content_type} structure: {list(content.keys()) if isinstance(content, dict) else 'not a dict'}")
                 
                 # Return the full content instead of trying to get inner content
                 return content
                 
         except json.JSONDecodeError as e:
             logger.error(f"Invalid JSON in {content_type} file: {e}")
+            if strict:
+                raise
             return {}
         except Exception as e:
             logger.error(f"Error loading {content_type}: {e}")
+            if strict:
+                raise
             return {}
         
     def format_for_platform(self, content: Dict[str, Any], platform: str = 'telegram') -> Dict[str, Any]:
@@ -71,17 +285,14 @@ class ContentLoader:
 
     def _format_for_slack(self, content: Dict[str, Any]) -> Dict[str, Any]:
         """Format content specifically for Slack."""
+        # Collections of lessons pass through untouched; only single items get blocks
+        if 'text' not in content:
+            return content
         formatted = content.copy()
         
-        # Convert Telegram markdown to Slack mrkdwn
+        # Telegram markdown (*bold*, _italic_, `code`) is already valid Slack mrkdwn
         if 'text' in formatted:
             text = formatted['text']
-            # Convert Telegram markdown to Slack mrkdwn
-            text = text.replace('*', '*')  # Bold remains the same
-            text = text.replace('_', '_')  # Italic remains the same
-            text = text.replace('`', '`')  # Code remains the same
-            text = text.replace('\n', '\n')  # Newlines remain the same
-            formatted['text'] = text
             
             # Add Slack-specific blocks if needed
             formatted['blocks'] = [{
@@ -134,59 +345,39 @@ class ContentLoader:
 
     def get_full_lessons(self, platform: str = 'telegram') -> Dict[str, Any]:
         """Get main lessons (not steps) formatted for specified platform."""
-        lessons = self.load_content('lessons')
-        full_lessons = {
-            lesson_id: lesson for lesson_id, lesson in lessons.items()
-            if not '_step_' in lesson_id
-        }
-        return self.format_for_platform(full_lessons, platform)
+        return self.format_for_platform(dict(self.index.full_lessons), platform)
 
     def get_lesson_steps(self, lesson_id: str, platform: str = 'telegram') -> Dict[str, Any]:
         """Get all steps for a specific lesson formatted for specified platform."""
-        lessons = self.load_content('lessons')
+        index = self.index
         steps = {
-            step_id: step for step_id, step in lessons.items()
-            if step_id.startswith(f"{lesson_id}_step_")
+            step_id: index.lessons[step_id] for step_id in index.lesson_steps.get(lesson_id, ())
         }
         return self.format_for_platform(steps, platform)
 
     def get_related_content(self, content_id: str, content_type: str, platform: str = 'telegram') -> Dict[str, Any]:
         """Get related content formatted for specified platform."""
-        content = self.load_content(content_type)
-        item = content.get(content_id, {})
-        
+        index = self.index
+        related_ids = index.related_ids(content_type, content_id)
+        tasks, guides = index.items['tasks'], index.items['guides']
+
         related = {
-            'tasks': [],
-            'guides': [],
-            'pathways': []
-        }
-        
-        # Get related content
-        if 'related_tasks' in item:
-            tasks = self.load_content('tasks')
-            related['tasks'] = [
-                tasks[task_id] for task_id in item['related_tasks']
-                if task_id in tasks
+            'tasks': [tasks[task_id] for task_id in related_ids['tasks'] if task_id in tasks],
+            'guides': [guides[guide_id] for guide_id in related_ids['guides'] if guide_id in guides],
+            'pathways': [
+                index.pathway_refs[pathway_id] for pathway_id in related_ids['pathways']
+                if pathway_id in index.pathway_refs
             ]
-            
-        if 'related_guides' in item:
-            guides = self.load_content('guides')
-            related['guides'] = [
-                guides[guide_id] for guide_id in item['related_guides']
-                if guide_id in guides
-            ]
-            
-        if 'pathways' in item:
-            pathways = self.load_content('pathways')
-            related['pathways'] = [
-                pathways[pathway_id] for pathway_id in item['pathways']
-                if pathway_id in pathways
-            ]
-            
+        }
         return self.format_for_platform(related, platform)
 
     def validate_content_structure(self) -> None:
         """Validate the structure of loaded content files and log any issues."""
+        index = self.index
+        logger.info(
+            f"Content index: {len(index.lesson_steps)} lessons, {index.total_steps} steps, "
+            f"{len(index.pathway_content_order)} pathways"
+        )
         content = self.load_content('tasks')
         logger.info("Validating content structure...")
         
@@ -1,5 +1,7 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne, ReturnDocument, monitoring
+from bson import ObjectId
+from bson.errors import InvalidId
 from pymongo.errors import ServerSelectionTimeoutError, OperationFailure
 import certifi
 from config.settings import Config
@@ -9,11 +11,17 @@ from datetime import datetime, timezone, timedelta
 from typing import Dict, Optional, Any, List
 from services.content_loader import content_loader
 from services.utils import extract_keywords_from_response
-from services.lesson_helpers import get_lesson_structure, is_actual_lesson, get_total_lesson_steps
+from services.lesson_helpers import get_lesson_structure
 import time
 import asyncio
 from collections import Counter
 from services.feedback_templates import FEEDBACK_TEMPLATES
+from services.cache import LRUTTLCache
+from services.streaks import StreakEngine
+from services.user_cache import UserCache
+from services.unit_of_work import UnitOfWork
+from services.readiness import Readiness
+from services.pagination import encode_cursor, decode_cursor
 
 # Configure logging
 logging.basicConfig(
@@ -23,63 +31,230 @@ logging.basicConfig(
 logger = logging.getLogger(__name__) # Get logger instance
 
 
-lessons = content_loader.load_content('lessons')
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Counts connection pool (CMAP) events for the shared client"""
+
+    def __init__(self):
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.checked_in = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+        self._checkout_wait_total = 0.0
+        self._checkout_wait_max = 0.0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self.pool_clears += 1
+
+    def connection_created(self, event):
+        self.created += 1
+
+    def connection_closed(self, event):
+        self.closed += 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        self.checked_out += 1
+        # pymongo >= 4.7 reports how long the checkout waited
+        duration = getattr(event, "duration", None)
+        if duration is not None:
+            self._checkout_wait_total += duration
+            self._checkout_wait_max = max(self._checkout_wait_max, duration)
+
+    def connection_checked_in(self, event):
+        self.checked_in += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "open_connections": self.created - self.closed,
+            "in_use": self.checked_out - self.checked_in,
+            "created": self.created,
+            "closed": self.closed,
+            "checkouts": self.checked_out,
+            "checkout_failures": self.checkout_failures,
+            "pool_cleared": self.pool_clears,
+            "avg_checkout_wait_ms": round(self._checkout_wait_total / self.checked_out * 1000, 3)
+            if self.checked_out and self._checkout_wait_total else None,
+            "max_checkout_wait_ms": round(self._checkout_wait_max * 1000, 3)
+            if self._checkout_wait_total else None
+        }
 
 
-# Create directories for storage
-async def init_mongodb(max_retries=3, retry_delay=2):
-    """Initialize MongoDB connection with retry mechanism and health check."""
-    global db  # Modify the global db variable
-    
-    for attempt in range(max_retries):
-        try:
-            MONGODB_URI = Config.MONGODB_URI
-            if not MONGODB_URI:
-                raise ValueError("MONGODB_URI environment variable not set!")
-
-            client = AsyncIOMotorClient(
-                MONGODB_URI,
-                tlsCAFile=certifi.where(),
-                serverSelectionTimeoutMS=5000
-            )
-
-            # Test connection
-            await client.admin.command('ping')
+class MongoClientManager:
+    """
+    Owns the single Motor client shared by the whole process.
+
+    connect() is idempotent: the first caller creates the client with the pool
+    settings from Config, warms up minPoolSize connections and creates indexes;
+    later callers get the same database back.
+    """
+
+    def __init__(self):
+        self.client: Optional[AsyncIOMotorClient] = None
+        self.database = None
+        self.pool_listener = PoolStatsListener()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def connect(self, max_retries: int = 3, retry_delay: float = 2):
+        if self.database is not None:
+            return self.database
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.database is None:
+                started = time.monotonic()
+                try:
+                    self.database = await self._connect(max_retries, retry_delay)
+                except Exception as e:
+                    Readiness.mark_failed("mongodb", e)
+                    raise
+                db.bind(self.database)
+                Readiness.mark_ready("mongodb", started)
+        return self.database
+
+    async def _connect(self, max_retries: int, retry_delay: float):
+        for attempt in range(max_retries):
+            try:
+                MONGODB_URI = Config.MONGODB_URI
+                if not MONGODB_URI:
+                    raise ValueError("MONGODB_URI environment variable not set!")
+
+                client = AsyncIOMotorClient(
+                    MONGODB_URI,
+                    tlsCAFile=certifi.where(),
+                    serverSelectionTimeoutMS=5000,
+                    maxPoolSize=Config.MONGODB_MAX_POOL_SIZE,
+                    minPoolSize=Config.MONGODB_MIN_POOL_SIZE,
+                    maxIdleTimeMS=Config.MONGODB_MAX_IDLE_TIME_MS,
+                    waitQueueTimeoutMS=Config.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+                    event_listeners=[self.pool_listener]
+                )
 
-            # Get database
-            db = client["gclearnbot"]
+                # Test connection and open minPoolSize connections up front
+                await self._warm_up(client)
 
-            # Ensure required collections and indices exist
-            await asyncio.gather(
-                db.users.create_index("email", unique=True),
-                db.journals.create_index("user_id"),
-                _ensure_collection_with_index(db, "user_skills", "user_id"),
-                _ensure_collection_with_index(db, "learning_insights", "user_id"),
-                db.feedback_analytics.create_index("user_id"),
-                db.feedback_analytics.create_index([("user_id", 1), ("entries.lesson_id", 1)])
-            )
+                # Get database
+                database = client["gclearnbot"]
 
-            # Database health check to ensure collections are accessible
-            try:
+                # Ensure required collections and indices exist
                 await asyncio.gather(
-                    db.users.find_one(),
-                    db.journals.find_one(),
-                    db.learning_insights.find_one()
+                    database.users.create_index("email", unique=True),
+                    database.users.create_index("joined_date"),
+                    database.users.create_index([("platform", 1), ("last_active", 1), ("_id", 1)]),
+                    database.users.create_index([("platforms", 1), ("last_active", 1), ("_id", 1)]),
+                    database.journals.create_index("user_id"),
+                    database.journal_entries.create_index([("user_id", 1), ("timestamp", -1), ("_id", -1)]),
+                    database.journal_entries.create_index([("lesson", 1), ("timestamp", -1)]),
+                    # Backs the migration's upserts on (user, timestamp, lesson)
+                    database.journal_entries.create_index(
+                        [("user_id", 1), ("timestamp", 1), ("lesson", 1)], unique=True
+                    ),
+                    _ensure_collection_with_index(database, "user_skills", "user_id"),
+                    _ensure_collection_with_index(database, "learning_insights", "user_id"),
+                    database.feedback_analytics.create_index("user_id"),
+                    database.feedback_analytics.create_index([("user_id", 1), ("entries.lesson_id", 1)])
                 )
-                logger.info("Database health check passed.")
+
+                # Database health check to ensure collections are accessible
+                try:
+                    await asyncio.gather(
+                        database.users.find_one(),
+                        database.journal_entries.find_one(),
+                        database.learning_insights.find_one()
+                    )
+                    logger.info("Database health check passed.")
+                except Exception as e:
+                    logger.error(f"Database health check failed: {e}")
+                    raise
+
+                self.client = client
+                logger.info("MongoDB connection successful")
+                return database
+
             except Exception as e:
-                logger.error(f"Database health check failed: {e}")
-                raise
+                if attempt == max_retries - 1:
+                    logger.error(f"MongoDB connection error after {max_retries} attempts: {e}")
+                    raise
+                logger.warning(f"Attempt {attempt + 1} failed, retrying in {retry_delay}s...")
+                await asyncio.sleep(retry_delay)
+
+    async def _warm_up(self, client: AsyncIOMotorClient) -> None:
+        """Open minPoolSize connections concurrently instead of on the first requests."""
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            client.admin.command('ping') for _ in range(max(Config.MONGODB_MIN_POOL_SIZE, 1))
+        ))
+        logger.info(
+            f"MongoDB pool warmed up: {self.pool_listener.stats()['open_connections']} connections "
+            f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+
+    def close(self) -> None:
+        if self.client is not None:
+            self.client.close()
+        self.client = None
+        self.database = None
+        db.bind(None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self.database is not None,
+            "max_pool_size": Config.MONGODB_MAX_POOL_SIZE,
+            "min_pool_size": Config.MONGODB_MIN_POOL_SIZE,
+            **self.pool_listener.stats()
+        }
 
-            logger.info("MongoDB connection successful")
-            return db
 
-        except Exception as e:
-            if attempt == max_retries - 1:
-                logger.error(f"MongoDB connection error after {max_retries} attempts: {e}")
-                raise
-            logger.warning(f"Attempt {attempt + 1} failed, retrying in {retry_delay}s...")
-            await asyncio.sleep(retry_delay)
+class DatabaseProxy:
+    """
+    Stable handle for the shared database.
+
+    Modules import `db` once at import time, before a connection exists; the
+    proxy forwards to whichever database MongoClientManager has bound.
+    """
+
+    def __init__(self):
+        self._database = None
+
+    def bind(self, database) -> None:
+        self._database = database
+
+    def __getattr__(self, name: str):
+        if self._database is None:
+            raise RuntimeError("MongoDB is not initialized; await get_db() first")
+        return getattr(self._database, name)
+
+    def __getitem__(self, name: str):
+        if self._database is None:
+            raise RuntimeError("MongoDB is not initialized; await get_db() first")
+        return self._database[name]
+
+
+db = DatabaseProxy()
+mongo = MongoClientManager()
+
+
+async def init_mongodb(max_retries=3, retry_delay=2):
+    """Initialize the shared MongoDB client (once) with retries and health check."""
+    return await mongo.connect(max_retries, retry_delay)
 
 async def _ensure_collection_with_index(db, collection_name, index_field):
     """Ensure a collection exists and create an index if needed."""
@@ -261,7 +436,7 @@ class DataValidator:
                 return False
             
             # Validate lesson exists
-            if entry["lesson"] not in lessons:
+            if entry["lesson"] not in content_loader.load_content('lessons'):
                 logger.error(f"Invalid lesson: {entry['lesson']}")
                 return False
                 
@@ -277,9 +452,14 @@ class UserManager:
     async def get_user_by_telegram_id(telegram_id: int) -> Optional[Dict[str, Any]]:
         """Get user by Telegram ID with improved logging"""
         try:
+            user = UserCache.get("telegram_id", telegram_id)
+            if user and "telegram" in user.get("platforms", []):
+                return user
+
             user = await db.users.find_one({"telegram_id": telegram_id, "platforms": "telegram"})
             if user:
                 user.pop('_id', None)
+                UserCache.put(user)
                 logger.info(f"Found user for Telegram ID {telegram_id}")
             else:
                 logger.info(f"No user found for Telegram ID {telegram_id}")
@@ -308,6 +488,7 @@ class UserManager:
                     }
                 }
             )
+            UserCache.invalidate("email", email)
             success = result.modified_count > 0
             if success:
                 logger.info(f"Successfully linked Telegram account {telegram_id} to email {masked_email}")
@@ -384,6 +565,7 @@ class UserManager:
                 update_fields,
                 upsert=True
             )
+            UserCache.invalidate("user_id", user_id)
 
             if not result.acknowledged:
                 raise OperationFailure("Failed to save user data")
@@ -410,6 +592,10 @@ class UserManager:
             # Convert user_id to string if it's not already
             user_id = str(user_id)
 
+            user_data = UserCache.get("user_id", user_id)
+            if user_data and user_data.get("platform") == platform and "current_lesson" in user_data:
+                return user_data
+
             user_data = await db.users.find_one(
                 {"user_id": user_id, "platform": platform}
             )
@@ -424,6 +610,7 @@ class UserManager:
                     )
                 
                 user_data.pop('_id', None)  # Remove MongoDB ID
+                UserCache.put(user_data)
                 return user_data
                 
             return None
@@ -444,11 +631,16 @@ class UserManager:
             Dictionary containing user information or None if not found
         """
         try:
+            user_data = UserCache.get("email", email)
+            if user_data:
+                return user_data
+
             user_data = await db.users.find_one(
                 {"email": email}
             )
             if user_data:
                 user_data.pop("_id", None)  # Remove MongoDB ID
+                UserCache.put(user_data)
                 return user_data
             return None
 
@@ -476,6 +668,7 @@ class UserManager:
                 {"$set": data},
                 upsert=True
             )
+            UserCache.invalidate("user_id", user_id)
 
             return result.modified_count > 0 or result.upserted_id is not None
 
@@ -486,79 +679,98 @@ class UserManager:
     @staticmethod
     def get_lesson_structure():
         """Helper method to understand lesson hierarchy"""
-        lesson_structure = {}
-        for key in lessons.keys():
-            if "_step_" in key:
-                main_lesson = key.split("_step_")[0]
-                if main_lesson not in lesson_structure:
-                    lesson_structure[main_lesson] = []
-                lesson_structure[main_lesson].append(key)
-        return lesson_structure
+        return get_lesson_structure()
 
     @staticmethod
-    async def update_user_progress(user_id: int, lesson_key: str) -> bool:
+    async def update_user_progress(user_id: int, lesson_key: str, expected_lesson: Optional[str] = None) -> bool:
         """
-        Update user's progress with enhanced metrics and proper step tracking.
-        """
-        try:
-            # Log the start of progress update
-            logger.info(f"Starting progress update for user {user_id} to lesson {lesson_key}")
+        Move a user to a lesson, recording the lesson they were on as completed.
 
-            if lesson_key not in lessons:
-                logger.error(f"Invalid lesson key: {lesson_key}")
-                return False
+        This is a single conditional update: an update pipeline adds the
+        previous current_lesson to completed_lessons and recomputes
+        completion_rate and total_responses server-side, so concurrent or
+        repeated calls (e.g. a double-tapped ✅) cannot interleave and
+        moving to the lesson the user is already on changes nothing.
 
-            # Get current user data - properly await the async operation
-            user_data = await db.users.find_one({"user_id": user_id})
+        Args:
+            user_id: The user's ID
+            lesson_key: The lesson or step to move to
+            expected_lesson: If given, only move a user whose current_lesson is still this one
 
-            if not user_data:
-                logger.error(f"User {user_id} not found")
+        Returns:
+            True if the user is now on lesson_key, False otherwise
+        """
+        try:
+            user_id = str(user_id)
+            index = content_loader.index
+            if lesson_key not in index.lessons:
+                logger.error(f"Invalid lesson key: {lesson_key}")
                 return False
 
-            # Only update if this is a new step
-            current_lesson = user_data.get('current_lesson')
-            if current_lesson == lesson_key:
+            # Usually already cached by this request/update
+            cached = UserCache.get("user_id", user_id)
+            if cached is not None and cached.get('current_lesson') == lesson_key:
                 logger.info(f"User {user_id} already on lesson {lesson_key}")
                 return True
 
-            # Log the actual progression
-            logger.info(f"User {user_id} moving from {current_lesson} to {lesson_key}")
-
             current_date = datetime.now(timezone.utc).isoformat()
-
-            # Update completed lessons - properly await the async operation
-            await db.users.update_one(
-                    {"user_id": user_id},
-                    {"$addToSet": {"completed_lessons": current_lesson}}
-                )
-
-            # Calculate completion metrics
-            completed_lessons = user_data.get('completed_lessons', [])
-            completed_lessons.append(current_lesson)  # Include current lesson
-            completed_steps = [lesson for lesson in completed_lessons if is_actual_lesson(lesson)]
-            total_steps = get_total_lesson_steps()
-
-            # Calculate completion rate
-            completion_rate = (len(completed_steps) / total_steps * 100) if total_steps > 0 else 0
-
-            # Update progress metrics - properly await the async operation
-            result = await db.users.update_one(
-                    {"user_id": user_id},
+            total_steps = index.total_steps
+            completed = {"$ifNull": ["$completed_lessons", []]}
+            completed_steps = {"$size": {"$filter": {
+                "input": "$completed_lessons",
+                "cond": {"$and": [
+                    {"$eq": [{"$type": "$$this"}, "string"]},
+                    {"$regexMatch": {"input": "$$this", "regex": "_step_"}}
+                ]}
+            }}}
+
+            query: Dict[str, Any] = {"user_id": user_id}
+            query["current_lesson"] = expected_lesson if expected_lesson is not None else {"$ne": lesson_key}
+
+            user = await db.users.find_one_and_update(
+                query,
+                [
+                    # Record the lesson being left, once, keeping completion order
+                    {"$set": {"completed_lessons": {"$cond": [
+                        {"$or": [
+                            {"$ne": [{"$type": "$current_lesson"}, "string"]},
+                            {"$in": ["$current_lesson", completed]}
+                        ]},
+                        completed,
+                        {"$concatArrays": [completed, ["$current_lesson"]]}
+                    ]}}},
                     {"$set": {
-                        "current_lesson": lesson_key,
+                        "current_lesson": {"$literal": lesson_key},
                         "last_active": current_date,
                         "progress_metrics.last_lesson_date": current_date,
-                        "progress_metrics.completion_rate": round(completion_rate, 2),
-                        "progress_metrics.total_responses": len(completed_steps)
+                        "progress_metrics.total_responses": completed_steps,
+                        "progress_metrics.completion_rate": {"$round": [
+                            {"$multiply": [{"$divide": [completed_steps, total_steps]}, 100]}, 2
+                        ]} if total_steps > 0 else 0
                     }}
+                ],
+                return_document=ReturnDocument.AFTER
+            )
+
+            if user is None:
+                # Nothing moved: already on this lesson, moved elsewhere meanwhile, or unknown
+                UserCache.invalidate("user_id", user_id)
+                current = await db.users.find_one({"user_id": user_id}, {"current_lesson": 1})
+                if current is None:
+                    logger.error(f"User {user_id} not found")
+                    return False
+                if current.get('current_lesson') == lesson_key:
+                    logger.info(f"User {user_id} already on lesson {lesson_key}")
+                    return True
+                logger.warning(
+                    f"Progress for user {user_id} not updated: expected {expected_lesson}, "
+                    f"found {current.get('current_lesson')}"
                 )
+                return False
 
-            success = result.modified_count > 0
-            if success:
-                logger.info(f"Progress updated for user {user_id}: moved from {current_lesson} to {lesson_key}")
-            else:
-                logger.warning(f"No progress updated for user {user_id}")
-            return success
+            UserCache.put(user)
+            logger.info(f"Progress updated for user {user_id}: now on {lesson_key}")
+            return True
 
         except Exception as e:
             logger.error(f"Error updating progress for user {user_id}: {e}", exc_info=True)
@@ -574,6 +786,7 @@ class UserManager:
                     "learning_preferences": preferences
                 }}
             )
+            UserCache.invalidate("user_id", user_id)
             return result.modified_count > 0
         except Exception as e:
             logger.error(f"Error updating preferences for user {user_id}: {e}")
@@ -582,7 +795,94 @@ class UserManager:
 
 
 class JournalManager:
-    """Manages journal operations in MongoDB with improved data quality and validation"""
+    """
+    Manages journal operations in MongoDB with improved data quality and validation.
+
+    Each response is stored as its own document in the `journal_entries`
+    collection, indexed on (user_id, timestamp, _id) and (lesson, timestamp),
+    with (user_id, timestamp, lesson) unique.
+    Older deployments kept every response in an `entries` array on a single
+    `journals` document per user. While JOURNAL_STORAGE_MODE is "dual", those
+    arrays are migrated online: lazily per user on first read, and in bulk by
+    migrate_embedded_journals(). Set the mode to "entries" once the migration
+    has finished to skip the legacy check.
+    """
+
+    # Users recently seen with their legacy journal migrated (or never existed).
+    # Bounded: an evicted user costs one indexed lookup on `journals` to re-check.
+    _migrated_users = LRUTTLCache(max_entries=10000, ttl_seconds=3600)
+
+    @staticmethod
+    def _entry_projection() -> Dict[str, int]:
+        return {"_id": 0, "user_id": 0}
+
+    @staticmethod
+    async def migrate_user_journal(user_id: str) -> int:
+        """
+        Copy a user's embedded journal entries into `journal_entries`.
+
+        The copy is idempotent (entries are upserted on user, timestamp and lesson)
+        so an interrupted migration can simply be re-run.
+
+        Returns:
+            Number of entries copied
+        """
+        user_id = str(user_id)
+        legacy = await db.journals.find_one(
+            {"user_id": user_id, "migrated_at": {"$exists": False}}
+        )
+        if not legacy:
+            JournalManager._migrated_users.set(user_id, True)
+            return 0
+
+        entries = legacy.get("entries", [])
+        if entries:
+            operations = [
+                UpdateOne(
+                    {"user_id": user_id, "timestamp": entry.get("timestamp"), "lesson": entry.get("lesson")},
+                    {"$setOnInsert": {**entry, "user_id": user_id}},
+                    upsert=True
+                )
+                for entry in entries
+            ]
+            await db.journal_entries.bulk_write(operations, ordered=False)
+
+        await db.journals.update_one(
+            {"_id": legacy["_id"]},
+            {"$set": {"migrated_at": datetime.now(timezone.utc).isoformat()}}
+        )
+        JournalManager._migrated_users.set(user_id, True)
+        logger.info(f"Migrated {len(entries)} journal entries for user {user_id}")
+        return len(entries)
+
+    @staticmethod
+    async def migrate_embedded_journals(batch_size: int = 100) -> int:
+        """
+        Migrate every remaining embedded journal, streaming legacy documents in batches.
+
+        Returns:
+            Number of user journals migrated
+        """
+        migrated = 0
+        try:
+            cursor = db.journals.find(
+                {"migrated_at": {"$exists": False}},
+                {"user_id": 1}
+            ).batch_size(batch_size)
+            async for legacy in cursor:
+                await JournalManager.migrate_user_journal(legacy["user_id"])
+                migrated += 1
+            logger.info(f"Journal migration finished: {migrated} journals migrated")
+        except Exception as e:
+            logger.error(f"Journal migration stopped after {migrated} journals: {e}", exc_info=True)
+        return migrated
+
+    @staticmethod
+    async def _ensure_migrated(user_id: str) -> None:
+        """In dual mode, migrate a user's legacy journal before reading their entries."""
+        if Config.JOURNAL_STORAGE_MODE != "dual" or JournalManager._migrated_users.get(user_id):
+            return
+        await JournalManager.migrate_user_journal(user_id)
     
     @staticmethod
     async def save_journal_entry(user_id: str, lesson_key: str, response: str, keywords: Optional[Dict[str, List[str]]] = None) -> bool:
@@ -603,13 +903,14 @@ class JournalManager:
                 logger.warning(f"Empty response from user {user_id}")
                 return False
 
-            if lesson_key not in lessons:
+            if lesson_key not in content_loader.load_content('lessons'):
                 logger.error(f"Invalid lesson key: {lesson_key}")
                 return False
 
             # Prepare journal entry
+            now = datetime.now(timezone.utc)
             entry = {
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": now.isoformat(),
                 "lesson": lesson_key,
                 "response": response.strip(),
                 "response_length": len(response.strip()),
@@ -622,19 +923,18 @@ class JournalManager:
                 logger.error(f"Invalid journal entry for user {user_id}")
                 return False
 
-            # Update or create journal document
-            result = await db.journals.update_one(
-                {"user_id": user_id},
-                {
-                    "$push": {"entries": entry},
-                    "$setOnInsert": {
-                        "created_at": datetime.now(timezone.utc).isoformat()
-                    }
-                },
-                upsert=True
+            # One document per response, with the user's running metrics updated alongside
+            result, metrics_updated = await asyncio.gather(
+                db.journal_entries.insert_one({**entry, "user_id": user_id}),
+                AnalyticsManager.record_journal_entry(
+                    user_id, entry["timestamp"], entry["response_length"], now.date().toordinal()
+                )
             )
 
             if result.acknowledged:
+                if not metrics_updated:
+                    # First entry since incremental metrics were introduced
+                    await AnalyticsManager.rebuild_journal_metrics(user_id)
                 logger.info(f"Journal entry saved for user {user_id} in lesson {lesson_key}")
                 return True
 
@@ -645,56 +945,150 @@ class JournalManager:
             logger.error(f"Error saving journal entry for user {user_id}: {e}", exc_info=True)
             return False
 
-
     @staticmethod
-    async def get_user_journal(user_id: int, page: int = 1, per_page: int = 10) -> Optional[Dict[str, Any]]:
-        """Get a user's journal entries with pagination."""
+    async def get_user_entries(user_id: str) -> List[Dict[str, Any]]:
+        """Get all of a user's journal entries, oldest first."""
+        user_id = str(user_id)
         try:
-            # Calculate skip value
-            skip = (page - 1) * per_page
+            await JournalManager._ensure_migrated(user_id)
+            cursor = db.journal_entries.find(
+                {"user_id": user_id},
+                JournalManager._entry_projection()
+            ).sort("timestamp", 1)
+            return await cursor.to_list(length=None)
+        except Exception as e:
+            logger.error(f"Error retrieving journal entries for user {user_id}: {e}")
+            return []
 
-            pipeline = [
-                {"$match": {"user_id": user_id}},
-                # First get total count
-                {
-                    "$facet": {
-                        "metadata": [{"$count": "total"}],
-                        "entries": [
-                            {"$unwind": "$entries"},
-                            {"$sort": {"entries.timestamp": -1}},
-                            {"$skip": skip},
-                            {"$limit": per_page},
-                            {
-                                "$group": {
-                                    "_id": "$_id",
-                                    "entries": {"$push": "$entries"}
-                                }
-                            }
-                        ]
-                    }
-                }
+    @staticmethod
+    async def iter_export(since: Optional[str] = None, until: Optional[str] = None,
+                          lesson: Optional[str] = None, user_id: Optional[str] = None,
+                          after_id: Optional[ObjectId] = None, batch_size: int = 500):
+        """
+        Stream journal entries for export in _id order.
+
+        Entries are fetched from the cursor batch_size at a time, so memory is
+        bounded by the batch rather than by the collection. Ordering by _id uses
+        the primary index (no in-memory sort) and lets an export resume after
+        the last _id a client received.
+
+        Args:
+            since: Only entries with timestamp >= this ISO string
+            until: Only entries with timestamp < this ISO string
+            lesson: Only entries for this lesson
+            user_id: Only entries for this user
+            after_id: Resume after this entry _id
+            batch_size: Documents fetched per round trip
+
+        Yields:
+            Journal entry documents, including _id
+        """
+        query: Dict[str, Any] = {}
+        if since or until:
+            query["timestamp"] = {}
+            if since:
+                query["timestamp"]["$gte"] = since
+            if until:
+                query["timestamp"]["$lt"] = until
+        if lesson:
+            query["lesson"] = lesson
+        if user_id:
+            query["user_id"] = str(user_id)
+        if after_id is not None:
+            query["_id"] = {"$gt": after_id}
+
+        cursor = db.journal_entries.find(query).sort("_id", 1).batch_size(batch_size)
+        async for entry in cursor:
+            yield entry
+
+    @staticmethod
+    async def get_journal_page(user_id: str, cursor: Optional[str] = None, per_page: int = 10,
+                               newest_first: bool = True) -> Dict[str, Any]:
+        """
+        Get one page of a user's journal using keyset pagination.
+
+        Pages are anchored on the (timestamp, _id) of the entry at their edge
+        and read straight off the (user_id, timestamp, _id) index, so every
+        page costs the same regardless of how deep it is.
+
+        Args:
+            user_id: The user's ID
+            cursor: Opaque token from a previous page's next_cursor/prev_cursor; None for the first page
+            per_page: Entries per page
+            newest_first: Order of entries in each page and across pages
+
+        Returns:
+            Dictionary with entries, next_cursor and prev_cursor (None at either end)
+
+        Raises:
+            ValueError: If the cursor is not a valid token
+        """
+        user_id = str(user_id)
+        position = decode_cursor(cursor) if cursor else None
+        query: Dict[str, Any] = {"user_id": user_id}
+        backwards = False
+        if position is not None:
+            try:
+                anchor_ts, anchor_id = str(position["ts"]), ObjectId(position["id"])
+            except (KeyError, TypeError, InvalidId) as e:
+                raise ValueError("Invalid cursor token") from e
+            backwards = position.get("dir") == "prev"
+            # Walking forward in display order means older entries when newest come first
+            op = "$lt" if newest_first != backwards else "$gt"
+            query["$or"] = [
+                {"timestamp": {op: anchor_ts}},
+                {"timestamp": anchor_ts, "_id": {op: anchor_id}}
             ]
 
-            result = await db.journals.aggregate(pipeline).to_list(None)
-            
-            if not result or not result[0].get('entries'):
-                return None
-                
-            # Get total count and entries
-            total = result[0]['metadata'][0]['total'] if result[0]['metadata'] else 0
-            entries = result[0]['entries'][0]['entries'] if result[0]['entries'] else []
-            
-            return {
-                "entries": entries,
-                "total": total,
-                "current_page": page,
-                "per_page": per_page,
-                "total_pages": (total + per_page - 1) // per_page
-            }
+        order = -1 if newest_first else 1
+        if backwards:
+            order = -order
 
+        try:
+            await JournalManager._ensure_migrated(user_id)
+            entries = await db.journal_entries.find(
+                query,
+                {"user_id": 0}
+            ).sort([("timestamp", order), ("_id", order)]).limit(per_page + 1).to_list(length=per_page + 1)
         except Exception as e:
-            logger.error(f"Error retrieving journal for user {user_id}: {e}")
-            return None
+            logger.error(f"Error retrieving journal page for user {user_id}: {e}")
+            return {"entries": [], "next_cursor": None, "prev_cursor": None, "per_page": per_page}
+
+        has_more = len(entries) > per_page
+        entries = entries[:per_page]
+        if backwards:
+            entries.reverse()
+        has_next = has_more if not backwards else True
+        has_prev = position is not None if not backwards else has_more
+
+        def token(entry: Dict[str, Any], direction: str) -> str:
+            return encode_cursor({"ts": entry["timestamp"], "id": str(entry["_id"]), "dir": direction})
+
+        next_cursor = token(entries[-1], "next") if entries and has_next else None
+        prev_cursor = token(entries[0], "prev") if entries and has_prev else None
+        for entry in entries:
+            entry.pop("_id", None)
+
+        return {
+            "entries": entries,
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
+            "per_page": per_page
+        }
+
+    @staticmethod
+    async def count_user_entries(user_id: str) -> int:
+        """Number of journal entries, from the user's running journal_metrics when available."""
+        user_id = str(user_id)
+        try:
+            user = await db.users.find_one({"user_id": user_id}, {"journal_metrics.total_responses": 1})
+            total = ((user or {}).get("journal_metrics") or {}).get("total_responses")
+            if total is None:
+                total = await db.journal_entries.count_documents({"user_id": user_id})
+            return total
+        except Exception as e:
+            logger.error(f"Error counting journal entries for user {user_id}: {e}")
+            return 0
 
     @staticmethod
     async def get_lesson_responses(lesson_key: str, limit: int = 100) -> List[Dict[str, Any]]:
@@ -702,20 +1096,18 @@ class JournalManager:
         Get all user responses for a specific lesson.
         """
         try:
-            pipeline = [
-                {"$unwind": "$entries"},
-                {"$match": {"entries.lesson": lesson_key}},
-                {"$limit": limit},
-                {"$project": {
+            cursor = db.journal_entries.find(
+                {"lesson": lesson_key},
+                {
+                    "_id": 0,
                     "user_id": 1,
-                    "response": "$entries.response",
-                    "timestamp": "$entries.timestamp",
-                    "response_length": "$entries.response_length",
-                    "keywords_used": "$entries.keywords_used"
-                }}
-            ]
-            cursor = db.journals.aggregate(pipeline)
-            responses = await cursor.to_list(length=None)
+                    "response": 1,
+                    "timestamp": 1,
+                    "response_length": 1,
+                    "keywords_used": 1
+                }
+            ).sort("timestamp", -1).limit(limit)
+            responses = await cursor.to_list(length=limit)
             return responses
 
         except Exception as e:
@@ -727,19 +1119,20 @@ class JournalManager:
         """
         Get statistics about a user's journal entries.
         """
+        user_id = str(user_id)
         try:
+            await JournalManager._ensure_migrated(user_id)
             pipeline = [
                 {"$match": {"user_id": user_id}},
-                {"$unwind": "$entries"},
                 {"$group": {
                     "_id": "$user_id",
                     "total_entries": {"$sum": 1},
-                    "avg_response_length": {"$avg": "$entries.response_length"},
-                    "first_entry": {"$min": "$entries.timestamp"},
-                    "last_entry": {"$max": "$entries.timestamp"}
+                    "avg_response_length": {"$avg": "$response_length"},
+                    "first_entry": {"$min": "$timestamp"},
+                    "last_entry": {"$max": "$timestamp"}
                 }}
             ]
-            cursor = db.journals.aggregate(pipeline)
+            cursor = db.journal_entries.aggregate(pipeline)
             stats_list = await cursor.to_list(length=1)
             stats = stats_list[0] if stats_list else {
                 "total_entries": 0,
@@ -873,37 +1266,54 @@ class FeedbackAnalyticsManager:
     """Manages feedback analytics and ratings in MongoDB."""
 
     @staticmethod
-    async def save_feedback_analytics(user_id: int, lesson_id: str, feedback_results: dict) -> None:
-        """Store feedback data for continuous improvement."""
+    async def save_feedback_analytics(user_id: int, lesson_id: str, feedback_results: dict,
+                                      uow: Optional[UnitOfWork] = None, job_id: Optional[Any] = None) -> None:
+        """
+        Store feedback data for continuous improvement.
+
+        The updates go out as one ordered bulk write, or are queued on the
+        given UnitOfWork. With a job_id, each entry is pushed at most once per
+        job, so a retried job does not duplicate them.
+        """
         try:
-            # Keep existing functionality
-            await db.feedback_analytics.update_one(
-                {"user_id": user_id},
-                {"$push": {
-                    "lessons": {
-                        "lesson_id": lesson_id,
-                        "keywords_found": feedback_results.get("matches", []),
-                        "feedback_given": feedback_results.get("feedback", []),
-                        "quality_metrics": feedback_results.get("quality_metrics", {}),
-                        "timestamp": datetime.now(timezone.utc)
-                    }
-                }},
-                upsert=True
-            )
-            
-            # Add analysis of strengths/weaknesses
+            timestamp = datetime.now(timezone.utc)
             entry_data = feedback_results.get("quality_metrics", {})
-            await db.feedback_analytics.update_one(
-                {"user_id": user_id},
-                {"$push": {
-                    "entries": {
-                        "timestamp": datetime.now(timezone.utc),
-                        "lesson_id": lesson_id,
-                        "strengths": entry_data.get("strengths", []),
-                        "weaknesses": entry_data.get("weaknesses", []),
-                    }
-                }}
-            )
+            lesson_entry = {
+                "lesson_id": lesson_id,
+                "keywords_found": feedback_results.get("matches", []),
+                "feedback_given": feedback_results.get("feedback", []),
+                "quality_metrics": entry_data,
+                "timestamp": timestamp
+            }
+            # Add analysis of strengths/weaknesses
+            analysis_entry = {
+                "timestamp": timestamp,
+                "lesson_id": lesson_id,
+                "strengths": entry_data.get("strengths", []),
+                "weaknesses": entry_data.get("weaknesses", []),
+            }
+
+            if job_id is None:
+                operations = [
+                    UpdateOne({"user_id": user_id}, {"$push": {"lessons": lesson_entry}}, upsert=True),
+                    UpdateOne({"user_id": user_id}, {"$push": {"entries": analysis_entry}})
+                ]
+            else:
+                lesson_entry["job_id"] = analysis_entry["job_id"] = job_id
+                operations = [
+                    # Create the document first, so the guarded pushes never need an upsert
+                    UpdateOne({"user_id": user_id}, {"$setOnInsert": {"user_id": user_id}}, upsert=True),
+                    UpdateOne({"user_id": user_id, "lessons.job_id": {"$ne": job_id}},
+                              {"$push": {"lessons": lesson_entry}}),
+                    UpdateOne({"user_id": user_id, "entries.job_id": {"$ne": job_id}},
+                              {"$push": {"entries": analysis_entry}})
+                ]
+
+            if uow is not None:
+                uow.add("feedback_analytics", *operations)
+                return
+
+            await db.feedback_analytics.bulk_write(operations, ordered=True)
             
             logger.info(f"Feedback analytics saved for user {user_id} and lesson {lesson_id}")
         except Exception as e:
@@ -986,45 +1396,157 @@ class FeedbackAnalyticsManager:
 class AnalyticsManager:
     """Manages learning analytics and user progress tracking in MongoDB."""
 
+    # Per-user StreakEngines, kept current by record_journal_entry()
+    _streak_cache = LRUTTLCache(max_entries=10000, ttl_seconds=600)
+    # Cohort metrics keyed by date range ("all" for the materialized snapshot)
+    _cohort_cache = LRUTTLCache(max_entries=32, ttl_seconds=Config.COHORT_METRICS_REFRESH_SECONDS)
+
+    @staticmethod
+    async def record_journal_entry(user_id: str, timestamp: str, response_length: int, day: int) -> bool:
+        """
+        Fold a new journal entry into the user's running `journal_metrics`.
+
+        The user's streak record ({last_day, run, longest}) is advanced in the
+        same update. A day older than the last one is rare (clock skew around
+        midnight); it clears the record, which the next streak report rebuilds
+        from the day buckets.
+
+        Args:
+            user_id: The user's ID
+            timestamp: ISO timestamp of the entry
+            response_length: Length of the stored response
+            day: Day ordinal (date.toordinal()) of the entry in UTC
+
+        Returns:
+            True if the aggregates were updated, False if the user has none yet
+            and rebuild_journal_metrics() must seed them
+        """
+        try:
+            days = {"$ifNull": ["$journal_metrics.active_days", []]}
+            streak = "$journal_metrics.streak"
+            result = await db.users.update_one(
+                {"user_id": str(user_id), "journal_metrics": {"$exists": True}},
+                [{"$set": {
+                    "journal_metrics.total_responses": {"$add": [{"$ifNull": ["$journal_metrics.total_responses", 0]}, 1]},
+                    "journal_metrics.total_length": {"$add": [
+                        {"$ifNull": ["$journal_metrics.total_length", 0]}, response_length
+                    ]},
+                    "journal_metrics.first_entry": {"$min": ["$journal_metrics.first_entry", {"$literal": timestamp}]},
+                    "journal_metrics.last_entry": {"$max": ["$journal_metrics.last_entry", {"$literal": timestamp}]},
+                    "journal_metrics.active_days": {"$cond": [
+                        {"$in": [day, days]}, days, {"$concatArrays": [days, [day]]}
+                    ]},
+                    "journal_metrics.streak": {"$switch": {
+                        "branches": [
+                            {"case": {"$or": [{"$eq": [{"$type": streak}, "missing"]}, {"$eq": [streak, None]},
+                                              {"$in": [day, days]}]},
+                             "then": streak},
+                            {"case": {"$eq": [day, {"$add": [f"{streak}.last_day", 1]}]},
+                             "then": {
+                                 "last_day": day,
+                                 "run": {"$add": [f"{streak}.run", 1]},
+                                 "longest": {"$max": [f"{streak}.longest", {"$add": [f"{streak}.run", 1]}]}
+                             }},
+                            {"case": {"$gt": [day, f"{streak}.last_day"]},
+                             "then": {"last_day": day, "run": 1, "longest": {"$max": [f"{streak}.longest", 1]}}}
+                        ],
+                        "default": None
+                    }}
+                }}]
+            )
+            UserCache.invalidate("user_id", user_id)
+            engine = AnalyticsManager._streak_cache.get(str(user_id))
+            if engine is not None:
+                engine.add_day(day)
+            return result.matched_count > 0
+        except Exception as e:
+            logger.error(f"Error updating journal metrics for user {user_id}: {e}")
+            return False
+
+    @staticmethod
+    async def rebuild_journal_metrics(user_id: str) -> Dict[str, Any]:
+        """
+        Seed a user's `journal_metrics` from their stored journal entries.
+
+        Only runs once per user: the write is skipped if another request has
+        already seeded the aggregates.
+        """
+        user_id = str(user_id)
+        try:
+            await JournalManager._ensure_migrated(user_id)
+            pipeline = [
+                {"$match": {"user_id": user_id}},
+                {"$group": {
+                    "_id": None,
+                    "total_responses": {"$sum": 1},
+                    "total_length": {"$sum": "$response_length"},
+                    "first_entry": {"$min": "$timestamp"},
+                    "last_entry": {"$max": "$timestamp"},
+                    "days": {"$addToSet": {"$substrCP": ["$timestamp", 0, 10]}}
+                }}
+            ]
+            result = await db.journal_entries.aggregate(pipeline).to_list(length=1)
+            if not result:
+                return {}
+
+            stats = result[0]
+            metrics = {
+                "total_responses": stats["total_responses"],
+                "total_length": stats["total_length"],
+                "first_entry": stats["first_entry"],
+                "last_entry": stats["last_entry"],
+                "active_days": sorted(
+                    datetime.strptime(day, "%Y-%m-%d").date().toordinal() for day in stats["days"]
+                )
+            }
+            metrics["streak"] = AnalyticsManager._streak_record(metrics["active_days"])
+            await db.users.update_one(
+                {"user_id": user_id, "journal_metrics": {"$exists": False}},
+                {"$set": {"journal_metrics": metrics}}
+            )
+            UserCache.invalidate("user_id", user_id)
+            return metrics
+        except Exception as e:
+            logger.error(f"Error rebuilding journal metrics for user {user_id}: {e}", exc_info=True)
+            return {}
+
     @staticmethod
     async def calculate_user_metrics(user_id: str) -> Dict[str, Any]:
-        """Calculate comprehensive metrics for a single user."""
+        """Calculate comprehensive metrics for a single user from their running aggregates."""
 
         user_id = str(user_id)
 
         try:
-            # Get user data and journal entries using asyncio
             user_data = await db.users.find_one({"user_id": user_id})
-            journal = await db.journals.find_one({"user_id": user_id})
-            
-            if not user_data or not journal or not journal.get('entries'):
+            if not user_data:
+                logger.warning(f"No data found for user {user_id}")
+                return {}
+
+            journal_metrics = user_data.get('journal_metrics')
+            if journal_metrics is None:
+                journal_metrics = await AnalyticsManager.rebuild_journal_metrics(user_id)
+            streaks = AnalyticsManager._load_streak_engine(user_id, journal_metrics)
+
+            total_responses = journal_metrics.get('total_responses', 0)
+            if not total_responses:
                 logger.warning(f"No data found for user {user_id}")
                 return {}
-            
-            # Get all entries and sort by timestamp
-            entries = sorted(journal['entries'], 
-                        key=lambda x: x['timestamp'])
             
             # Calculate basic metrics with safe access
-            total_responses = len(entries)
-            avg_response_length = 0
-            if total_responses > 0:
-                # Safely get response lengths, defaulting to 0 if not present
-                response_lengths = [e.get('response_length', len(e.get('response', ''))) for e in entries]
-                avg_response_length = sum(response_lengths) / total_responses
+            avg_response_length = journal_metrics.get('total_length', 0) / total_responses
             
             # Calculate time-based metrics
             learning_duration = 0
             avg_days_between_lessons = 0
-            if len(entries) >= 2:
-                start_time = datetime.fromisoformat(entries[0]['timestamp'].replace('Z', '+00:00'))
-                end_time = datetime.fromisoformat(entries[-1]['timestamp'].replace('Z', '+00:00'))
+            if total_responses >= 2:
+                start_time = datetime.fromisoformat(journal_metrics['first_entry'].replace('Z', '+00:00'))
+                end_time = datetime.fromisoformat(journal_metrics['last_entry'].replace('Z', '+00:00'))
                 if not start_time.tzinfo:
                     start_time = start_time.replace(tzinfo=timezone.utc)
                 if not end_time.tzinfo:
                     end_time = end_time.replace(tzinfo=timezone.utc)
                 learning_duration = (end_time - start_time).days
-                avg_days_between_lessons = learning_duration / (len(entries) - 1) if len(entries) > 1 else 0
+                avg_days_between_lessons = learning_duration / (total_responses - 1)
             
             # Safely get progress metrics with defaults
             progress_metrics = user_data.get('progress_metrics', {})
@@ -1046,6 +1568,9 @@ class AnalyticsManager:
                 "completion_rate": round(completion_rate, 2),
                 "learning_duration_days": learning_duration,
                 "avg_days_between_lessons": round(avg_days_between_lessons, 2),
+                "active_days": streaks.total_days,
+                "current_streak": streaks.current_streak(),
+                "longest_streak": streaks.longest_streak,
                 "engagement_score": round(engagement_score, 2),
                 "last_active": user_data.get('last_active', 'Never'),
                 "current_lesson": user_data.get('current_lesson', 'None')
@@ -1055,10 +1580,126 @@ class AnalyticsManager:
             logger.error(f"Error calculating metrics for user {user_id}: {e}", exc_info=True)
             return {}
 
+    @staticmethod
+    def _load_streak_engine(user_id: str, journal_metrics: Dict[str, Any]) -> StreakEngine:
+        """Build a user's StreakEngine from their stored day buckets and cache it."""
+        engine = StreakEngine(journal_metrics.get('active_days', []))
+        AnalyticsManager._streak_cache.set(str(user_id), engine)
+        return engine
+
+    @staticmethod
+    async def get_streak_info(user_id: str) -> Dict[str, int]:
+        """
+        Get a user's current streak, longest streak and total active days.
+
+        Served from the cached StreakEngine when possible; otherwise only the
+        user's day buckets are read.
+        """
+        user_id = str(user_id)
+        try:
+            engine = AnalyticsManager._streak_cache.get(user_id)
+            if engine is None:
+                user_data = await db.users.find_one(
+                    {"user_id": user_id},
+                    {"journal_metrics.active_days": 1}
+                )
+                if not user_data:
+                    return {"current_streak": 0, "longest_streak": 0, "total_days": 0}
+                journal_metrics = user_data.get('journal_metrics')
+                if journal_metrics is None:
+                    journal_metrics = await AnalyticsManager.rebuild_journal_metrics(user_id)
+                engine = AnalyticsManager._load_streak_engine(user_id, journal_metrics)
+            return engine.summary()
+        except Exception as e:
+            logger.error(f"Error getting streak info for user {user_id}: {e}")
+            return {"current_streak": 0, "longest_streak": 0, "total_days": 0}
+
+    @staticmethod
+    def _streak_record(days: List[int]) -> Optional[Dict[str, int]]:
+        """The {last_day, run, longest} streak record stored in journal_metrics."""
+        engine = StreakEngine(days)
+        if not engine.days:
+            return None
+        return {"last_day": engine.days[-1], "run": engine.current_streak(), "longest": engine.longest_streak}
+
+    @staticmethod
+    async def _backfill_streak_records() -> int:
+        """
+        Store streak records for users that have day buckets but no record yet:
+        aggregates seeded before records existed, or records cleared by an
+        out-of-order day. Only those users are read.
+        """
+        cursor = db.users.find(
+            {"journal_metrics.active_days.0": {"$exists": True}, "journal_metrics.streak": None},
+            {"journal_metrics.active_days": 1}
+        )
+        operations = []
+        async for user in cursor:
+            days = user["journal_metrics"]["active_days"]
+            operations.append(UpdateOne(
+                # Day buckets only grow, so an unchanged size means the record is still accurate
+                {"_id": user["_id"], "journal_metrics.active_days": {"$size": len(days)}},
+                {"$set": {"journal_metrics.streak": AnalyticsManager._streak_record(days)}}
+            ))
+        if operations:
+            await db.users.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    @staticmethod
+    async def calculate_streak_report(top_n: int = 5) -> Dict[str, Any]:
+        """
+        Compute streaks for every user at once for admin reports.
+
+        Aggregated server-side from the streak records kept in journal_metrics,
+        so no day buckets are loaded into the process.
+
+        Args:
+            top_n: Number of users to include in the longest-streak leaderboard
+        """
+        try:
+            await AnalyticsManager._backfill_streak_records()
+
+            today = datetime.now(timezone.utc).date().toordinal()
+            pipeline = [
+                {"$match": {"journal_metrics.streak.last_day": {"$exists": True}}},
+                {"$facet": {
+                    "users": [{"$count": "count"}],
+                    # A run that ended before yesterday is no longer current
+                    "on_streak": [
+                        {"$match": {"journal_metrics.streak.last_day": {"$gte": today - 1}}},
+                        {"$group": {"_id": None, "count": {"$sum": 1},
+                                    "average": {"$avg": "$journal_metrics.streak.run"}}}
+                    ],
+                    "longest_streaks": [
+                        {"$sort": {"journal_metrics.streak.longest": -1}},
+                        {"$limit": top_n},
+                        {"$project": {"_id": 0, "user_id": 1, "longest_streak": "$journal_metrics.streak.longest"}}
+                    ]
+                }}
+            ]
+            result = await db.users.aggregate(pipeline).to_list(length=1)
+            report = result[0] if result else {}
+            if not report.get("users"):
+                return {}
+
+            on_streak = report["on_streak"][0] if report["on_streak"] else {"count": 0, "average": 0}
+            return {
+                "users_with_entries": report["users"][0]["count"],
+                "users_on_streak": on_streak["count"],
+                "average_current_streak": round(on_streak["average"] or 0, 2),
+                "longest_streaks": report["longest_streaks"]
+            }
+        except Exception as e:
+            logger.error(f"Error calculating streak report: {e}", exc_info=True)
+            return {}
+
     @staticmethod
     async def calculate_cohort_metrics(start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict[str, Any]:
         """
         Calculate metrics across all users within a date range.
+
+        Everything is computed server-side in one $facet aggregation, so no user
+        documents are loaded into the process.
         """
         try:
             query = {}
@@ -1069,34 +1710,44 @@ class AnalyticsManager:
                 if end_date:
                     query['joined_date']['$lte'] = end_date
 
-            cursor = db.users.find(query)
-            users = await cursor.to_list(length=None)
-            if not users:
-                return {}
-
-            total_users = len(users)
-            completion_rates = [u['progress_metrics']['completion_rate'] for u in users]
-            avg_completion_rate = sum(completion_rates) / total_users if total_users > 0 else 0
+            # last_active is stored as a UTC isoformat string, so ISO cutoffs compare correctly
+            now = datetime.now(timezone.utc)
+            day_ago = (now - timedelta(days=1)).isoformat()
+            week_ago = (now - timedelta(days=7)).isoformat()
 
-            lesson_distribution = {}
-            for user in users:
-                current_lesson = user.get('current_lesson')
-                if current_lesson:
-                    lesson_distribution[current_lesson] = lesson_distribution.get(current_lesson, 0) + 1
+            pipeline = [
+                {"$match": query},
+                {"$facet": {
+                    "totals": [
+                        {"$group": {
+                            "_id": None,
+                            "total_users": {"$sum": 1},
+                            "average_completion_rate": {"$avg": "$progress_metrics.completion_rate"},
+                            "active_last_day": {"$sum": {"$cond": [{"$gt": ["$last_active", day_ago]}, 1, 0]}},
+                            "active_last_week": {"$sum": {"$cond": [{"$gt": ["$last_active", week_ago]}, 1, 0]}}
+                        }}
+                    ],
+                    "lessons": [
+                        {"$match": {"current_lesson": {"$nin": [None, ""]}}},
+                        {"$group": {"_id": "$current_lesson", "count": {"$sum": 1}}}
+                    ]
+                }}
+            ]
+            result = await db.users.aggregate(pipeline).to_list(length=1)
+            if not result or not result[0]["totals"]:
+                return {}
 
-            active_last_day = sum(
-                1 for u in users if datetime.fromisoformat(u['last_active'].replace('Z', '+00:00')) >
-                datetime.now(timezone.utc) - timedelta(days=1)
-            )
-            active_last_week = sum(
-                1 for u in users if datetime.fromisoformat(u['last_active'].replace('Z', '+00:00')) >
-                datetime.now(timezone.utc) - timedelta(days=7)
-            )
+            totals = result[0]["totals"][0]
+            total_users = totals["total_users"]
+            active_last_day = totals["active_last_day"]
+            active_last_week = totals["active_last_week"]
 
             return {
                 "total_users": total_users,
-                "average_completion_rate": round(avg_completion_rate, 2),
-                "lesson_distribution": lesson_distribution,
+                "average_completion_rate": round(totals.get("average_completion_rate") or 0, 2),
+                "lesson_distribution": {
+                    lesson["_id"]: lesson["count"] for lesson in result[0]["lessons"]
+                },
                 "active_users": {
                     "last_24h": active_last_day,
                     "last_7d": active_last_week
@@ -1104,54 +1755,101 @@ class AnalyticsManager:
                 "retention_rates": {
                     "daily": round((active_last_day / total_users * 100), 2) if total_users > 0 else 0,
                     "weekly": round((active_last_week / total_users * 100), 2) if total_users > 0 else 0
-                }
+                },
+                "computed_at": now.isoformat()
             }
 
         except Exception as e:
             logger.error(f"Error calculating cohort metrics: {e}", exc_info=True)
             return {}
 
+    @staticmethod
+    async def refresh_cohort_metrics() -> Dict[str, Any]:
+        """
+        Recompute the all-users cohort metrics and store them as a materialized
+        document in analytics_snapshots. Run periodically by the scheduler.
+        """
+        metrics = await AnalyticsManager.calculate_cohort_metrics()
+        if not metrics:
+            return {}
+        try:
+            await db.analytics_snapshots.replace_one(
+                {"_id": "cohort_metrics"},
+                {"_id": "cohort_metrics", "metrics": metrics},
+                upsert=True
+            )
+            AnalyticsManager._cohort_cache.set("all", metrics)
+            logger.info(f"Cohort metrics refreshed for {metrics['total_users']} users")
+        except Exception as e:
+            logger.error(f"Error storing cohort metrics snapshot: {e}")
+        return metrics
+
+    @staticmethod
+    async def get_cohort_metrics(start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get cohort metrics for the dashboards, served from cache.
+
+        All-users metrics come from the materialized snapshot maintained by
+        refresh_cohort_metrics(); date-range queries are aggregated on demand
+        and cached for the same TTL.
+        """
+        cache_key = f"{start_date or ''}:{end_date or ''}" if (start_date or end_date) else "all"
+        metrics = AnalyticsManager._cohort_cache.get(cache_key)
+        if metrics is not None:
+            return metrics
+
+        if cache_key == "all":
+            try:
+                snapshot = await db.analytics_snapshots.find_one({"_id": "cohort_metrics"})
+                if snapshot:
+                    metrics = snapshot["metrics"]
+            except Exception as e:
+                logger.error(f"Error reading cohort metrics snapshot: {e}")
+            if not metrics:
+                metrics = await AnalyticsManager.refresh_cohort_metrics()
+        else:
+            metrics = await AnalyticsManager.calculate_cohort_metrics(start_date, end_date)
+
+        if metrics:
+            AnalyticsManager._cohort_cache.set(cache_key, metrics)
+        return metrics or {}
+
     @staticmethod
     async def get_lesson_analytics(lesson_key: str) -> Dict[str, Any]:
         """
         Get analytics for a specific lesson.
         """
         try:
+            # Range scan on the (lesson, timestamp) index, aggregated server-side
             pipeline = [
-                {"$unwind": "$entries"},
-                {"$match": {"entries.lesson": lesson_key}},
-                {"$project": {
-                    "response_length": "$entries.response_length",
-                    "keywords_used": "$entries.keywords_used",
-                    "timestamp": "$entries.timestamp"
+                {"$match": {"lesson": lesson_key}},
+                {"$facet": {
+                    "totals": [{"$group": {
+                        "_id": None,
+                        "total_responses": {"$sum": 1},
+                        "avg_response_length": {"$avg": "$response_length"}
+                    }}],
+                    "users": [{"$group": {"_id": "$user_id"}}, {"$count": "count"}],
+                    "keywords": [
+                        {"$unwind": "$keywords_used"},
+                        {"$group": {"_id": "$keywords_used", "count": {"$sum": 1}}}
+                    ]
                 }}
             ]
-            cursor = db.journals.aggregate(pipeline)
-            responses = await cursor.to_list(length=None)
-            if not responses:
+            result = await db.journal_entries.aggregate(pipeline).to_list(length=1)
+            if not result or not result[0]['totals']:
                 return {}
 
-            total_responses = len(responses)
-            avg_response_length = sum(r['response_length'] for r in responses) / total_responses if total_responses > 0 else 0
-
-            all_keywords = [kw for r in responses for kw in r.get('keywords_used', [])]
-            keyword_frequency = {kw: all_keywords.count(kw) for kw in set(all_keywords)} if all_keywords else {}
-
-            user_responses_cursor = db.journals.aggregate([
-                {"$unwind": "$entries"},
-                {"$match": {"entries.lesson": lesson_key}},
-                {"$group": {
-                    "_id": "$user_id",
-                    "completed_at": {"$min": "$entries.timestamp"}
-                }}
-            ])
-            user_responses = await user_responses_cursor.to_list(length=None)
-            users_completed = {response['_id'] for response in user_responses}
+            totals = result[0]['totals'][0]
+            total_responses = totals['total_responses']
+            avg_response_length = totals['avg_response_length'] or 0
+            keyword_frequency = {kw['_id']: kw['count'] for kw in result[0]['keywords']}
+            users_completed = result[0]['users'][0]['count'] if result[0]['users'] else 0
 
             return {
                 "total_responses": total_responses,
                 "average_response_length": round(avg_response_length, 2),
-                "unique_completions": len(users_completed),
+                "unique_completions": users_completed,
                 "keyword_frequency": keyword_frequency,
                 "responses_per_day": round(total_responses / (7 if total_responses > 7 else 1), 2)
             }
@@ -1160,15 +1858,10 @@ class AnalyticsManager:
             logger.error(f"Error calculating lesson analytics for {lesson_key}: {e}", exc_info=True)
             return {}
         
-db = None
-
 async def get_db():
     """Get database instance, initializing if necessary"""
-    global db
     try:
-        if db is None:
-            db = await init_mongodb()
-        return db
+        return await mongo.connect()
     except Exception as e:
         logger.error(f"Failed to get database connection: {e}")
         raise
\ No newline at end of file
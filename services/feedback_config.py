@@ -1,3 +1,5 @@
+from services.keyword_matcher import KeywordMatcher
+
 LESSON_FEEDBACK_RULES = {
     # Lesson 2 - Design Thinking (already done)
     "lesson_2_step_1": {  # Empathise
@@ -501,4 +503,11 @@ LESSON_FEEDBACK_RULES = {
             }
         }
     }
-}
\ No newline at end of file
+}
+
+# Compile one keyword matcher per lesson when the rules are loaded so that
+# evaluating a response is a single regex pass regardless of keyword count.
+LESSON_KEYWORD_MATCHERS = {
+    lesson_id: KeywordMatcher(rules.get("criteria", {}))
+    for lesson_id, rules in LESSON_FEEDBACK_RULES.items()
+}
@@ -32,18 +32,22 @@ Last Updated: February 2025
 
 from functools import lru_cache
 import re
-from typing import Dict, List, Any, Optional, Set
-from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Set, Union
 import logging
 import math
 import warnings
+import hashlib
 from collections import Counter
-from services.feedback_config import LESSON_FEEDBACK_RULES
+from pymongo import UpdateOne
+from services.feedback_config import LESSON_FEEDBACK_RULES, LESSON_KEYWORD_MATCHERS
 from services.database import db
 from services.learning_insights import LearningInsightsManager
-from nltk.stem import PorterStemmer
-from nltk.corpus import wordnet
-import nltk
+from services.skill_index import get_skill_index, get_stemmer, ensure_wordnet
+from services.response_analysis import ResponseAnalysis
+from services.streaks import StreakEngine
+from services.unit_of_work import UnitOfWork
+from services.cache import CacheBackend, AsyncCacheBackend, LRUTTLCache, create_shared_cache
+from config.settings import Config
 
 logger = logging.getLogger(__name__)
 
@@ -61,49 +65,25 @@ def get_feedback_rules(lesson_id: str) -> Dict[str, Any]:
     """
     return LESSON_FEEDBACK_RULES.get(lesson_id, {})
 
-# Initialize NLTK data
-try:
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('wordnet')
-
 class DynamicSkillAnalyzer:
     """
     Analyzes user responses dynamically to identify skills and learning patterns
     without relying on predefined lesson mappings.
     """
 
-    def __init__(self):
-        """Initialize with stemming capability"""
-        self.stemmer = PorterStemmer()
+    @property
+    def stemmer(self):
+        """Shared stemmer, created on first use so NLTK is not imported at startup"""
+        return get_stemmer()
         
     def _get_synonyms(self, word: str) -> Set[str]:
         """Get synonyms for a word using WordNet."""
         synonyms = set()
-        for syn in wordnet.synsets(word):
+        for syn in ensure_wordnet().synsets(word):
             for lemma in syn.lemmas():
                 synonyms.add(lemma.name().lower())
         return synonyms
 
-    def _check_pattern_match(self, text: str, pattern: str) -> bool:
-        """Enhanced pattern matching using stems and synonyms."""
-        text_lower = text.lower()
-        pattern_lower = pattern.lower()
-        
-        # Direct match
-        if pattern_lower in text_lower:
-            return True
-            
-        # Stem match
-        text_stems = {self.stemmer.stem(word) for word in text_lower.split()}
-        pattern_stem = self.stemmer.stem(pattern_lower)
-        if pattern_stem in text_stems:
-            return True
-            
-        # Synonym match
-        pattern_synonyms = self._get_synonyms(pattern_lower)
-        return any(syn in text_lower for syn in pattern_synonyms)
-    
     # Core skill indicators that can be detected from language patterns
     SKILL_INDICATORS = {
         'analytical_thinking': {
@@ -160,15 +140,16 @@ class DynamicSkillAnalyzer:
     }
 
     @classmethod
-    def analyze_response(self, response_text: str) -> Dict[str, Any]:
+    def analyze_response(self, response: Union[str, ResponseAnalysis]) -> Dict[str, Any]:
         """Analyzes a response with enhanced pattern matching."""
-        text = response_text.lower()
+        analysis = ResponseAnalysis.of(response)
         
-        # Analyze core skills with enhanced matching
+        # Resolve stems and synonyms for every skill against the shared stem stream
+        matched_patterns = get_skill_index(self.SKILL_INDICATORS).match_stems(analysis.stems)
+
         skills = {}
         for skill, config in self.SKILL_INDICATORS.items():
-            matches = sum(1 for pattern in config['patterns'] 
-                         if self._check_pattern_match(text, pattern))
+            matches = len(matched_patterns.get(skill, ()))
             if matches:
                 base_score = min(100, (matches / len(config['patterns'])) * 100)
                 weighted_score = base_score * config['weight']
@@ -181,7 +162,7 @@ class DynamicSkillAnalyzer:
         # Analyze contextual application
         context_scores = {}
         for context, patterns in self.CONTEXT_INDICATORS.items():
-            matches = sum(1 for pattern in patterns if re.search(pattern, text))
+            matches = sum(1 for pattern in patterns if analysis.search(pattern))
             if matches:
                 context_scores[context] = min(100, (matches / len(patterns)) * 100)
         
@@ -398,28 +379,28 @@ class SemanticAnalyzer:
             ]
         }
 
-    def analyze_response(self, text: str) -> Dict[str, Any]:
+    def analyze_response(self, response: Union[str, ResponseAnalysis]) -> Dict[str, Any]:
         """
         Perform semantic analysis on a response.
         """
-        text = text.lower()
+        analysis = ResponseAnalysis.of(response)
         
         # Analyze semantic markers
         semantic_scores = {}
         for category, markers in self.semantic_markers.items():
             matches = []
             for pattern, weight in markers:
-                if re.search(pattern, text):
+                if analysis.search(pattern):
                     matches.append(weight)
             
             if matches:
                 semantic_scores[category] = round(sum(matches) / len(markers) * 100, 2)
         
         # Analyze semantic coherence
-        coherence_score = self._analyze_coherence(text)
+        coherence_score = self._analyze_coherence(analysis)
         
         # Analyze conceptual depth
-        depth_score = self._analyze_depth(text)
+        depth_score = self._analyze_depth(analysis)
         
         return {
             'semantic_categories': semantic_scores,
@@ -430,7 +411,7 @@ class SemanticAnalyzer:
             )
         }
 
-    def _analyze_coherence(self, text: str) -> float:
+    def _analyze_coherence(self, analysis: ResponseAnalysis) -> float:
         """Analyze the coherence of the response."""
         # Check for logical connectors
         connectors = [
@@ -438,14 +419,13 @@ class SemanticAnalyzer:
             'furthermore', 'moreover', 'consequently', 'thus'
         ]
         
-        connector_count = sum(1 for c in connectors if c in text)
+        connector_count = sum(1 for c in connectors if analysis.search(c))
         
         # Check for paragraph structure
-        has_paragraphs = len(text.split('\n\n')) > 1
+        has_paragraphs = analysis.paragraph_count > 1
         
         # Check for topic consistency
-        sentences = text.split('.')
-        word_sets = [set(s.split()) for s in sentences if s.strip()]
+        word_sets = analysis.sentence_word_sets
         
         # Calculate overlap between adjacent sentences
         overlaps = []
@@ -464,7 +444,7 @@ class SemanticAnalyzer:
         
         return min(100, coherence_score)
 
-    def _analyze_depth(self, text: str) -> float:
+    def _analyze_depth(self, analysis: ResponseAnalysis) -> float:
         """Analyze the conceptual depth of the response."""
         # Check for explanation patterns
         explanation_patterns = [
@@ -476,7 +456,7 @@ class SemanticAnalyzer:
         ]
         
         explanation_score = sum(weight for pattern, weight in explanation_patterns 
-                              if re.search(pattern, text))
+                              if analysis.search(pattern))
         
         # Check for conceptual vocabulary
         concept_indicators = [
@@ -484,7 +464,7 @@ class SemanticAnalyzer:
             'approach', 'methodology', 'system', 'process'
         ]
         
-        concept_score = sum(10 for word in concept_indicators if word in text)
+        concept_score = sum(10 for word in concept_indicators if analysis.search(word))
         
         # Calculate final depth score
         depth_score = (
@@ -515,33 +495,68 @@ class SemanticAnalyzer:
 
 
 class FeedbackCache:
-    """Manages caching of user responses and feedback intelligently"""
-    _cache = {}
-    _cache_timeout = timedelta(minutes=30)
+    """
+    Caches generated feedback keyed on a content hash of the lesson and response.
+
+    Feedback depends only on the lesson rules and the response text, so identical
+    responses share an entry regardless of who sent them. The in-process store is
+    bounded by entry count and approximate memory and entries expire after the
+    configured TTL; it is synchronous, so scoring code and worker processes use it
+    directly. When CACHE_REDIS_URL is set, the async helpers also read and write a
+    Redis tier shared between processes, without blocking the event loop.
+    """
+    _cache: CacheBackend = LRUTTLCache(
+        max_entries=Config.FEEDBACK_CACHE_MAX_ENTRIES,
+        max_bytes=Config.FEEDBACK_CACHE_MAX_BYTES,
+        ttl_seconds=Config.FEEDBACK_CACHE_TTL_SECONDS
+    )
+    _shared: Optional[AsyncCacheBackend] = create_shared_cache(
+        Config.CACHE_REDIS_URL,
+        prefix="gclearnbot:feedback:",
+        ttl_seconds=Config.FEEDBACK_CACHE_TTL_SECONDS
+    )
+
+    @staticmethod
+    def _cache_key(lesson_id: str, response_text: str) -> str:
+        digest = hashlib.sha1(response_text.strip().encode('utf-8')).hexdigest()
+        return f"{lesson_id}:{digest}"
 
     @classmethod
     def get_cached_feedback(cls, user_id: int, lesson_id: str, response_text: str) -> Optional[str]:
-        """Only return cached feedback if the response hasn't changed"""
-        cache_key = f"{user_id}_{lesson_id}"
-        cached_data = cls._cache.get(cache_key)
+        """Return cached feedback for an identical response to the same lesson"""
+        return cls._cache.get(cls._cache_key(lesson_id, response_text))
 
-        if cached_data:
-            if cached_data["response_text"] == response_text:  # Only use cache if response is identical
-                return cached_data["feedback"]
-            else:
-                del cls._cache[cache_key]  # Invalidate old feedback if the response changes
+    @classmethod
+    def cache_feedback(cls, user_id: int, lesson_id: str, response_text: str, feedback: str) -> None:
+        """Cache feedback for this lesson and response content"""
+        cls._cache.set(cls._cache_key(lesson_id, response_text), feedback)
 
-        return None
+    @classmethod
+    async def get_shared_feedback(cls, user_id: int, lesson_id: str, response_text: str) -> Optional[str]:
+        """Like get_cached_feedback(), falling back to the shared tier on a local miss"""
+        key = cls._cache_key(lesson_id, response_text)
+        feedback = cls._cache.get(key)
+        if feedback is None and cls._shared is not None:
+            feedback = await cls._shared.get(key)
+            if feedback is not None:
+                cls._cache.set(key, feedback)
+        return feedback
 
     @classmethod
-    def cache_feedback(cls, user_id: int, lesson_id: str, response_text: str, feedback: str) -> None:
-        """Cache feedback but only for the same response"""
-        cache_key = f"{user_id}_{lesson_id}"
-        cls._cache[cache_key] = {
-            "feedback": feedback,
-            "response_text": response_text,  # Store response to detect changes
-            "timestamp": datetime.now()
-        }
+    async def share_feedback(cls, user_id: int, lesson_id: str, response_text: str, feedback: str) -> None:
+        """Cache feedback locally and in the shared tier"""
+        key = cls._cache_key(lesson_id, response_text)
+        cls._cache.set(key, feedback)
+        if cls._shared is not None:
+            await cls._shared.set(key, feedback)
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """Hit, miss and eviction counters for monitoring"""
+        stats = cls._cache.stats()
+        if cls._shared is not None:
+            stats["shared"] = cls._shared.stats()
+        return stats
 
 # Add new class for skill tracking configuration
 class SkillConfig:
@@ -740,6 +755,18 @@ class SkillConfig:
             return 'intermediate'
         return 'beginner'
 
+    @classmethod
+    def skill_level_expr(cls, score: Any) -> Dict[str, Any]:
+        """determine_skill_level() as a MongoDB aggregation expression over a score expression"""
+        thresholds = cls.DEFAULT_PROGRESSION_METRICS['threshold_scores']
+        return {'$switch': {
+            'branches': [
+                {'case': {'$gte': [score, thresholds['advanced']]}, 'then': 'advanced'},
+                {'case': {'$gte': [score, thresholds['intermediate']]}, 'then': 'intermediate'}
+            ],
+            'default': 'beginner'
+        }}
+
 class SkillProgressTracker:
     """
     Tracks and manages user skill progression over time.
@@ -779,47 +806,61 @@ class SkillProgressTracker:
     """
     
     @staticmethod
-    async def update_skill_progress(user_id: int, skill_scores: Dict[str, Any]) -> None:
-        """Update user's skill progress in the database"""
+    async def update_skill_progress(user_id: int, skill_scores: Dict[str, Any],
+                                    uow: Optional[UnitOfWork] = None,
+                                    job_id: Optional[Any] = None) -> None:
+        """
+        Update user's skill progress in the database.
+
+        The scores are appended and the level recomputed in a single pipeline
+        update, so concurrent updates for the same user (e.g. analytics jobs
+        running in parallel) cannot overwrite each other's scores. With a
+        job_id, the scores are applied at most once per job, so a retried job
+        does not count them twice.
+
+        Args:
+            user_id: The user's ID
+            skill_scores: New scores per skill area
+            uow: Optional UnitOfWork to queue the write on
+            job_id: Background job applying the scores, if any
+        """
         try:
-            # Get user's current skill progress
-            user_skills = await db.user_skills.find_one({'user_id': user_id}) or {
-                'user_id': user_id,
-                'skills': {}
-            }
-            
-            # Update skills with new scores
+            if not skill_scores:
+                return
+
+            scores = {}
+            levels = {}
             for skill_area, data in skill_scores.items():
-                if skill_area not in user_skills['skills']:
-                    user_skills['skills'][skill_area] = {
-                        'level': 'beginner',
-                        'recent_scores': [],
-                        'highest_score': 0
-                    }
-                
-                skill_data = user_skills['skills'][skill_area]
+                path = f"skills.{skill_area}"
                 current_score = data['score']
-                
-                # Update recent scores (keep last 5)
-                skill_data['recent_scores'] = (skill_data['recent_scores'] + [current_score])[-5:]
-                
-                # Update highest score if current is higher
-                if current_score > skill_data['highest_score']:
-                    skill_data['highest_score'] = current_score
-                
-                # Calculate average of recent scores
-                avg_score = sum(skill_data['recent_scores']) / len(skill_data['recent_scores'])
-                
-                # Update skill level based on average score
-                skill_data['level'] = SkillConfig.determine_skill_level(skill_area, avg_score)
-            
-            # Save updated skills
-            await db.user_skills.update_one(
-                {'user_id': user_id},
-                {'$set': user_skills},
-                upsert=True
-            )
-            
+                # Keep the last 5 scores and the highest score seen
+                scores[f"{path}.recent_scores"] = {'$slice': [
+                    {'$concatArrays': [{'$ifNull': [f"${path}.recent_scores", []]}, [current_score]]}, -5
+                ]}
+                scores[f"{path}.highest_score"] = {'$max': [{'$ifNull': [f"${path}.highest_score", 0]}, current_score]}
+                # Level follows the average of the updated recent scores
+                levels[f"{path}.level"] = SkillConfig.skill_level_expr({'$avg': f"${path}.recent_scores"})
+
+            if job_id is None:
+                operations = [UpdateOne({'user_id': user_id}, [{'$set': scores}, {'$set': levels}], upsert=True)]
+            else:
+                # Remember the last jobs applied; retries come within a few attempts
+                scores['applied_jobs'] = {'$slice': [
+                    {'$concatArrays': [{'$ifNull': ['$applied_jobs', []]}, [job_id]]}, -20
+                ]}
+                operations = [
+                    # Create the document first, so the guarded update never needs an upsert
+                    UpdateOne({'user_id': user_id}, {'$setOnInsert': {'skills': {}}}, upsert=True),
+                    UpdateOne({'user_id': user_id, 'applied_jobs': {'$ne': job_id}},
+                              [{'$set': scores}, {'$set': levels}])
+                ]
+
+            if uow is not None:
+                uow.add("user_skills", *operations)
+                return
+
+            await db.user_skills.bulk_write(operations, ordered=True)
+
         except Exception as e:
             logger.error(f"Error updating skill progress: {e}")
 
@@ -972,7 +1013,7 @@ def evaluate_response_enhanced(lesson_id: str, response_text: str, user_id: int)
     """
     try:
         # Check cache first
-        cached_feedback = FeedbackCache.get_cached_feedback(user_id, lesson_id)
+        cached_feedback = FeedbackCache.get_cached_feedback(user_id, lesson_id, response_text)
         if cached_feedback:
             return [cached_feedback]
 
@@ -989,16 +1030,12 @@ def evaluate_response_enhanced(lesson_id: str, response_text: str, user_id: int)
 
         feedback = []
         criteria = rules.get("criteria", {})
-        response_lower = response_text.lower()
 
-        # Enhanced keyword matching with context
+        # Match every criterion's keywords in a single pass over the response
+        criterion_matches = LESSON_KEYWORD_MATCHERS[lesson_id].match(response_text)
+
         for criterion, rule_data in criteria.items():
-            matches = []
-            for keyword in rule_data["keywords"]:
-                # Use regex for more flexible matching
-                pattern = rf'\b{re.escape(keyword)}\b'
-                if re.search(pattern, response_lower):
-                    matches.append(keyword)
+            matches = criterion_matches.get(criterion, [])
 
             # Dynamic threshold based on response length
             base_threshold = len(rule_data["keywords"]) * 0.3
@@ -1017,7 +1054,7 @@ def evaluate_response_enhanced(lesson_id: str, response_text: str, user_id: int)
 
         # Cache the feedback
         combined_feedback = "\n\n".join(feedback)
-        FeedbackCache.cache_feedback(user_id, lesson_id, combined_feedback)
+        FeedbackCache.cache_feedback(user_id, lesson_id, response_text, combined_feedback)
         
         return feedback
 
@@ -1031,60 +1068,75 @@ def calculate_streak(entries: List[Dict[str, Any]]) -> int:
         return 0
         
     try:
-        # Sort entries by timestamp
-        sorted_entries = sorted(entries, key=lambda x: x['timestamp'], reverse=True)
-        
-        # Get current streak
-        streak = 1
-        last_date = datetime.fromisoformat(sorted_entries[0]['timestamp'].replace('Z', '+00:00')).date()
-        
-        for entry in sorted_entries[1:]:
-            entry_date = datetime.fromisoformat(entry['timestamp'].replace('Z', '+00:00')).date()
-            if (last_date - entry_date).days == 1:
-                streak += 1
-                last_date = entry_date
-            elif (last_date - entry_date).days > 1:
-                break
-                
-        return streak
-        
+        return StreakEngine.from_entries(entries).current_streak()
     except Exception as e:
         logger.error(f"Error calculating streak: {e}")
         return 0
 
-def analyze_response_quality(response_text: str) -> Dict[str, Any]:
-    """Enhanced response quality analysis."""
+# Analyzer stages are stateless, so one instance of each serves every response
+_skill_analyzer = DynamicSkillAnalyzer()
+_trajectory_analyzer = LearningTrajectoryAnalyzer()
+_semantic_analyzer = SemanticAnalyzer()
+
+# Memoized results keyed on (user, lesson, text hash)
+_quality_cache = LRUTTLCache(max_entries=256, ttl_seconds=300)
+
+
+def _quality_cache_key(response_text: str, user_id: Optional[int], lesson_id: Optional[str]) -> str:
+    return f"{user_id}:{lesson_id}:{hashlib.sha1(response_text.encode('utf-8')).hexdigest()}"
+
+
+def get_cached_response_quality(response_text: str, user_id: Optional[int] = None,
+                                lesson_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Return memoized quality metrics for this response, if any."""
+    cached = _quality_cache.get(_quality_cache_key(response_text, user_id, lesson_id))
+    return dict(cached) if cached is not None else None
+
+
+def cache_response_quality(response_text: str, user_id: Optional[int], lesson_id: Optional[str],
+                           metrics: Dict[str, Any]) -> None:
+    """Memoize quality metrics computed here or in a scoring worker."""
+    _quality_cache.set(_quality_cache_key(response_text, user_id, lesson_id), metrics)
+
+
+def analyze_response_quality(response_text: str, user_id: Optional[int] = None,
+                             lesson_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Enhanced response quality analysis.
+
+    The response is tokenized, stemmed and sentence-split once into a
+    ResponseAnalysis that every analyzer stage shares. Results are memoized per
+    (user, lesson, text hash) so repeat calls while handling the same update are free.
+    """
+    cached = get_cached_response_quality(response_text, user_id, lesson_id)
+    if cached is not None:
+        return cached
+
     try:
-        # Basic metrics (keep existing code)
-        clean_text = response_text.strip()
-        words = clean_text.split()
-        sentences = re.split(r'[.!?]+', clean_text)
+        analysis = ResponseAnalysis(response_text)
         
         metrics = {
-            'length': len(clean_text),
-            'word_count': len(words),
-            'sentence_count': len([s for s in sentences if s.strip()]),
-            'has_punctuation': bool(re.search(r'[.!?]', clean_text)),
-            'includes_details': len(words) > 30
+            'length': len(analysis.text),
+            'word_count': len(analysis.words),
+            'sentence_count': len(analysis.sentences),
+            'has_punctuation': analysis.has_punctuation,
+            'includes_details': len(analysis.words) > 30
         }
 
-        # Add new dynamic analysis
-        skill_analyzer = DynamicSkillAnalyzer()
-        trajectory_analyzer = LearningTrajectoryAnalyzer()
-        semantic_analyzer = SemanticAnalyzer()
-
-        # Perform analysis
-        skill_analysis = skill_analyzer.analyze_response(clean_text)
-        semantic_analysis = semantic_analyzer.analyze_response(clean_text)
+        # Perform analysis on the shared token stream
+        skill_analysis = _skill_analyzer.analyze_response(analysis)
+        semantic_analysis = _semantic_analyzer.analyze_response(analysis)
         
         # Add analyses to metrics
         metrics.update({
             'skill_analysis': skill_analysis,
             'semantic_analysis': semantic_analysis,
-            'emerging_interests': trajectory_analyzer.topic_clusters 
+            'emerging_interests': _trajectory_analyzer.topic_clusters 
         })
+
+        cache_response_quality(response_text, user_id, lesson_id, metrics)
         
-        return metrics
+        return dict(metrics)
         
     except Exception as e:
         logger.error(f"Error analyzing response quality: {e}")
@@ -1095,7 +1147,9 @@ def analyze_response_quality(response_text: str) -> Dict[str, Any]:
         }
 
 
-async def format_feedback_message(feedback_list: List[str], quality_metrics: Dict[str, Any], user_id: int) -> str:
+async def format_feedback_message(feedback_list: List[str], quality_metrics: Dict[str, Any], user_id: int,
+                                  previous_skills: Optional[Dict[str, Any]] = None,
+                                  update_skills: bool = True) -> str:
     """
     Format feedback into an engaging, well-structured message.
     
@@ -1103,6 +1157,9 @@ async def format_feedback_message(feedback_list: List[str], quality_metrics: Dic
         feedback_list: List of feedback messages
         quality_metrics: Dictionary containing response quality metrics
         user_id: User's ID for tracking skill progress
+        previous_skills: Skill progress already fetched by the caller, if any
+        update_skills: Whether to save the new skill scores here; pass False when
+                       the caller records them in the background
         
     Returns:
         Formatted feedback message with emojis and markdown
@@ -1143,11 +1200,13 @@ async def format_feedback_message(feedback_list: List[str], quality_metrics: Dic
         # Add skill progression tracking
         try:
             # Get previous skill progress
-            previous_skills = await SkillProgressTracker.get_skill_progress(user_id)
+            if previous_skills is None:
+                previous_skills = await SkillProgressTracker.get_skill_progress(user_id)
             
             # Update skill progress with new scores
             if 'skills' in quality_metrics:
-                await SkillProgressTracker.update_skill_progress(user_id, quality_metrics['skills'])
+                if update_skills:
+                    await SkillProgressTracker.update_skill_progress(user_id, quality_metrics['skills'])
                 
                 # Add skill feedback
                 skill_feedback = format_skill_feedback(quality_metrics['skills'], previous_skills)
@@ -1158,8 +1217,8 @@ async def format_feedback_message(feedback_list: List[str], quality_metrics: Dic
         
         # Add basic stats
         message += f"\n\n📊 *Response Stats:*\n"
-        message += f"• Words: {quality_metrics['word_count']}\n"
-        message += f"• Sentences: {quality_metrics['sentence_count']}\n"
+        message += f"• Words: {quality_metrics.get('word_count', 0)}\n"
+        message += f"• Sentences: {quality_metrics.get('sentence_count', 0)}\n"
         
         return message
         
@@ -0,0 +1,243 @@
+"""
+HTTP caching for the web frontend and lesson routes.
+
+- conditional_response() answers If-None-Match / If-Modified-Since with a 304
+  and sets ETag, Last-Modified and Cache-Control on full responses.
+- StaticAssets loads web/ into memory once, with a strong ETag (content hash)
+  per file and precompressed gzip (and brotli, if installed) variants of text
+  assets. HTML pages are rewritten so local /web/ assets other than pages
+  carry ?v=<hash>; requests with the current fingerprint are cached for a
+  year as immutable. Pages, and everything else, revalidate with their ETag.
+"""
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, Optional, Tuple
+from quart import Response
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli  # Optional dependency; gzip is always available
+except ImportError:
+    brotli = None
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+COMPRESSIBLE_SUFFIXES = {'.js', '.css', '.html', '.svg', '.json', '.txt'}
+MIN_COMPRESS_BYTES = 1024
+
+ASSET_REFERENCE_REGEX = re.compile(r'''(?P<attr>(?:src|href)=["'])(?P<path>/web/[^"'?#]+)(?P<end>["'])''')
+
+
+def _http_date(value: datetime) -> str:
+    return format_datetime(value.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+
+def _etag_matches(header: str, etags: Iterable[str]) -> bool:
+    """If-None-Match uses weak comparison: W/"x" matches "x"."""
+    if header.strip() == '*':
+        return True
+    candidates = {tag.strip().removeprefix('W/') for tag in header.split(',')}
+    return any(etag.removeprefix('W/') in candidates for etag in etags)
+
+
+def is_not_modified(request, etags: Iterable[str], last_modified: Optional[datetime] = None) -> bool:
+    """
+    Evaluate the request's conditional headers.
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted
+    when the client sent no ETag.
+    """
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        return _etag_matches(if_none_match, etags)
+
+    if_modified_since = request.headers.get('If-Modified-Since')
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def conditional_response(request, body: bytes, etag: str, mimetype: str,
+                         last_modified: Optional[datetime] = None,
+                         cache_control: str = REVALIDATE_CACHE_CONTROL,
+                         extra_headers: Optional[Dict[str, str]] = None,
+                         match_etags: Optional[Iterable[str]] = None) -> Response:
+    """
+    Build a 200 response, or a bodiless 304 if the client's copy is current.
+
+    Args:
+        request: The current Quart request
+        body: Response body
+        etag: Strong ETag of this representation
+        mimetype: Content type of the body
+        last_modified: When the underlying resource last changed
+        cache_control: Cache-Control header value
+        extra_headers: e.g. Content-Encoding and Vary for compressed variants
+        match_etags: ETags that count as current (defaults to [etag])
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+    if extra_headers:
+        headers.update(extra_headers)
+
+    if is_not_modified(request, match_etags or [etag], last_modified):
+        headers.pop("Content-Encoding", None)
+        return Response(b"", status=304, headers=headers)
+    return Response(body, status=200, headers=headers, mimetype=mimetype)
+
+
+class StaticAsset:
+    """One file from web/, with its precompressed variants"""
+
+    __slots__ = ("body", "mimetype", "etag", "fingerprint", "last_modified", "variants")
+
+    def __init__(self, body: bytes, mimetype: str, last_modified: datetime, compress: bool):
+        self.body = body
+        self.mimetype = mimetype
+        digest = hashlib.sha256(body).hexdigest()
+        self.fingerprint = digest[:12]
+        self.etag = f'"{digest[:32]}"'
+        self.last_modified = last_modified
+        # Content-Encoding -> (body, etag); each representation has its own ETag
+        self.variants: Dict[str, Tuple[bytes, str]] = {}
+        if compress and len(body) >= MIN_COMPRESS_BYTES:
+            self.variants['gzip'] = (gzip.compress(body, compresslevel=9, mtime=0), f'"{digest[:32]}-gz"')
+            if brotli is not None:
+                self.variants['br'] = (brotli.compress(body), f'"{digest[:32]}-br"')
+
+    def all_etags(self) -> Iterable[str]:
+        return [self.etag] + [etag for _, etag in self.variants.values()]
+
+
+class StaticAssets:
+    """In-memory, precompressed copy of the web/ directory"""
+
+    def __init__(self, web_dir: Path):
+        self.web_dir = web_dir
+        self._assets: Optional[Dict[str, StaticAsset]] = None
+
+    @property
+    def assets(self) -> Dict[str, StaticAsset]:
+        if self._assets is None:
+            self._assets = self._load()
+        return self._assets
+
+    def get(self, filename: str) -> Optional[StaticAsset]:
+        return self.assets.get(filename.lstrip('/'))
+
+    def response(self, request, filename: str) -> Optional[Response]:
+        """
+        Serve a web/ file with conditional request and compression support.
+
+        Returns:
+            The response, or None if there is no such file
+        """
+        asset = self.get(filename)
+        if asset is None:
+            return None
+
+        # Only a request for the current fingerprint may be cached forever; pages
+        # always revalidate, since they carry the fingerprints of everything else
+        if request.args.get('v') == asset.fingerprint and asset.mimetype != 'text/html':
+            cache_control = IMMUTABLE_CACHE_CONTROL
+        else:
+            cache_control = REVALIDATE_CACHE_CONTROL
+
+        body, etag, extra_headers = asset.body, asset.etag, {}
+        if asset.variants:
+            extra_headers["Vary"] = "Accept-Encoding"
+            encoding = self._negotiate(request.headers.get('Accept-Encoding', ''), asset.variants)
+            if encoding:
+                body, etag = asset.variants[encoding]
+                extra_headers["Content-Encoding"] = encoding
+
+        return conditional_response(
+            request, body, etag, asset.mimetype,
+            last_modified=asset.last_modified,
+            cache_control=cache_control,
+            extra_headers=extra_headers,
+            match_etags=asset.all_etags()
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        assets = self.assets
+        return {
+            "files": len(assets),
+            "bytes": sum(len(a.body) for a in assets.values()),
+            "precompressed": sum(1 for a in assets.values() if a.variants),
+            "brotli": brotli is not None
+        }
+
+    @staticmethod
+    def _negotiate(accept_encoding: str, variants: Dict[str, Any]) -> Optional[str]:
+        accepted = {}
+        for part in accept_encoding.lower().split(','):
+            name, _, params = part.strip().partition(';')
+            quality = 1.0
+            if params.strip().startswith('q='):
+                try:
+                    quality = float(params.strip()[2:])
+                except ValueError:
+                    quality = 0.0
+            if name:
+                accepted[name] = quality
+        for encoding in ('br', 'gzip'):
+            if encoding in variants and accepted.get(encoding, 0) > 0:
+                return encoding
+        return None
+
+    def _load(self) -> Dict[str, StaticAsset]:
+        files: Dict[str, Tuple[bytes, datetime]] = {}
+        for path in self.web_dir.rglob('*'):
+            if path.is_file():
+                stat = path.stat()
+                relative = path.relative_to(self.web_dir).as_posix()
+                files[relative] = (path.read_bytes(), datetime.fromtimestamp(stat.st_mtime, timezone.utc))
+
+        assets: Dict[str, StaticAsset] = {}
+        # Non-HTML assets first, so pages can reference their fingerprints
+        for relative, (body, mtime) in files.items():
+            if not relative.endswith('.html'):
+                assets[relative] = self._asset(relative, body, mtime)
+        for relative, (body, mtime) in files.items():
+            if relative.endswith('.html'):
+                assets[relative] = self._asset(relative, self._fingerprint_references(body, assets), mtime)
+
+        logger.info(f"Loaded {len(assets)} static assets from {self.web_dir}")
+        return assets
+
+    @staticmethod
+    def _asset(relative: str, body: bytes, mtime: datetime) -> StaticAsset:
+        mimetype = mimetypes.guess_type(relative)[0] or 'application/octet-stream'
+        return StaticAsset(body, mimetype, mtime, Path(relative).suffix.lower() in COMPRESSIBLE_SUFFIXES)
+
+    @staticmethod
+    def _fingerprint_references(html: bytes, assets: Dict[str, StaticAsset]) -> bytes:
+        """Append ?v=<fingerprint> to src/href references to local non-HTML assets."""
+        def replace(match: re.Match) -> str:
+            relative = match.group('path')[len('/web/'):]
+            asset = assets.get(relative)
+            if asset is None or relative.endswith('.html'):
+                return match.group(0)
+            return f"{match.group('attr')}{match.group('path')}?v={asset.fingerprint}{match.group('end')}"
+
+        try:
+            return ASSET_REFERENCE_REGEX.sub(replace, html.decode('utf-8')).encode('utf-8')
+        except UnicodeDecodeError:
+            return html
@@ -0,0 +1,109 @@
+"""
+Per-module import timing for startup profiling.
+
+Enabled with STARTUP_PROFILE=true. ImportProfiler installs a meta path finder
+that wraps each module's loader and records how long executing the module
+took, both cumulatively and excluding the imports it triggered ("self" time).
+The slowest modules are logged once startup has finished and are included in
+the /ready response.
+
+This module must be imported, and the profiler installed, before anything
+heavy is imported, so it only depends on the standard library.
+"""
+
+import importlib.abc
+import logging
+import sys
+import time
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Delegates to the real loader and times exec_module()"""
+
+    def __init__(self, loader, profiler: "ImportProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        name = module.__name__
+        self._profiler._stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - started
+            children = self._profiler._stack.pop()
+            if self._profiler._stack:
+                self._profiler._stack[-1] += elapsed
+            self._profiler.timings[name] = (elapsed, elapsed - children)
+            # Hand the module back its real loader (importlib.resources, pkgutil, ...)
+            if getattr(module, '__spec__', None) is not None:
+                module.__spec__.loader = self._loader
+            module.__loader__ = self._loader
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """Records cumulative and self import time per module"""
+
+    def __init__(self):
+        self.timings: Dict[str, tuple] = {}
+        self._stack: List[float] = []
+        self._started = time.perf_counter()
+        self._finished: Optional[float] = None
+
+    def install(self) -> "ImportProfiler":
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+        self._finished = time.perf_counter()
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                spec.loader = _TimedLoader(spec.loader, self)
+            return spec
+        return None
+
+    def report(self, top: int = 25) -> Dict[str, Any]:
+        """Summarize the slowest modules by self time."""
+        total = sum(self_time for _, self_time in self.timings.values())
+        slowest = sorted(self.timings.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        return {
+            "modules": len(self.timings),
+            "total_import_seconds": round(total, 3),
+            "wall_seconds": round((self._finished or time.perf_counter()) - self._started, 3),
+            "slowest": [
+                {"module": name, "self_ms": round(self_time * 1000, 1), "cumulative_ms": round(cumulative * 1000, 1)}
+                for name, (cumulative, self_time) in slowest
+            ]
+        }
+
+    def log_report(self, top: int = 25) -> Dict[str, Any]:
+        report = self.report(top)
+        logger.info(
+            f"Startup imports: {report['modules']} modules, "
+            f"{report['total_import_seconds']}s importing, {report['wall_seconds']}s wall"
+        )
+        for entry in report["slowest"]:
+            logger.info(
+                f"  {entry['self_ms']:>8.1f} ms self  {entry['cumulative_ms']:>8.1f} ms cumulative  {entry['module']}"
+            )
+        return report
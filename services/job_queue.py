@@ -0,0 +1,297 @@
+"""
+In-process background job queue with a durable MongoDB outbox.
+
+Work that does not affect the reply (analytics, insights, skill tracking) is
+enqueued as a named job with a BSON-serializable payload. Each job is written
+to the `job_outbox` collection first and then handed to a bounded pool of
+asyncio workers, so:
+
+- jobs survive restarts: anything still pending, or running with an expired
+  lease, is picked up again by the outbox poller;
+- failures are retried with exponential backoff and moved to the "dead" state
+  after JOB_MAX_ATTEMPTS;
+- when the in-memory queue is full, jobs stay in the outbox until the poller
+  finds capacity (backpressure instead of unbounded memory).
+
+Delivery is at-least-once, so handlers should tolerate being re-run. Handlers
+registered with with_job_id=True receive the job's outbox _id as `job_id`, to
+key their writes on it.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Set
+from bson import ObjectId
+from pymongo import ReturnDocument
+from config.settings import Config
+from services.database import get_db
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[..., Awaitable[Any]]
+
+
+class JobQueue:
+    """Bounded asyncio worker pool fed from a MongoDB outbox"""
+
+    def __init__(self, workers: int = 4, max_size: int = 1000, max_attempts: int = 5,
+                 retry_base_seconds: float = 5, lease_seconds: float = 60,
+                 poll_seconds: float = 10):
+        """
+        Args:
+            workers: Number of concurrent worker tasks
+            max_size: Capacity of the in-memory queue
+            max_attempts: Attempts before a job is dead-lettered
+            retry_base_seconds: First retry delay, doubled on each attempt
+            lease_seconds: How long a running job is locked before it may be reclaimed
+            poll_seconds: Interval at which the outbox is scanned for due jobs
+        """
+        self.workers = workers
+        self.max_size = max_size
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+
+        self._handlers: Dict[str, JobHandler] = {}
+        self._wants_job_id: Set[str] = set()
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued_ids: Set[ObjectId] = set()
+        self._tasks: List[asyncio.Task] = []
+
+        self.enqueued = 0
+        self.deferred = 0
+        self.completed = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self.in_flight = 0
+        self.max_depth = 0
+        self._total_wait = 0.0
+
+    def register(self, name: str, handler: JobHandler, with_job_id: bool = False) -> None:
+        """
+        Register the coroutine function that runs jobs of the given name.
+
+        Args:
+            name: Job name used with enqueue()
+            handler: Called with the job's payload as keyword arguments
+            with_job_id: Also pass the job's _id as `job_id`, which stays the same across retries
+        """
+        self._handlers[name] = handler
+        if with_job_id:
+            self._wants_job_id.add(name)
+        else:
+            self._wants_job_id.discard(name)
+
+    async def start(self) -> None:
+        """Create outbox indexes and start the workers and the outbox poller."""
+        if self._tasks:
+            return
+        db = await get_db()
+        await db.job_outbox.create_index([("status", 1), ("next_attempt_at", 1)])
+
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._poll_outbox()))
+        logger.info(f"Job queue started with {self.workers} workers")
+
+    async def stop(self, timeout: float = 10) -> None:
+        """Give queued jobs a chance to finish, then cancel the workers."""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Job queue stopped with {self._queue.qsize()} jobs left in the outbox")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def enqueue(self, name: str, payload: Dict[str, Any]) -> ObjectId:
+        """
+        Persist a job to the outbox and schedule it.
+
+        Args:
+            name: Registered handler name
+            payload: Keyword arguments for the handler (must be BSON-serializable)
+
+        Returns:
+            The job's outbox _id
+        """
+        now = datetime.now(timezone.utc)
+        has_room = self._queue is not None and not self._queue.full()
+        job = {
+            "_id": ObjectId(),
+            "name": name,
+            "payload": payload,
+            "status": "pending",
+            "attempts": 0,
+            "created_at": now,
+            # A queued job is normally claimed well before the poller's fallback kicks in;
+            # a deferred one is due for the poller straight away
+            "next_attempt_at": now + timedelta(seconds=self.lease_seconds) if has_room else now
+        }
+        self.enqueued += 1
+
+        try:
+            db = await get_db()
+            await db.job_outbox.insert_one(job)
+        except Exception as e:
+            logger.error(f"Could not persist job {name}, running it without the outbox: {e}")
+            job["volatile"] = True
+
+        if not self._offer(job):
+            # Backpressure: the job waits in the outbox until the poller finds room
+            self.deferred += 1
+            if job.get("volatile"):
+                logger.error(f"Dropping job {name}: queue full and outbox unavailable")
+        return job["_id"]
+
+    def stats(self) -> Dict[str, Any]:
+        depth = self._queue.qsize() if self._queue else 0
+        started = self.completed + self.retried + self.dead_lettered
+        return {
+            "depth": depth,
+            "max_depth": self.max_depth,
+            "capacity": self.max_size,
+            "in_flight": self.in_flight,
+            "workers": self.workers,
+            "enqueued": self.enqueued,
+            "deferred_to_outbox": self.deferred,
+            "completed": self.completed,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+            "avg_wait_seconds": round(self._total_wait / started, 3) if started else 0.0
+        }
+
+    def _offer(self, job: Dict[str, Any]) -> bool:
+        """Put a job on the in-memory queue if there is room."""
+        if job["_id"] in self._queued_ids:
+            return True
+        if self._queue is None or self._queue.full():
+            return False
+
+        job["queued_at"] = time.monotonic()
+        self._queued_ids.add(job["_id"])
+        self._queue.put_nowait(job)
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            self._queued_ids.discard(job["_id"])
+            self._total_wait += time.monotonic() - job.get("queued_at", time.monotonic())
+            self.in_flight += 1
+            try:
+                await self._run(job)
+            except Exception as e:
+                logger.error(f"Job worker error for {job.get('name')}: {e}", exc_info=True)
+            finally:
+                self.in_flight -= 1
+                self._queue.task_done()
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        now = datetime.now(timezone.utc)
+        db = None
+
+        if not job.get("volatile"):
+            db = await get_db()
+            # Claim the job so other workers/processes skip it while it runs
+            job = await db.job_outbox.find_one_and_update(
+                {
+                    "_id": job["_id"],
+                    "$or": [
+                        {"status": "pending"},
+                        {"status": "running", "locked_until": {"$lt": now}}
+                    ]
+                },
+                {
+                    "$set": {"status": "running", "locked_until": now + timedelta(seconds=self.lease_seconds)},
+                    "$inc": {"attempts": 1}
+                },
+                return_document=ReturnDocument.AFTER
+            )
+            if job is None:
+                return
+        else:
+            job["attempts"] = job.get("attempts", 0) + 1
+
+        handler = self._handlers.get(job["name"])
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job {job['name']}")
+            if job["name"] in self._wants_job_id:
+                await handler(**job["payload"], job_id=job["_id"])
+            else:
+                await handler(**job["payload"])
+        except Exception as e:
+            await self._fail(db, job, e)
+            return
+
+        self.completed += 1
+        if db is not None:
+            await db.job_outbox.delete_one({"_id": job["_id"]})
+
+    async def _fail(self, db, job: Dict[str, Any], error: Exception) -> None:
+        """Schedule a retry, or dead-letter the job once it is out of attempts."""
+        attempts = job["attempts"]
+        if attempts >= self.max_attempts or isinstance(error, LookupError) or db is None:
+            self.dead_lettered += 1
+            logger.error(f"Job {job['name']} dead-lettered after {attempts} attempts: {error}")
+            if db is not None:
+                await db.job_outbox.update_one(
+                    {"_id": job["_id"]},
+                    {"$set": {"status": "dead", "last_error": str(error), "failed_at": datetime.now(timezone.utc)},
+                     "$unset": {"locked_until": ""}}
+                )
+            return
+
+        self.retried += 1
+        delay = self.retry_base_seconds * (2 ** (attempts - 1))
+        logger.warning(f"Job {job['name']} failed (attempt {attempts}), retrying in {delay}s: {error}")
+        await db.job_outbox.update_one(
+            {"_id": job["_id"]},
+            {"$set": {
+                "status": "pending",
+                "last_error": str(error),
+                "next_attempt_at": datetime.now(timezone.utc) + timedelta(seconds=delay)
+            },
+             "$unset": {"locked_until": ""}}
+        )
+
+    async def _poll_outbox(self) -> None:
+        """Feed due retries, deferred jobs and jobs orphaned by a restart back to the workers."""
+        while True:
+            try:
+                capacity = self.max_size - self._queue.qsize()
+                if capacity > 0:
+                    now = datetime.now(timezone.utc)
+                    db = await get_db()
+                    cursor = db.job_outbox.find({
+                        "$or": [
+                            {"status": "pending", "next_attempt_at": {"$lte": now}},
+                            {"status": "running", "locked_until": {"$lt": now}}
+                        ]
+                    }).sort("next_attempt_at", 1).limit(capacity)
+                    async for job in cursor:
+                        if not self._offer(job):
+                            break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error polling job outbox: {e}")
+            await asyncio.sleep(self.poll_seconds)
+
+
+job_queue = JobQueue(
+    workers=Config.JOB_QUEUE_WORKERS,
+    max_size=Config.JOB_QUEUE_MAX_SIZE,
+    max_attempts=Config.JOB_MAX_ATTEMPTS,
+    retry_base_seconds=Config.JOB_RETRY_BASE_SECONDS,
+    lease_seconds=Config.JOB_LEASE_SECONDS,
+    poll_seconds=Config.JOB_POLL_SECONDS
+)
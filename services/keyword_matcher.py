@@ -0,0 +1,82 @@
+"""
+Compiled keyword matching for lesson feedback criteria.
+
+A KeywordMatcher folds every keyword of every criterion of a lesson into a
+single regular expression so a response is scanned once, instead of once per
+keyword.
+"""
+
+import re
+from typing import Dict, List, Any, Set
+
+
+class KeywordMatcher:
+    """Matches all criteria keywords of a lesson in a single pass over the text"""
+
+    def __init__(self, criteria: Dict[str, Dict[str, Any]]):
+        """
+        Build the matcher from a lesson's feedback criteria.
+
+        Args:
+            criteria: Mapping of criterion name to its rule data (must contain "keywords")
+        """
+        # Keep the original keyword order per criterion so results match the rules file
+        self._criteria: Dict[str, List[str]] = {
+            criterion: list(rule_data.get("keywords", []))
+            for criterion, rule_data in criteria.items()
+        }
+
+        keywords = {kw.lower() for kws in self._criteria.values() for kw in kws}
+
+        if not keywords:
+            self._pattern = None
+            self._implied: Dict[str, Set[str]] = {}
+            return
+
+        # Longest first so the alternation prefers "user testing" over "user".
+        alternation = "|".join(
+            re.escape(kw) for kw in sorted(keywords, key=lambda k: (-len(k), k))
+        )
+        # The lookahead makes matches zero-width, so overlapping keywords
+        # ("pain point" / "point") starting at later positions are still found.
+        self._pattern = re.compile(rf"\b(?=({alternation})\b)")
+
+        # A matched keyword also implies every shorter keyword it contains at a
+        # word boundary (e.g. "user testing" implies "user"), which the
+        # longest-first alternation would otherwise hide.
+        self._implied = {
+            kw: {
+                other for other in keywords
+                if other != kw and re.search(rf"\b{re.escape(other)}\b", kw)
+            }
+            for kw in keywords
+        }
+
+    def find_keywords(self, text: str) -> Set[str]:
+        """Return the set of (lowercased) keywords present in the text."""
+        if self._pattern is None or not text:
+            return set()
+
+        found = set()
+        for match in self._pattern.finditer(text.lower()):
+            keyword = match.group(1)
+            if keyword not in found:
+                found.add(keyword)
+                found.update(self._implied[keyword])
+        return found
+
+    def match(self, text: str) -> Dict[str, List[str]]:
+        """
+        Match the text against every criterion.
+
+        Args:
+            text: The user's response
+
+        Returns:
+            Dictionary of criterion name to the keywords it matched, in rule order
+        """
+        found = self.find_keywords(text)
+        return {
+            criterion: [kw for kw in keywords if kw.lower() in found]
+            for criterion, keywords in self._criteria.items()
+        }
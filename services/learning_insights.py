@@ -1,7 +1,9 @@
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timezone
 import logging
+from pymongo import UpdateOne
 from services.database import db
+from services.unit_of_work import UnitOfWork
 
 logger = logging.getLogger(__name__)
 
@@ -12,9 +14,15 @@ class LearningInsightsManager:
     """
 
     @staticmethod
-    async def store_learning_insights(user_id: int, insights: Dict[str, Any]) -> bool:
+    async def store_learning_insights(user_id: int, insights: Dict[str, Any],
+                                      uow: Optional[UnitOfWork] = None,
+                                      job_id: Optional[Any] = None) -> bool:
         """
         Store comprehensive learning insights for a user.
+
+        If a UnitOfWork is given the write is queued on it instead of being
+        executed immediately. With a job_id, the insight is stored at most once
+        per job, so a retried job does not add it again.
         """
         try:
             timestamp = datetime.now(timezone.utc)
@@ -28,23 +36,32 @@ class LearningInsightsManager:
                 "suggested_paths": insights.get("suggested_paths", [])
             }
             
-            result = await db.learning_insights.update_one(
-                {"user_id": user_id},
-                {
-                    "$push": {
-                        "insights": {
-                            "$each": [insight_doc],
-                            "$sort": {"timestamp": -1},
-                            "$slice": 50  # Keep last 50 insights
-                        }
-                    },
-                    "$setOnInsert": {
-                        "user_id": user_id,
-                        "created_at": timestamp
+            push = {
+                "$push": {
+                    "insights": {
+                        "$each": [insight_doc],
+                        "$sort": {"timestamp": -1},
+                        "$slice": 50  # Keep last 50 insights
                     }
-                },
-                upsert=True
-            )
+                }
+            }
+            on_insert = {"$setOnInsert": {"user_id": user_id, "created_at": timestamp}}
+
+            if job_id is None:
+                operations = [UpdateOne({"user_id": user_id}, {**push, **on_insert}, upsert=True)]
+            else:
+                insight_doc["job_id"] = job_id
+                operations = [
+                    # Create the document first, so the guarded push never needs an upsert
+                    UpdateOne({"user_id": user_id}, on_insert, upsert=True),
+                    UpdateOne({"user_id": user_id, "insights.job_id": {"$ne": job_id}}, push)
+                ]
+
+            if uow is not None:
+                uow.add("learning_insights", *operations)
+                return True
+
+            result = await db.learning_insights.bulk_write(operations, ordered=True)
             
             if result.acknowledged:
                 logger.info(f"Stored learning insights for user {user_id}")
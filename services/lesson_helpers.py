@@ -4,6 +4,7 @@ from services.content_loader import content_loader
 def get_lesson_structure() -> Dict[str, List[str]]:
     """
     Organizes lessons into a hierarchical structure that shows main lessons and their steps.
+    Served from the precomputed content index.
     
     Returns:
         A dictionary where:
@@ -16,21 +17,7 @@ def get_lesson_structure() -> Dict[str, List[str]]:
             "lesson_3": ["lesson_3_step_1", "lesson_3_step_2"]
         }
     """
-    lessons = content_loader.load_content('lessons')
-    lesson_structure = {}
-    
-    for key in lessons.keys():
-        if "_step_" in key:
-            main_lesson = key.split("_step_")[0]
-            if main_lesson not in lesson_structure:
-                lesson_structure[main_lesson] = []
-            lesson_structure[main_lesson].append(key)
-    
-    # Sort steps within each lesson
-    for main_lesson in lesson_structure:
-        lesson_structure[main_lesson].sort()
-    
-    return lesson_structure
+    return {lesson: list(steps) for lesson, steps in content_loader.index.lesson_steps.items()}
 
 def is_actual_lesson(lesson_key: str) -> bool:
     """
@@ -50,10 +37,10 @@ def is_actual_lesson(lesson_key: str) -> bool:
 
 def get_total_lesson_steps() -> int:
     """
-    Counts the total number of actual learning steps across all lessons.
+    Counts the total number of actual learning steps across all lessons
+    (precomputed when the content index is built).
     
     Returns:
         The total number of lesson steps
     """
-    structure = get_lesson_structure()
-    return sum(len(steps) for steps in structure.values())
\ No newline at end of file
+    return content_loader.index.total_steps
@@ -3,12 +3,12 @@ from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 from typing import Optional, Dict, Any
 from services.content_loader import content_loader
+from services.lesson_renderer import LessonRenderCache
 from services.database import UserManager
 import logging
 
 
 logger = logging.getLogger(__name__)
-lessons = content_loader.load_content('lessons')
 
 
 class LessonService:
@@ -39,33 +39,16 @@ class LessonService:
             # Update progress
             await self.user_manager.update_user_progress(chat_id, lesson_key)
             
-            # Get lesson content using content_loader
-            lessons = content_loader.load_content('lessons')
-            lesson = lessons.get(lesson_key)
+            # Pre-rendered HTML and keyboard for the current content version
+            rendered = LessonRenderCache.get(lesson_key)
             
-            if lesson:
-                # Format progress header
-                parts = lesson_key.split('_')
-                lesson_num = parts[1] if len(parts) > 1 else '1'
-                step_num = parts[3] if len(parts) > 3 and 'step' in parts else None
-                
-                # Create progress header
-                header = f"<b>📚 Lesson {lesson_num} of 6</b>"
-                if step_num:
-                    header += f"\n<i>Step {step_num}</i>"
-                header += "\n\n"
-                
-                # Prepare message with header
-                message = header + lesson["text"].replace('[', '<').replace(']', '>')
-                
+            if rendered:
                 await context.bot.send_message(
                     chat_id=chat_id,
-                    text=message,
+                    text=rendered.telegram_html,
                     disable_web_page_preview=True,
                     parse_mode='HTML',
-                    reply_markup=InlineKeyboardMarkup([
-                        [InlineKeyboardButton("✅", callback_data=lesson["next"])]
-                    ]) if lesson.get("next") else None
+                    reply_markup=rendered.telegram_markup
                 )
                 
         except KeyError as e:
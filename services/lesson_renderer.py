@@ -0,0 +1,182 @@
+"""
+Pre-rendered lesson messages for every platform.
+
+Sending a lesson used to rebuild the progress header, rewrite the text's
+[tag] markup to HTML and rebuild keyboards/blocks on every send. The
+LessonRenderCache renders every lesson and step once per content version:
+
+- Telegram: final HTML text and the inline keyboard
+- Slack: Block Kit blocks, plus the lesson-choice menu
+- Web: the serialized /lessons and /lessons/<id> JSON bodies with their ETags
+  (and the snapshot's load time for Last-Modified)
+
+When the content snapshot changes version, the whole cache is rebuilt on the
+next lookup, so a send is a dictionary lookup.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from services.content_loader import content_loader, ContentSnapshot, STEP_KEY_REGEX
+
+logger = logging.getLogger(__name__)
+
+
+def _json_bytes(payload: Dict[str, Any]) -> Tuple[bytes, str]:
+    """Serialize a web payload and derive its strong ETag."""
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return body, f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+class RenderedLesson:
+    """Final per-platform payloads for one lesson or step"""
+
+    __slots__ = ("lesson_id", "next", "telegram_html", "telegram_markup",
+                 "slack_blocks", "web_body", "web_etag")
+
+    def __init__(self, lesson_id: str, lesson: Dict[str, Any], lesson_num: str,
+                 step_num: Optional[str], lesson_count: int):
+        self.lesson_id = lesson_id
+        self.next = lesson.get("next")
+        text = lesson.get("text", "")
+
+        # Telegram: HTML header, [b]...[/b] style tags turned into HTML
+        header = f"<b>📚 Lesson {lesson_num} of {lesson_count}</b>"
+        if step_num:
+            header += f"\n<i>Step {step_num}</i>"
+        self.telegram_html = header + "\n\n" + text.replace('[', '<').replace(']', '>')
+        self.telegram_markup = InlineKeyboardMarkup([
+            [InlineKeyboardButton("✅", callback_data=self.next)]
+        ]) if self.next else None
+
+        # Slack: section with the lesson text and a Continue button
+        blocks: List[Dict[str, Any]] = [{
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": text
+            }
+        }]
+        if self.next:
+            blocks.append({
+                "type": "actions",
+                "elements": [{
+                    "type": "button",
+                    "text": {
+                        "type": "plain_text",
+                        "text": "Continue"
+                    },
+                    "value": self.next,
+                    "action_id": f"lesson_next_{self.next}"
+                }]
+            })
+        self.slack_blocks = blocks
+
+        # Web: same header as the bot, in plain text
+        web_header = f"📚 Lesson {lesson_num} of {lesson_count}"
+        if step_num:
+            web_header += f"\nStep {step_num}"
+        self.web_body, self.web_etag = _json_bytes({
+            "status": "success",
+            "lesson": {
+                "lesson_id": lesson_id,
+                "title": lesson.get("title", f"Lesson {lesson_num}"),
+                "text": f"{web_header}\n\n{text}",
+                "next": self.next  # Next lesson ID
+            }
+        })
+
+
+class RenderedContent:
+    """Everything rendered from one content snapshot"""
+
+    def __init__(self, snapshot: ContentSnapshot):
+        self.version = snapshot.version
+        self.loaded_at = datetime.fromtimestamp(snapshot.loaded_at, timezone.utc)
+        lessons = snapshot.content['lessons']
+        lesson_count = sum(
+            1 for lesson in snapshot.index.full_lessons.values()
+            if isinstance(lesson, dict) and lesson.get("type") == "full_lesson"
+        )
+
+        self.lessons: Dict[str, RenderedLesson] = {}
+        for lesson_id, lesson in lessons.items():
+            if not isinstance(lesson, dict):
+                continue
+            match = STEP_KEY_REGEX.match(lesson_id)
+            parts = lesson_id.split('_')
+            lesson_num = parts[1] if len(parts) > 1 else '1'
+            step_num = match.group('number') if match else None
+            self.lessons[lesson_id] = RenderedLesson(lesson_id, lesson, lesson_num, step_num, lesson_count)
+
+        # Lessons offered in the /start menus
+        menu = [
+            (lesson_id, lesson) for lesson_id, lesson in snapshot.index.full_lessons.items()
+            if lesson_id != "lesson_1"
+            and "congratulations" not in lesson_id.lower()
+            and isinstance(lesson, dict) and lesson.get("type") == "full_lesson"
+        ]
+        self.telegram_menu_markup = InlineKeyboardMarkup([
+            [InlineKeyboardButton(f"📚 {lesson.get('description')}", callback_data=lesson_id)]
+            for lesson_id, lesson in menu
+        ]) if menu else None
+        self.slack_menu_blocks = [{
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": "Welcome to Growth Clinic! 🌱\n\nReady to future-proof your career? Choose your learning path:"
+            }
+        }] + [{
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"*{lesson.get('description')}*"
+            },
+            "accessory": {
+                "type": "button",
+                "text": {
+                    "type": "plain_text",
+                    "text": "Start",
+                    "emoji": True
+                },
+                "value": lesson_id,
+                "action_id": f"start_lesson_{lesson_id}"
+            }
+        } for lesson_id, lesson in menu]
+
+        self.list_body, self.list_etag = _json_bytes({
+            "status": "success",
+            "lessons": [
+                {"lesson_id": key, "title": value.get("title", f"Lesson {key}")}
+                for key, value in lessons.items() if isinstance(value, dict)
+            ]
+        })
+
+
+class LessonRenderCache:
+    """Per-content-version cache of rendered lessons"""
+
+    _rendered: Optional[RenderedContent] = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def current() -> RenderedContent:
+        """Rendered content for the current snapshot, re-rendered after a reload."""
+        snapshot = content_loader.snapshot
+        rendered = LessonRenderCache._rendered
+        if rendered is None or rendered.version != snapshot.version:
+            with LessonRenderCache._lock:
+                rendered = LessonRenderCache._rendered
+                if rendered is None or rendered.version != snapshot.version:
+                    rendered = RenderedContent(snapshot)
+                    LessonRenderCache._rendered = rendered
+                    logger.info(f"Rendered {len(rendered.lessons)} lessons for content version {rendered.version}")
+        return rendered
+
+    @staticmethod
+    def get(lesson_id: str) -> Optional[RenderedLesson]:
+        return LessonRenderCache.current().lessons.get(lesson_id)
@@ -0,0 +1,35 @@
+"""
+Opaque cursor tokens for resumable, keyset-based iteration.
+
+A token is the URL-safe base64 encoding of a small JSON object describing the
+last position a client has seen. Clients treat it as an opaque string and send
+it back to continue where they left off.
+"""
+
+import base64
+import binascii
+import json
+from typing import Dict, Any
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """Encode a position (e.g. {"id": "<last _id>"}) as an opaque token."""
+    raw = json.dumps(position, separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+    """
+    Decode a token produced by encode_cursor().
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, UnicodeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid cursor token: {e}") from e
+    if not isinstance(position, dict):
+        raise ValueError("Invalid cursor token")
+    return position
@@ -1,9 +1,10 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from datetime import datetime, timezone, timedelta
+from datetime import timezone, timedelta
 import logging
 from typing import Dict, Any, List, Optional
-from services.database import JournalManager, UserManager, AnalyticsManager
+from services.database import UserManager, AnalyticsManager
+from services.streaks import StreakEngine
 
 logger = logging.getLogger(__name__)
 
@@ -12,48 +13,12 @@ class ProgressTracker:
     
     @staticmethod
     def calculate_streak(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Calculate comprehensive streak information."""
+        """Calculate comprehensive streak information from journal entries."""
         if not entries:
             return {"current_streak": 0, "longest_streak": 0, "total_days": 0}
             
         try:
-            # Sort entries by timestamp
-            sorted_entries = sorted(entries, key=lambda x: x['timestamp'], reverse=True)
-            
-            # Calculate current streak
-            current_streak = 1
-            longest_streak = 1
-            current_streak_start = datetime.fromisoformat(sorted_entries[0]['timestamp'].replace('Z', '+00:00')).date()
-            
-            # Track streaks
-            temp_streak = 1
-            last_date = current_streak_start
-            
-            for entry in sorted_entries[1:]:
-                entry_date = datetime.fromisoformat(entry['timestamp'].replace('Z', '+00:00')).date()
-                days_diff = (last_date - entry_date).days
-                
-                if days_diff == 1:
-                    temp_streak += 1
-                    longest_streak = max(longest_streak, temp_streak)
-                    current_streak = temp_streak
-                elif days_diff > 1:
-                    temp_streak = 1
-                    if entry_date != current_streak_start:
-                        break
-                        
-                last_date = entry_date
-            
-            # Calculate total active days
-            unique_days = len(set(datetime.fromisoformat(entry['timestamp'].replace('Z', '+00:00')).date() 
-                               for entry in entries))
-            
-            return {
-                "current_streak": current_streak,
-                "longest_streak": longest_streak,
-                "total_days": unique_days
-            }
-            
+            return StreakEngine.from_entries(entries).summary()
         except Exception as e:
             logger.error(f"Error calculating streak details: {e}")
             return {"current_streak": 0, "longest_streak": 0, "total_days": 0}
@@ -61,15 +26,22 @@ class ProgressTracker:
     def format_progress_message(self, journal_entries: List[Dict[str, Any]], 
                               quality_metrics: Dict[str, Any],
                               platform: str = 'telegram',
-                              total_lessons: int = 24) -> Dict[str, Any]:
-        """Format progress information with platform-specific formatting."""
+                              total_lessons: int = 24,
+                              streak_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Format progress information with platform-specific formatting.
+
+        Pass streak_info from AnalyticsManager.get_streak_info() to avoid
+        recomputing streaks from the entries.
+        """
         try:
             if not journal_entries:
                 base_message = "No entries yet! Start your learning journey with your first entry! 🌱"
                 return self._format_for_platform(base_message, platform)
 
             # Get comprehensive streak information
-            streak_info = self.calculate_streak(journal_entries)
+            if streak_info is None:
+                streak_info = self.calculate_streak(journal_entries)
             
             # Calculate completion metrics
             completed_lessons = len(set(entry['lesson'] for entry in journal_entries))
@@ -154,12 +126,9 @@ class ProgressTracker:
             message += f"• Engagement Score: {metrics.get('engagement_score', 0):.1f}/100\n"
             message += f"• Avg Response Length: {metrics.get('average_response_length', 0)} words\n"
             
-            # Get streak info if available
-            journal = await JournalManager.get_user_journal(user_id)
-            if journal and journal.get('entries'):
-                streak_info = self.calculate_streak(journal['entries'])
-                if streak_info.get('current_streak', 0) > 0:
-                    message += f"• Current Streak: {streak_info['current_streak']} days 🔥\n"
+            # Streak comes from the precomputed day buckets
+            if metrics.get('current_streak', 0) > 0:
+                message += f"• Current Streak: {metrics['current_streak']} days 🔥\n"
 
             # Learning Pattern
             message += "\n*Learning Pattern*\n"
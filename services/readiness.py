@@ -0,0 +1,74 @@
+"""
+Startup readiness registry.
+
+Heavy subsystems (the MongoDB pool, the Telegram application, the scoring
+workers, WordNet, the skill index, Slack) warm up after the web server has
+bound its port, so Render's health check and Telegram's webhook delivery are
+not held up by imports and warm-up work. Each subsystem reports here when it
+is warm (or has failed), and the /ready endpoint serves the snapshot.
+"""
+
+import logging
+import time
+from typing import Dict, Any, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Subsystems that must be warm before the service can handle updates
+REQUIRED_SUBSYSTEMS = ("mongodb", "content", "telegram")
+
+_started_at = time.monotonic()
+_subsystems: Dict[str, Dict[str, Any]] = {}
+_import_profile: Optional[Dict[str, Any]] = None
+
+
+class Readiness:
+    """Tracks which subsystems are warm"""
+
+    @staticmethod
+    def expect(*names: str) -> None:
+        """Register subsystems that will warm up later, so they show up as pending."""
+        for name in names:
+            _subsystems.setdefault(name, {"status": "pending"})
+
+    @staticmethod
+    def mark_ready(name: str, started: Optional[float] = None) -> None:
+        """
+        Record that a subsystem is warm.
+
+        Args:
+            name: Subsystem name
+            started: time.monotonic() when its warm-up began, to record how long it took
+        """
+        now = time.monotonic()
+        entry = {"status": "ready", "ready_after_seconds": round(now - _started_at, 3)}
+        if started is not None:
+            entry["warmup_seconds"] = round(now - started, 3)
+        _subsystems[name] = entry
+        logger.info(f"Subsystem ready: {name}")
+
+    @staticmethod
+    def mark_failed(name: str, error: Any) -> None:
+        _subsystems[name] = {"status": "failed", "error": str(error)}
+        logger.error(f"Subsystem failed to warm up: {name}: {error}")
+
+    @staticmethod
+    def is_ready(names: Iterable[str] = REQUIRED_SUBSYSTEMS) -> bool:
+        return all(_subsystems.get(name, {}).get("status") == "ready" for name in names)
+
+    @staticmethod
+    def set_import_profile(profile: Dict[str, Any]) -> None:
+        global _import_profile
+        _import_profile = profile
+
+    @staticmethod
+    def snapshot() -> Dict[str, Any]:
+        snapshot = {
+            "ready": Readiness.is_ready(),
+            "uptime_seconds": round(time.monotonic() - _started_at, 3),
+            "required": list(REQUIRED_SUBSYSTEMS),
+            "subsystems": dict(_subsystems)
+        }
+        if _import_profile is not None:
+            snapshot["import_profile"] = _import_profile
+        return snapshot
@@ -0,0 +1,221 @@
+"""
+Reminder broadcasts to inactive learners.
+
+A scheduler job nudges Telegram learners who have not been active for
+REMINDER_INACTIVE_DAYS and have notifications enabled, inviting them back to
+their current lesson. At most one nudge is sent per stretch of inactivity
+(last_nudged_at is compared with last_active).
+
+Users are streamed from MongoDB in batches, in (last_active, _id) order
+along an index, so the collection is never loaded at once. Messages go
+out in the BROADCAST lane of the send scheduler, which paces them under
+Telegram's limits behind replies to active learners. After every batch the
+run's position is checkpointed in `broadcast_runs`, so a run interrupted
+by a restart resumes where it stopped rather than starting over.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, Optional, Tuple
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import Forbidden, BadRequest
+from config.settings import Config
+from services.content_loader import content_loader
+from services.database import get_db
+from services.send_scheduler import Priority
+
+logger = logging.getLogger(__name__)
+
+RUN_ID = "inactive_reminders"
+
+
+class ReminderBroadcaster:
+    """Checkpointed, paced nudges to inactive learners"""
+
+    def __init__(self, inactive_days: int = 3, batch_size: int = 200):
+        """
+        Args:
+            inactive_days: Days without activity before a learner is nudged
+            batch_size: Users read and messaged per batch (and per checkpoint)
+        """
+        self.inactive_days = inactive_days
+        self.batch_size = batch_size
+        self._running = False
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    async def run(self, bot) -> Optional[Dict[str, Any]]:
+        """
+        Nudge every eligible learner, resuming an interrupted run if there is one.
+
+        Args:
+            bot: The Telegram application's bot
+
+        Returns:
+            Summary of the run, or None if one is already in progress
+        """
+        if self._running:
+            return None
+        self._running = True
+        try:
+            return await self._run(bot)
+        except Exception as e:
+            logger.error(f"Reminder broadcast failed: {e}", exc_info=True)
+            return None
+        finally:
+            self._running = False
+
+    async def _run(self, bot) -> Dict[str, Any]:
+        db = await get_db()
+        run = await db.broadcast_runs.find_one({"_id": RUN_ID, "status": "running"})
+        if run:
+            logger.info(f"Resuming reminder broadcast from {run.get('position')}")
+        else:
+            now = datetime.now(timezone.utc)
+            run = {
+                "_id": RUN_ID,
+                "status": "running",
+                # last_active is stored as a UTC isoformat string, so ISO cutoffs compare correctly
+                "cutoff": (now - timedelta(days=self.inactive_days)).isoformat(),
+                "position": None,
+                "started_at": now,
+                "sent": 0,
+                "blocked": 0,
+                "skipped": 0,
+                "failed": 0
+            }
+            await db.broadcast_runs.replace_one({"_id": RUN_ID}, run, upsert=True)
+
+        messages: Dict[str, Optional[Tuple[str, InlineKeyboardMarkup]]] = {}
+        while True:
+            users = await db.users.find(
+                self._query(run["cutoff"], run["position"]),
+                {"user_id": 1, "telegram_id": 1, "first_name": 1, "current_lesson": 1, "last_active": 1}
+            ).sort([("last_active", 1), ("_id", 1)]).limit(self.batch_size).to_list(length=self.batch_size)
+            if not users:
+                break
+
+            results = await asyncio.gather(*(self._nudge(db, bot, user, messages) for user in users))
+            for outcome in results:
+                run[outcome] = run.get(outcome, 0) + 1
+
+            last = users[-1]
+            run["position"] = {"last_active": last["last_active"], "id": last["_id"]}
+            await db.broadcast_runs.update_one({"_id": RUN_ID}, {"$set": {
+                "position": run["position"],
+                "sent": run["sent"],
+                "blocked": run["blocked"],
+                "skipped": run["skipped"],
+                "failed": run["failed"],
+                "updated_at": datetime.now(timezone.utc)
+            }})
+
+        finished = datetime.now(timezone.utc)
+        await db.broadcast_runs.update_one({"_id": RUN_ID}, {"$set": {
+            "status": "completed",
+            "finished_at": finished
+        }})
+        self.last_run = {
+            "cutoff": run["cutoff"],
+            "sent": run["sent"],
+            "blocked": run["blocked"],
+            "skipped": run["skipped"],
+            "failed": run["failed"],
+            "finished_at": finished.isoformat()
+        }
+        logger.info(
+            f"Reminder broadcast finished: {run['sent']} sent, "
+            f"{run['blocked']} blocked, {run['skipped']} skipped, {run['failed']} failed"
+        )
+        return self.last_run
+
+    @staticmethod
+    def _query(cutoff: str, position: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Inactive Telegram learners with notifications on, not nudged since they were last active."""
+        if position is None:
+            ranges = [{"last_active": {"$lt": cutoff}}]
+        else:
+            # Keyset continuation after the last user of the previous batch
+            ranges = [
+                {"last_active": {"$gt": position["last_active"], "$lt": cutoff}},
+                {"last_active": position["last_active"], "_id": {"$gt": position["id"]}}
+            ]
+        # Learners who signed up in the bot have platform "telegram"; web accounts
+        # that linked Telegram list it in platforms. Each branch has its own
+        # (platform(s), last_active, _id) index, merged in sort order.
+        return {
+            "$or": [
+                {field: "telegram", **key_range}
+                for field in ("platform", "platforms")
+                for key_range in ranges
+            ],
+            "learning_preferences.notification_enabled": {"$ne": False},
+            "current_lesson": {"$exists": True},
+            "$expr": {"$lt": [{"$ifNull": ["$last_nudged_at", ""]}, "$last_active"]}
+        }
+
+    @staticmethod
+    def _message(lesson_id: str) -> Optional[Tuple[str, InlineKeyboardMarkup]]:
+        """Nudge text (with a {name} placeholder) and Resume button for a lesson."""
+        index = content_loader.index
+        lesson = index.lessons.get(lesson_id)
+        if not isinstance(lesson, dict):
+            return None
+        parent = index.lessons.get(index.step_lesson.get(lesson_id, lesson_id), lesson)
+        title = lesson.get("title") or parent.get("title") or parent.get("description") or "your lesson"
+        text = (
+            "👋 Hi{name}! Your learning journey is waiting for you.\n\n"
+            f"📚 Pick up where you left off: {title}\n\n"
+            "Tap Resume below or send /resume."
+        )
+        return text, InlineKeyboardMarkup([[InlineKeyboardButton("▶️ Resume", callback_data=lesson_id)]])
+
+    async def _nudge(self, db, bot, user: Dict[str, Any],
+                     messages: Dict[str, Optional[Tuple[str, InlineKeyboardMarkup]]]) -> str:
+        chat_id = user.get("telegram_id") or user.get("user_id")
+        lesson_id = user.get("current_lesson")
+        if lesson_id not in messages:
+            messages[lesson_id] = self._message(lesson_id)
+        message = messages[lesson_id]
+        if not chat_id or message is None:
+            # No chat to reach, or the lesson is no longer in the content
+            return "skipped"
+
+        text, markup = message
+        first_name = user.get("first_name")
+        outcome = "sent"
+        try:
+            await bot.send_message(
+                chat_id=chat_id,
+                text=text.replace("{name}", f" {first_name}" if first_name else ""),
+                reply_markup=markup,
+                rate_limit_args={"priority": Priority.BROADCAST}
+            )
+        except Forbidden:
+            # The learner blocked the bot; stop nudging them
+            outcome = "blocked"
+            await db.users.update_one(
+                {"_id": user["_id"]},
+                {"$set": {"learning_preferences.notification_enabled": False}}
+            )
+        except BadRequest as e:
+            logger.warning(f"Could not nudge user {user.get('user_id')}: {e}")
+            outcome = "failed"
+        except Exception as e:
+            logger.error(f"Error nudging user {user.get('user_id')}: {e}")
+            return "failed"
+
+        await db.users.update_one(
+            {"_id": user["_id"]},
+            {"$set": {"last_nudged_at": datetime.now(timezone.utc).isoformat()}}
+        )
+        return outcome
+
+    def stats(self) -> Dict[str, Any]:
+        return {"running": self._running, "last_run": self.last_run}
+
+
+reminder_broadcaster = ReminderBroadcaster(
+    inactive_days=Config.REMINDER_INACTIVE_DAYS,
+    batch_size=Config.REMINDER_BATCH_SIZE
+)
@@ -0,0 +1,82 @@
+"""
+Shared, single-pass text analysis for user responses.
+
+A ResponseAnalysis lowercases, tokenizes, stems and sentence-splits a response
+exactly once. Every analyzer stage in services.feedback_enhanced reads from the
+same object instead of re-scanning the raw text.
+"""
+
+import re
+from functools import cached_property
+from typing import List, Dict, Set, Union
+from services.skill_index import tokenize, stem_word
+
+SENTENCE_REGEX = re.compile(r'[.!?]+')
+PUNCTUATION_REGEX = re.compile(r'[.!?]')
+
+# Compiled once per distinct pattern for the life of the process
+_compiled_patterns: Dict[str, re.Pattern] = {}
+
+
+def _compile(pattern: str) -> re.Pattern:
+    compiled = _compiled_patterns.get(pattern)
+    if compiled is None:
+        compiled = _compiled_patterns[pattern] = re.compile(pattern)
+    return compiled
+
+
+class ResponseAnalysis:
+    """Tokenized view of one response, shared by all analyzer stages"""
+
+    def __init__(self, response_text: str):
+        self.text = response_text.strip()
+        self.lower = self.text.lower()
+        self.words = self.lower.split()
+        self._pattern_hits: Dict[str, bool] = {}
+
+    @classmethod
+    def of(cls, response: Union[str, "ResponseAnalysis"]) -> "ResponseAnalysis":
+        """Return the response as a ResponseAnalysis, analyzing raw text if needed."""
+        if isinstance(response, cls):
+            return response
+        return cls(response)
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        """Lowercase word tokens with punctuation removed."""
+        return tokenize(self.lower)
+
+    @cached_property
+    def stems(self) -> List[str]:
+        """Porter stems of every token."""
+        return [stem_word(token) for token in self.tokens]
+
+    @cached_property
+    def sentences(self) -> List[str]:
+        """Non-empty lowercase sentences."""
+        return [s for s in SENTENCE_REGEX.split(self.lower) if s.strip()]
+
+    @cached_property
+    def sentence_word_sets(self) -> List[Set[str]]:
+        """Set of words in each sentence, used for topic consistency."""
+        return [set(s.split()) for s in self.sentences]
+
+    @cached_property
+    def paragraph_count(self) -> int:
+        return len(self.lower.split('\n\n'))
+
+    @cached_property
+    def has_punctuation(self) -> bool:
+        return bool(PUNCTUATION_REGEX.search(self.text))
+
+    def search(self, pattern: str) -> bool:
+        """
+        Check whether a regex pattern occurs in the lowercased response.
+
+        Results are memoized per analysis, so patterns shared between stages
+        (e.g. 'because') are only scanned once.
+        """
+        hit = self._pattern_hits.get(pattern)
+        if hit is None:
+            hit = self._pattern_hits[pattern] = bool(_compile(pattern).search(self.lower))
+        return hit
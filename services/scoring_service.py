@@ -0,0 +1,238 @@
+"""
+Process-pool scoring service for NLP feedback and quality analysis.
+
+Keyword evaluation and response quality analysis are CPU-bound (regex scans,
+stemming, WordNet-backed skill matching, coherence overlap). Running them on
+the event loop that also serves Quart and the Telegram webhook lets one long
+essay stall every other user. ScoringService runs them in a
+ProcessPoolExecutor whose workers are pre-warmed with WordNet and the skill
+index, and exposes both as awaitables. Short texts are still scored inline,
+where the round trip to a worker would cost more than the work itself.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from config.settings import Config
+from services.readiness import Readiness
+from services.feedback_enhanced import (
+    evaluate_response_enhanced, analyze_response_quality, FeedbackCache,
+    get_cached_response_quality, cache_response_quality
+)
+
+logger = logging.getLogger(__name__)
+
+_WARMUP_TEXT = (
+    "I researched our users and prototyped a new onboarding flow because the "
+    "data showed customers struggled. Next we will iterate on the design."
+)
+
+
+def _init_worker() -> None:
+    """Load WordNet and the skill index once per worker process."""
+    from services.feedback_enhanced import DynamicSkillAnalyzer
+    from services.skill_index import get_skill_index, ensure_wordnet
+
+    ensure_wordnet()
+    get_skill_index(DynamicSkillAnalyzer.SKILL_INDICATORS)
+    analyze_response_quality(_WARMUP_TEXT)
+
+
+def _ping() -> bool:
+    return True
+
+
+def _evaluate_with_cache_entry(lesson_id: str, response_text: str, user_id: int) -> Tuple[List[str], Optional[str]]:
+    """Evaluate and also return what was cached, so the caller can cache it in its own process and shared tier."""
+    feedback = evaluate_response_enhanced(lesson_id, response_text, user_id)
+    return feedback, FeedbackCache.get_cached_feedback(user_id, lesson_id, response_text)
+
+
+class ScoringService:
+    """Runs NLP scoring off the event loop with per-task timing metrics"""
+
+    def __init__(self, workers: int = 2, inline_max_chars: int = 400, timeout_seconds: float = 10):
+        """
+        Args:
+            workers: Worker processes; 0 scores everything inline
+            inline_max_chars: Responses up to this length are scored inline
+            timeout_seconds: Time allowed for one task in the pool
+        """
+        self.workers = workers
+        self.inline_max_chars = inline_max_chars
+        self.timeout_seconds = timeout_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._warming: Optional[ProcessPoolExecutor] = None
+        self._restart: Optional[asyncio.Task] = None
+        self.pending = 0
+        self.max_pending = 0
+        self.fallbacks = 0
+        self._timings: Dict[str, Dict[str, float]] = {}
+
+    async def start(self) -> None:
+        """
+        Create the pool and wait until every worker is warmed up. Until then
+        responses keep being scored inline.
+        """
+        if self._executor is not None or self._warming is not None:
+            return
+        if self.workers <= 0:
+            Readiness.mark_ready("scoring_pool")
+            return
+        executor = self._warming = ProcessPoolExecutor(
+            max_workers=self.workers,
+            # Spawned workers do not inherit the parent's event loop or DB client
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*(loop.run_in_executor(executor, _ping) for _ in range(self.workers)))
+        except Exception as e:
+            # Scoring carries on inline until the pool is restarted
+            Readiness.mark_failed("scoring_pool", e)
+            self.stop()
+            return
+        if self._warming is not executor:
+            # stop() was called while the workers were warming up
+            return
+        self._executor, self._warming = executor, None
+        logger.info(f"Scoring pool warmed up with {self.workers} workers in {time.perf_counter() - started:.2f}s")
+        Readiness.mark_ready("scoring_pool")
+
+    def stop(self) -> None:
+        restart = self._restart
+        if restart is not None and not restart.done() and restart is not asyncio.current_task():
+            restart.cancel()
+        for executor in (self._executor, self._warming):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._warming = None
+
+    async def evaluate(self, lesson_id: str, response_text: str, user_id: int) -> List[str]:
+        """Awaitable evaluate_response_enhanced()."""
+        cached = await FeedbackCache.get_shared_feedback(user_id, lesson_id, response_text)
+        if cached:
+            return [cached]
+
+        if self._use_pool(response_text):
+            feedback, cacheable = await self._run_in_pool(
+                "evaluate", _evaluate_with_cache_entry, _fallback_feedback, lesson_id, response_text, user_id
+            )
+        else:
+            feedback, cacheable = self._timed_inline(
+                "evaluate", _evaluate_with_cache_entry, lesson_id, response_text, user_id
+            )
+        if cacheable:
+            await FeedbackCache.share_feedback(user_id, lesson_id, response_text, cacheable)
+        return feedback
+
+    async def analyze(self, response_text: str, user_id: Optional[int] = None,
+                      lesson_id: Optional[str] = None) -> Dict[str, Any]:
+        """Awaitable analyze_response_quality()."""
+        if not self._use_pool(response_text):
+            return self._timed_inline("analyze", analyze_response_quality, response_text, user_id, lesson_id)
+
+        cached = get_cached_response_quality(response_text, user_id, lesson_id)
+        if cached is not None:
+            return cached
+
+        metrics = await self._run_in_pool(
+            "analyze", analyze_response_quality, lambda: _fallback_quality(response_text),
+            response_text, user_id, lesson_id
+        )
+        if 'error' not in metrics:
+            cache_response_quality(response_text, user_id, lesson_id, metrics)
+        return metrics
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers if self._executor is not None else 0,
+            "inline_max_chars": self.inline_max_chars,
+            "queue_depth": self.pending,
+            "max_queue_depth": self.max_pending,
+            "fallbacks": self.fallbacks,
+            "tasks": {
+                name: {
+                    "count": int(t["count"]),
+                    "avg_ms": round(t["total"] / t["count"] * 1000, 2) if t["count"] else 0.0,
+                    "max_ms": round(t["max"] * 1000, 2)
+                }
+                for name, t in self._timings.items()
+            }
+        }
+
+    def _use_pool(self, response_text: str) -> bool:
+        return self._executor is not None and len(response_text) > self.inline_max_chars
+
+    def _record(self, name: str, elapsed: float) -> None:
+        t = self._timings.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+        t["count"] += 1
+        t["total"] += elapsed
+        t["max"] = max(t["max"], elapsed)
+
+    def _timed_inline(self, kind: str, fn: Callable, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self._record(f"{kind}_inline", time.perf_counter() - started)
+
+    async def _run_in_pool(self, kind: str, fn: Callable, fallback: Callable[[], Any], *args):
+        """
+        Run fn in the pool. If the pool breaks or the task times out, return
+        fallback() rather than redoing the work on this process, which would
+        pay for it twice and hold the GIL the event loop needs.
+        """
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        self.pending += 1
+        self.max_pending = max(self.max_pending, self.pending)
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(self._executor, fn, *args),
+                timeout=self.timeout_seconds
+            )
+        except (BrokenProcessPool, asyncio.TimeoutError) as e:
+            # A task that already started keeps its worker until it finishes;
+            # wait_for() only cancels it if it was still queued
+            logger.error(f"Scoring pool failed for {kind} ({type(e).__name__}), using fallback result")
+            self.fallbacks += 1
+            if isinstance(e, BrokenProcessPool) and (self._restart is None or self._restart.done()):
+                self.stop()
+                # Keep a reference so the restart task is not garbage collected
+                self._restart = asyncio.create_task(self.start())
+            return fallback()
+        finally:
+            self.pending -= 1
+            self._record(f"{kind}_pool", time.perf_counter() - started)
+
+
+def _fallback_feedback() -> Tuple[List[str], Optional[str]]:
+    return ["Thanks for your response! Let's continue with the lesson."], None
+
+
+def _fallback_quality(response_text: str) -> Dict[str, Any]:
+    """The basic fields of analyze_response_quality(), without any NLP."""
+    return {
+        'length': len(response_text),
+        'word_count': len(response_text.split()),
+        'sentence_count': len([s for s in re.split(r'[.!?]+', response_text) if s.strip()]),
+        'has_punctuation': False,
+        'includes_details': False,
+        'error': "Scoring unavailable"
+    }
+
+
+scoring_service = ScoringService(
+    workers=Config.SCORING_WORKERS,
+    inline_max_chars=Config.SCORING_INLINE_MAX_CHARS,
+    timeout_seconds=Config.SCORING_TIMEOUT_SECONDS
+)
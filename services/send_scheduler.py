@@ -0,0 +1,260 @@
+"""
+Rate-limited outbound message scheduling for the Telegram bot.
+
+Every Bot API call made through the application's bot passes through
+SendScheduler, a PTB BaseRateLimiter, so handlers keep calling
+context.bot.send_message / reply_text as before. Requests addressed to a chat
+are spread out to stay under Telegram's limits:
+
+- a global token bucket (TELEGRAM_GLOBAL_RATE messages/s);
+- a bucket per chat (TELEGRAM_CHAT_RATE messages/s with a small burst,
+  TELEGRAM_GROUP_RATE for group chats), evicted once idle.
+
+Waiters are served by priority lane, then in arrival order, so replies to
+learners go out ahead of admin reports, and both ahead of broadcasts. The
+lane comes from rate_limit_args={"priority": Priority.BROADCAST} when the
+caller passes it, otherwise from the lane of the handler that is running
+(see send_lane()), otherwise INTERACTIVE.
+
+When Telegram answers 429 anyway, all sending pauses for its retry_after and
+the request is retried. Queue depth per lane and send latency (waiting plus
+the API call) are exposed through stats().
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from datetime import timedelta
+from enum import IntEnum
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Send lanes; lower values are served first"""
+    INTERACTIVE = 0
+    ADMIN = 1
+    BROADCAST = 2
+
+
+_current_lane: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "telegram_send_lane", default=Priority.INTERACTIVE
+)
+
+
+def send_lane(priority: Priority, callback: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Wrap a handler callback so the messages it sends use the given lane."""
+    @wraps(callback)
+    async def wrapper(*args, **kwargs):
+        token = _current_lane.set(priority)
+        try:
+            return await callback(*args, **kwargs)
+        finally:
+            _current_lane.reset(token)
+    return wrapper
+
+
+class TokenBucket:
+    """Token bucket whose waiters are served by (priority, arrival)"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._waiters: List[tuple] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def idle(self, now: float) -> bool:
+        """No waiters and fully refilled, i.e. indistinguishable from a new bucket."""
+        return not self._waiters and self.tokens + (now - self.updated) * self.rate >= self.burst
+
+    def pause(self, seconds: float) -> None:
+        """Grant nothing for the given time (e.g. after a 429)."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def acquire(self, priority: int = Priority.INTERACTIVE) -> None:
+        now = time.monotonic()
+        self._refill(now)
+        if not self._waiters and now >= self.paused_until and self.tokens >= 1:
+            self.tokens -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._seq), future))
+        self._dispatch()
+        await future
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        self._refill(now)
+        if now >= self.paused_until:
+            while self._waiters and self.tokens >= 1:
+                _, _, future = heapq.heappop(self._waiters)
+                if future.done():  # Cancelled while waiting
+                    continue
+                self.tokens -= 1
+                future.set_result(None)
+        # Drop cancelled waiters left at the head
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+
+        if self._waiters and self._timer is None:
+            delay = max((1 - self.tokens) / self.rate, self.paused_until - now, 0.001)
+            self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+
+class SendScheduler(BaseRateLimiter[Dict[str, Any]]):
+    """Global and per-chat throttling of bot requests, with priority lanes"""
+
+    def __init__(self, global_rate: float = 30, chat_rate: float = 1, chat_burst: float = 3,
+                 group_rate: float = 20 / 60, max_retries: int = 3, latency_samples: int = 1000):
+        """
+        Args:
+            global_rate: Messages per second across all chats
+            chat_rate: Messages per second to one private chat
+            chat_burst: Messages a private chat may receive back to back
+            group_rate: Messages per second to one group chat
+            max_retries: Retries of a request answered with 429
+            latency_samples: Recent send latencies kept per lane
+        """
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chats: Dict[Any, TokenBucket] = {}
+        self._sweep_at = 1024
+
+        self._waiting = {lane: 0 for lane in Priority}
+        self._sent = {lane: 0 for lane in Priority}
+        self._latencies = {lane: deque(maxlen=latency_samples) for lane in Priority}
+        self.in_flight = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failed = 0
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    @staticmethod
+    def _priority(rate_limit_args: Optional[Dict[str, Any]]) -> Priority:
+        if isinstance(rate_limit_args, dict) and rate_limit_args.get("priority") is not None:
+            return Priority(rate_limit_args["priority"])
+        return _current_lane.get()
+
+    def _chat_bucket(self, chat_id: Any) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self._sweep_at:
+                now = time.monotonic()
+                for key in [key for key, b in self._chats.items() if b.idle(now)]:
+                    del self._chats[key]
+                self._sweep_at = max(1024, 2 * len(self._chats))
+            # Negative ids and @usernames are groups and channels
+            is_group = isinstance(chat_id, str) or (isinstance(chat_id, int) and chat_id < 0)
+            bucket = TokenBucket(self.group_rate, 1) if is_group else TokenBucket(self.chat_rate, self.chat_burst)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        chat_id = data.get("chat_id")
+        if chat_id is None:
+            # Not a message to a chat (answerCallbackQuery, setWebhook, ...)
+            return await callback(*args, **kwargs)
+        try:
+            chat_id = int(chat_id)
+        except (TypeError, ValueError):
+            pass
+
+        priority = self._priority(rate_limit_args)
+        started = time.monotonic()
+        for attempt in range(self.max_retries + 1):
+            self._waiting[priority] += 1
+            try:
+                await self._chat_bucket(chat_id).acquire(priority)
+                await self._global.acquire(priority)
+            finally:
+                self._waiting[priority] -= 1
+
+            self.in_flight += 1
+            try:
+                result = await callback(*args, **kwargs)
+            except RetryAfter as e:
+                self.rate_limited += 1
+                delay = e.retry_after
+                if isinstance(delay, timedelta):
+                    delay = delay.total_seconds()
+                if attempt == self.max_retries:
+                    self.failed += 1
+                    logger.error(f"{endpoint} to {chat_id} still rate limited after {self.max_retries} retries")
+                    raise
+                # Telegram throttles the bot as a whole, so hold every lane
+                logger.warning(f"Rate limited on {endpoint} to {chat_id}; pausing sends for {delay}s")
+                self._global.pause(float(delay) + 0.1)
+                self.retries += 1
+                continue
+            finally:
+                self.in_flight -= 1
+
+            self._sent[priority] += 1
+            self._latencies[priority].append(time.monotonic() - started)
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        def percentile(samples: List[float], p: float) -> float:
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))], 4) if samples else 0.0
+
+        lanes = {}
+        for lane in Priority:
+            latencies = sorted(self._latencies[lane])
+            lanes[lane.name.lower()] = {
+                "waiting": self._waiting[lane],
+                "sent": self._sent[lane],
+                "latency_seconds": {
+                    "p50": percentile(latencies, 0.5),
+                    "p95": percentile(latencies, 0.95)
+                }
+            }
+        return {
+            "lanes": lanes,
+            "in_flight": self.in_flight,
+            "chat_buckets": len(self._chats),
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "failed": self.failed,
+            "paused_for_seconds": round(max(0.0, self._global.paused_until - time.monotonic()), 3)
+        }
+
+
+send_scheduler = SendScheduler(
+    global_rate=Config.TELEGRAM_GLOBAL_RATE,
+    chat_rate=Config.TELEGRAM_CHAT_RATE,
+    chat_burst=Config.TELEGRAM_CHAT_BURST,
+    group_rate=Config.TELEGRAM_GROUP_RATE,
+    max_retries=Config.TELEGRAM_MAX_RETRIES
+)
@@ -0,0 +1,223 @@
+"""
+Precomputed stem/synonym index for skill pattern matching.
+
+DynamicSkillAnalyzer used to call WordNet and re-stem the whole response for
+every pattern of every skill. The SkillIndex maps the stem of each pattern and
+of each of its WordNet synonyms to the (skill, pattern) pairs it satisfies, so a
+response only has to be tokenized and stemmed once and then resolved with
+dictionary lookups.
+
+The index is persisted to Config.SKILL_INDEX_PATH so later processes can load
+it without touching WordNet at all. NLTK itself is only imported on first use,
+so importing this module stays cheap at startup.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, Any, Iterable, Optional, Set, Tuple
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+TOKEN_REGEX = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+_stemmer = None
+_wordnet_ready = False
+_nltk_lock = threading.Lock()
+
+
+def get_stemmer():
+    """Return the shared PorterStemmer, importing NLTK on first use."""
+    global _stemmer
+    if _stemmer is None:
+        with _nltk_lock:
+            if _stemmer is None:
+                from nltk.stem import PorterStemmer
+                _stemmer = PorterStemmer()
+    return _stemmer
+
+
+def ensure_wordnet():
+    """
+    Return the WordNet corpus reader, downloading the corpus if it is missing
+    and loading it on first use.
+    """
+    global _wordnet_ready
+    from nltk.corpus import wordnet
+    if not _wordnet_ready:
+        with _nltk_lock:
+            if not _wordnet_ready:
+                import nltk
+                try:
+                    nltk.data.find('corpora/wordnet')
+                except LookupError:
+                    nltk.download('wordnet')
+                wordnet.ensure_loaded()
+                _wordnet_ready = True
+    return wordnet
+
+
+def wordnet_loaded() -> bool:
+    return _wordnet_ready
+
+
+@lru_cache(maxsize=20000)
+def stem_word(word: str) -> str:
+    """Stem a single lowercase word, memoized across responses."""
+    return get_stemmer().stem(word)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return TOKEN_REGEX.findall(text.lower())
+
+
+class SkillIndex:
+    """Resolves response stems to the skill patterns they satisfy"""
+
+    def __init__(self, index: Dict[str, List[Tuple[str, str]]], fingerprint: str):
+        self._index = index
+        self.fingerprint = fingerprint
+
+    @staticmethod
+    def fingerprint_for(skill_indicators: Dict[str, Dict[str, Any]]) -> str:
+        """Hash of the skill configuration, used to detect a stale index file."""
+        payload = json.dumps(
+            {"version": INDEX_FORMAT_VERSION, "skills": skill_indicators},
+            sort_keys=True
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def build(cls, skill_indicators: Dict[str, Dict[str, Any]]) -> "SkillIndex":
+        """
+        Build the index from the skill configuration using WordNet.
+
+        Args:
+            skill_indicators: Mapping of skill name to config with a "patterns" list
+
+        Returns:
+            A new SkillIndex
+        """
+        wordnet = ensure_wordnet()
+
+        index: Dict[str, List[Tuple[str, str]]] = {}
+
+        def add(key: str, skill: str, pattern: str) -> None:
+            entries = index.setdefault(key, [])
+            if (skill, pattern) not in entries:
+                entries.append((skill, pattern))
+
+        for skill, config in skill_indicators.items():
+            for pattern in config['patterns']:
+                pattern_lower = pattern.lower()
+                add(stem_word(pattern_lower), skill, pattern)
+
+                for syn in wordnet.synsets(pattern_lower):
+                    for lemma in syn.lemmas():
+                        name = lemma.name().lower()
+                        # Multi-word lemmas (e.g. "look_into") never appear as a single token
+                        if '_' in name or not TOKEN_REGEX.fullmatch(name):
+                            continue
+                        add(stem_word(name), skill, pattern)
+
+        logger.info(f"Built skill index with {len(index)} stems")
+        return cls(index, cls.fingerprint_for(skill_indicators))
+
+    @classmethod
+    def load(cls, path: str, fingerprint: str) -> Optional["SkillIndex"]:
+        """Load a persisted index, returning None if missing or stale."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("fingerprint") != fingerprint:
+                logger.info("Skill index on disk is stale, rebuilding")
+                return None
+            index = {
+                key: [tuple(entry) for entry in entries]
+                for key, entries in data["index"].items()
+            }
+            return cls(index, fingerprint)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not load skill index from {path}: {e}")
+            return None
+
+    def save(self, path: str) -> None:
+        """Persist the index atomically as compact JSON."""
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(
+                    {"fingerprint": self.fingerprint, "index": self._index},
+                    f,
+                    separators=(',', ':')
+                )
+            os.replace(tmp_path, path)
+            logger.info(f"Skill index saved to {path}")
+        except Exception as e:
+            logger.warning(f"Could not save skill index to {path}: {e}")
+
+    def match_stems(self, stems: Iterable[str]) -> Dict[str, Set[str]]:
+        """
+        Resolve a response's stems against the index.
+
+        Args:
+            stems: Stems of every token in the response
+
+        Returns:
+            Dictionary of skill name to the set of its patterns that matched
+        """
+        matched: Dict[str, Set[str]] = {}
+        for stem in set(stems):
+            for skill, pattern in self._index.get(stem, ()):
+                matched.setdefault(skill, set()).add(pattern)
+        return matched
+
+    def match_text(self, text: str) -> Dict[str, Set[str]]:
+        """Tokenize and stem the text once, then resolve it against the index."""
+        return self.match_stems(stem_word(token) for token in tokenize(text))
+
+
+_skill_index: Optional[SkillIndex] = None
+# The indicators _skill_index was built from; held (not just its id) so the id cannot be reused
+_skill_index_source: Optional[Dict[str, Dict[str, Any]]] = None
+
+
+def get_skill_index(skill_indicators: Dict[str, Dict[str, Any]]) -> SkillIndex:
+    """
+    Get the process-wide skill index, loading it from disk or building it once.
+
+    The configuration is fingerprinted only when a different object is passed,
+    so repeat calls with the same (unmodified) SKILL_INDICATORS are free.
+
+    Args:
+        skill_indicators: The skill configuration the index is built from
+    """
+    global _skill_index, _skill_index_source
+
+    if _skill_index is not None and skill_indicators is _skill_index_source:
+        return _skill_index
+
+    fingerprint = SkillIndex.fingerprint_for(skill_indicators)
+    if _skill_index is not None and _skill_index.fingerprint == fingerprint:
+        _skill_index_source = skill_indicators
+        return _skill_index
+
+    path = Config.SKILL_INDEX_PATH
+    index = SkillIndex.load(path, fingerprint)
+    if index is None:
+        index = SkillIndex.build(skill_indicators)
+        index.save(path)
+
+    _skill_index = index
+    _skill_index_source = skill_indicators
+    return _skill_index
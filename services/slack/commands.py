@@ -2,6 +2,7 @@ from slack_bolt import App
 from services.database import UserManager, JournalManager
 from services.progress_tracker import ProgressTracker
 from services.content_loader import content_loader
+from services.lesson_renderer import LessonRenderCache
 import logging
 from datetime import datetime, timezone
 
@@ -79,33 +80,10 @@ def init_slack_commands(app: App) -> None:
                 }]
                 await say(blocks=blocks)
                 
-                # Get lesson content
-                lessons = content_loader.load_content('lessons')
-                lesson = lessons.get(user_data["current_lesson"])
-                if lesson:
-                    blocks = [{
-                        "type": "section",
-                        "text": {
-                            "type": "mrkdwn",
-                            "text": lesson['text']
-                        }
-                    }]
-                    
-                    if lesson.get('next'):
-                        blocks.append({
-                            "type": "actions",
-                            "elements": [{
-                                "type": "button",
-                                "text": {
-                                    "type": "plain_text",
-                                    "text": "Continue"
-                                },
-                                "value": lesson['next'],
-                                "action_id": f"lesson_next_{lesson['next']}"
-                            }]
-                        })
-                    
-                    await say(blocks=blocks)
+                # Pre-rendered blocks for the current content version
+                rendered = LessonRenderCache.get(user_data["current_lesson"])
+                if rendered:
+                    await say(blocks=rendered.slack_blocks)
             else:
                 await say("No previous progress found. Use `/start` to begin!")
                 
@@ -113,34 +91,51 @@ def init_slack_commands(app: App) -> None:
             logger.error(f"Error handling resume command: {e}")
             await say("Error resuming progress. Please try again.")
 
+    def journal_blocks(page):
+        """Blocks for one journal page, newest first, with a button for older entries"""
+        blocks = [{
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": "📖 *Your Learning Journal*"
+            }
+        }]
+        
+        for entry in page["entries"]:
+            blocks.append({
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": f"*Lesson:* {entry['lesson']}\n*Response:* {entry['response'][:200]}...\n*Date:* {entry['timestamp']}\n"
+                }
+            })
+        
+        if page["next_cursor"]:
+            blocks.append({
+                "type": "actions",
+                "elements": [{
+                    "type": "button",
+                    "text": {
+                        "type": "plain_text",
+                        "text": "Older entries"
+                    },
+                    "value": page["next_cursor"],
+                    "action_id": "journal_older"
+                }]
+            })
+        return blocks
+
     @app.command("/journal")
     async def handle_journal(ack, say, command):
         """Handle the /journal command"""
         await ack()
         try:
             user_id = command["user_id"]
-            journal = await JournalManager.get_user_journal(user_id)
+            # Latest 5 entries; older pages continue from the button's cursor
+            page = await JournalManager.get_journal_page(user_id, per_page=5)
             
-            if journal and journal.get("entries"):
-                blocks = [{
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": "📖 *Your Learning Journal*"
-                    }
-                }]
-                
-                # Show last 5 entries
-                for entry in journal["entries"][-5:]:
-                    blocks.append({
-                        "type": "section",
-                        "text": {
-                            "type": "mrkdwn",
-                            "text": f"*Lesson:* {entry['lesson']}\n*Response:* {entry['response'][:200]}...\n*Date:* {entry['timestamp']}\n"
-                        }
-                    })
-                
-                await say(blocks=blocks)
+            if page["entries"]:
+                await say(blocks=journal_blocks(page))
             else:
                 await say("No journal entries found yet. Complete some lessons first!")
                 
@@ -148,6 +143,26 @@ def init_slack_commands(app: App) -> None:
             logger.error(f"Error handling journal command: {e}")
             await say("Error retrieving journal. Please try again.")
 
+    @app.action("journal_older")
+    async def handle_journal_older(ack, body, say):
+        """Show the next page of older journal entries"""
+        await ack()
+        try:
+            user_id = body["user"]["id"]
+            cursor = body["actions"][0]["value"]
+            page = await JournalManager.get_journal_page(user_id, cursor, per_page=5)
+            
+            if page["entries"]:
+                await say(blocks=journal_blocks(page))
+            else:
+                await say("No older journal entries.")
+                
+        except ValueError:
+            await say("This journal page has expired. Use `/journal` to start again.")
+        except Exception as e:
+            logger.error(f"Error handling journal page: {e}")
+            await say("Error retrieving journal. Please try again.")
+
     @app.command("/progress")
     async def handle_progress(ack, say, command):
         """Handle the /progress command"""
@@ -1,13 +1,13 @@
-from slack_bolt import App
 from slack_bolt.async_app import AsyncApp
-from slack_bolt.adapter.socket_mode import SocketModeHandler
+import asyncio
 import logging
 from datetime import datetime, timezone
 from services.progress_tracker import ProgressTracker
 from services.database import UserManager, JournalManager
 from services.lesson_manager import LessonService
-from services.content_loader import content_loader
-from services.feedback_enhanced import evaluate_response_enhanced, analyze_response_quality, format_feedback_message
+from services.lesson_renderer import LessonRenderCache
+from services.feedback_enhanced import format_feedback_message
+from services.scoring_service import scoring_service
 from config.settings import Config
 
 # Configure logging
@@ -66,40 +66,8 @@ async def handle_start_command(ack, say, body, client):  # Added client paramete
             'platform': 'slack'  # Add platform identifier
         })
         
-        # Get main lessons
-        lessons = content_loader.get_full_lessons(platform='slack')
-        
-        # Create welcome message
-        blocks = [{
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": "Welcome to Growth Clinic! 🌱\n\nReady to future-proof your career? Choose your learning path:"
-            }
-        }]
-        
-        # Add lesson choices as buttons
-        for lesson_id, lesson in lessons.items():
-            if (lesson_id != "lesson_1" and 
-                not "congratulations" in lesson_id.lower() and 
-                lesson.get("type") == "full_lesson"):
-                blocks.append({
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"*{lesson.get('description')}*"
-                    },
-                    "accessory": {
-                        "type": "button",
-                        "text": {
-                            "type": "plain_text",
-                            "text": "Start",
-                            "emoji": True
-                        },
-                        "value": lesson_id,
-                        "action_id": f"start_lesson_{lesson_id}"
-                    }
-                })
+        # Lesson menu pre-rendered for the current content version
+        blocks = LessonRenderCache.current().slack_menu_blocks
 
         await say(blocks=blocks)
         
@@ -118,37 +86,11 @@ async def handle_lesson_choice(body, say, ack):
         success = await UserManager.update_user_progress(user_id, lesson_id)
         
         if success:
-            # Get lesson content
-            lessons = content_loader.load_content('lessons')
-            lessons = content_loader.format_for_platform(lessons, platform='slack')
-            lesson = lessons.get(lesson_id)
+            # Pre-rendered blocks for the current content version
+            rendered = LessonRenderCache.get(lesson_id)
             
-            if lesson:
-                # Format message with lesson content
-                blocks = [{
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": lesson['text']
-                    }
-                }]
-                
-                # Add next button if available
-                if lesson.get('next'):
-                    blocks.append({
-                        "type": "actions",
-                        "elements": [{
-                            "type": "button",
-                            "text": {
-                                "type": "plain_text",
-                                "text": "Continue"
-                            },
-                            "value": lesson['next'],
-                            "action_id": f"lesson_next_{lesson['next']}"
-                        }]
-                    })
-                
-                await say(blocks=blocks)
+            if rendered:
+                await say(blocks=rendered.slack_blocks)
             else:
                 await say("Sorry, I couldn't find that lesson. Please try /start again.")
         else:
@@ -195,8 +137,10 @@ async def handle_message(message, say):
             return
             
         # Enhanced response evaluation
-        feedback = evaluate_response_enhanced(current_lesson, text, user_id)
-        quality_metrics = analyze_response_quality(text)
+        feedback, quality_metrics = await asyncio.gather(
+            scoring_service.evaluate(current_lesson, text, user_id),
+            scoring_service.analyze(text, user_id, current_lesson)
+        )
         
         # Format feedback with progress information
         progress_tracker = ProgressTracker()
@@ -206,39 +150,16 @@ async def handle_message(message, say):
         await say(feedback_message) # Send enhanced feedback
         
         # Progress to next lesson if available
-        lessons = content_loader.load_content('lessons')
-        lessons = content_loader.format_for_platform(lessons, platform='slack')
-        lesson_data = lessons.get(current_lesson, {})
-        next_step = lesson_data.get("next")
+        rendered_content = LessonRenderCache.current()
+        current = rendered_content.lessons.get(current_lesson)
+        next_step = current.next if current else None
         
         if next_step:
-            success = await UserManager.update_user_progress(user_id, next_step)
+            success = await UserManager.update_user_progress(user_id, next_step, expected_lesson=current_lesson)
             if success:
-                lesson = lessons.get(next_step)
+                lesson = rendered_content.lessons.get(next_step)
                 if lesson:
-                    blocks = [{
-                        "type": "section",
-                        "text": {
-                            "type": "mrkdwn",
-                            "text": lesson['text']
-                        }
-                    }]
-                    
-                    if lesson.get('next'):
-                        blocks.append({
-                            "type": "actions",
-                            "elements": [{
-                                "type": "button",
-                                "text": {
-                                    "type": "plain_text",
-                                    "text": "Continue"
-                                },
-                                "value": lesson['next'],
-                                "action_id": f"lesson_next_{lesson['next']}"
-                            }]
-                        })
-                    
-                    await say(blocks=blocks)
+                    await say(blocks=lesson.slack_blocks)
                 else:
                     logger.error(f"Next lesson {next_step} not found")
                     await say("Error loading next lesson. Please use /resume to continue.")
@@ -253,7 +174,7 @@ async def handle_message(message, say):
         await say("I encountered an error processing your response. Please try again.")
 
 
-def start_slack_bot():
+async def start_slack_bot():
     """Start the Slack bot"""
     try:
         # Use AsyncSocketModeHandler instead
@@ -261,9 +182,10 @@ def start_slack_bot():
         
         handler = AsyncSocketModeHandler(app, Config.SLACK_APP_TOKEN)
         logger.info("Starting Slack bot in Socket Mode...")
-        # Use .start_async() instead of .start()
-        handler.start_async()
+        # connect_async() opens the socket and returns; start_async() would block forever
+        await handler.connect_async()
         logger.info("Slack bot started successfully")
+        return handler
     except Exception as e:
         logger.error(f"Failed to start Slack bot: {e}")
-        raise
\ No newline at end of file
+        raise
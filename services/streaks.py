@@ -0,0 +1,113 @@
+"""
+Streak computation over precomputed day buckets.
+
+A StreakEngine keeps a user's active days as a sorted array('i') of date
+ordinals together with the length of the trailing run and the longest run, so
+recording a new day and reading current/longest streak are O(1) amortized
+instead of re-sorting and re-parsing every journal timestamp.
+"""
+
+import logging
+from array import array
+from bisect import bisect_left
+from datetime import date
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def day_ordinal(timestamp: str) -> int:
+    """Convert an ISO timestamp (stored in UTC) to its day ordinal."""
+    return date.fromisoformat(timestamp[:10]).toordinal()
+
+
+def _runs(days: Iterable[int]) -> Tuple[int, int]:
+    """
+    Single pass over sorted, unique day ordinals.
+
+    Returns:
+        Tuple of (length of the trailing run, length of the longest run)
+    """
+    run = longest = 0
+    previous = None
+    for day in days:
+        run = run + 1 if previous is not None and day == previous + 1 else 1
+        if run > longest:
+            longest = run
+        previous = day
+    return run, longest
+
+
+class StreakEngine:
+    """Sorted day buckets for one user with incrementally maintained streaks"""
+
+    __slots__ = ("days", "_run_length", "_longest")
+
+    def __init__(self, days: Iterable[int] = ()):
+        """
+        Args:
+            days: Day ordinals (date.toordinal()) with at least one entry, any order
+        """
+        self.days = array('i', sorted(set(days)))
+        self._run_length, self._longest = _runs(self.days)
+
+    @classmethod
+    def from_entries(cls, entries: List[Dict[str, Any]]) -> "StreakEngine":
+        """Build an engine from journal entries carrying ISO 'timestamp' fields."""
+        return cls(day_ordinal(entry['timestamp']) for entry in entries if entry.get('timestamp'))
+
+    def add_day(self, day: int) -> bool:
+        """
+        Record activity on a day.
+
+        Appending today (the common case) is O(1). A day older than the latest
+        one is inserted in order and the runs are recomputed.
+
+        Returns:
+            True if the day was new
+        """
+        days = self.days
+        if days and day <= days[-1]:
+            index = bisect_left(days, day)
+            if days[index] == day:
+                return False
+            days.insert(index, day)
+            self._run_length, self._longest = _runs(days)
+            return True
+
+        self._run_length = self._run_length + 1 if days and day == days[-1] + 1 else 1
+        days.append(day)
+        if self._run_length > self._longest:
+            self._longest = self._run_length
+        return True
+
+    def current_streak(self, today: Optional[int] = None) -> int:
+        """
+        Consecutive days ending at the most recent active day.
+
+        Args:
+            today: Optional day ordinal; if given, a run that ended before
+                   yesterday no longer counts as current
+        """
+        if not self.days:
+            return 0
+        if today is not None and self.days[-1] < today - 1:
+            return 0
+        return self._run_length
+
+    @property
+    def longest_streak(self) -> int:
+        return self._longest
+
+    @property
+    def total_days(self) -> int:
+        return len(self.days)
+
+    def summary(self, today: Optional[int] = None) -> Dict[str, int]:
+        """Streak information in the shape used by ProgressTracker."""
+        return {
+            "current_streak": self.current_streak(today),
+            "longest_streak": self._longest,
+            "total_days": len(self.days)
+        }
+
@@ -0,0 +1,59 @@
+"""
+Unit of work for coalescing MongoDB writes.
+
+Handling one message touches several collections with small independent
+writes. Instead of awaiting each one in turn, callers hand their operations
+(pymongo InsertOne/UpdateOne/...) to a UnitOfWork, which flushes them as one
+ordered bulk_write per collection, with the collections written concurrently.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Any
+
+logger = logging.getLogger(__name__)
+
+
+class UnitOfWork:
+    """Collects write operations per collection and flushes them together"""
+
+    def __init__(self):
+        self._operations: Dict[str, List[Any]] = {}
+
+    def add(self, collection: str, *operations: Any) -> None:
+        """
+        Queue write operations for a collection.
+
+        Operations on the same collection are applied in the order they were added.
+        """
+        self._operations.setdefault(collection, []).extend(operations)
+
+    def __len__(self) -> int:
+        return sum(len(ops) for ops in self._operations.values())
+
+    async def flush(self) -> bool:
+        """
+        Write everything queued so far: one bulk_write per collection, all
+        collections concurrently.
+
+        Returns:
+            True if every collection's bulk write succeeded
+        """
+        if not self._operations:
+            return True
+
+        from services.database import get_db
+        db = await get_db()
+
+        pending, self._operations = self._operations, {}
+        results = await asyncio.gather(
+            *(db[name].bulk_write(ops, ordered=True) for name, ops in pending.items()),
+            return_exceptions=True
+        )
+
+        success = True
+        for name, result in zip(pending, results):
+            if isinstance(result, Exception):
+                logger.error(f"Bulk write to {name} failed: {result}")
+                success = False
+        return success
@@ -0,0 +1,151 @@
+"""
+Idempotent intake of Telegram webhook updates.
+
+The webhook only validates an update, drops ones it has already seen and puts
+it on the bot application's update queue, so Telegram gets its 200 within
+milliseconds and does not retry while a lesson or feedback is being produced.
+The application processes queued updates in the background.
+
+Duplicates are caught twice:
+
+- at intake, against a bounded in-memory set of recent update_ids;
+- before processing, by claiming the update_id in the `telegram_updates`
+  collection (unique _id, expired by a TTL index), so updates redelivered
+  across a restart are not processed again.
+
+Intake-to-processing lag is recorded for /metrics.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+from pymongo.errors import DuplicateKeyError
+from telegram import Update
+from telegram.ext import ApplicationHandlerStop
+from config.settings import Config
+from services.database import get_db
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateIntake:
+    """Dedupes webhook updates and tracks their queueing lag"""
+
+    def __init__(self, max_seen: int = 10000, ttl_seconds: int = 86400, lag_samples: int = 1000):
+        """
+        Args:
+            max_seen: Recent update_ids remembered in memory
+            ttl_seconds: How long claimed update_ids are kept in MongoDB
+            lag_samples: Recent lag measurements kept for percentiles
+        """
+        self.max_seen = max_seen
+        self.ttl_seconds = ttl_seconds
+        self._seen: "OrderedDict[int, None]" = OrderedDict()
+        # update_id -> time.monotonic() at intake, until the update is processed
+        self._received: Dict[int, float] = {}
+        self._lags = deque(maxlen=lag_samples)
+        self._update_queue: Optional[asyncio.Queue] = None
+
+        self.accepted = 0
+        self.duplicates = 0
+        self.replays_skipped = 0
+        self.processed = 0
+        self.max_lag = 0.0
+
+    async def start(self, update_queue: asyncio.Queue) -> None:
+        """Create the TTL index on claimed updates and remember the queue to feed."""
+        self._update_queue = update_queue
+        db = await get_db()
+        await db.telegram_updates.create_index("received_at", expireAfterSeconds=self.ttl_seconds)
+
+    def accept(self, payload: Dict[str, Any], bot) -> Optional[Update]:
+        """
+        Queue a webhook payload for processing unless it was seen recently.
+
+        Args:
+            payload: Decoded update JSON with an integer update_id
+            bot: The application's bot, for deserializing the update
+
+        Returns:
+            The queued Update, or None for a duplicate
+        """
+        update_id = payload["update_id"]
+        if update_id in self._seen:
+            self._seen.move_to_end(update_id)
+            self.duplicates += 1
+            logger.debug(f"Dropping duplicate update {update_id}")
+            return None
+
+        update = Update.de_json(payload, bot)
+        self._seen[update_id] = None
+        if len(self._seen) > self.max_seen:
+            self._seen.popitem(last=False)
+        self._received[update_id] = time.monotonic()
+        self._update_queue.put_nowait(update)
+        self.accepted += 1
+        return update
+
+    async def claim(self, update_id: int) -> bool:
+        """
+        Claim an update for processing and record its lag.
+
+        Returns:
+            False if the update was already processed, possibly before a restart
+        """
+        received = self._received.pop(update_id, None)
+        if received is not None:
+            lag = time.monotonic() - received
+            self._lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+        try:
+            db = await get_db()
+            await db.telegram_updates.insert_one({
+                "_id": update_id,
+                "received_at": datetime.now(timezone.utc)
+            })
+        except DuplicateKeyError:
+            self.replays_skipped += 1
+            logger.info(f"Skipping update {update_id}, already processed")
+            return False
+        except Exception as e:
+            # Prefer processing a possible duplicate over dropping the update
+            logger.warning(f"Could not record update {update_id}: {e}")
+
+        self.processed += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        lags = sorted(self._lags)
+
+        def percentile(p: float) -> float:
+            return round(lags[min(len(lags) - 1, int(p * len(lags)))], 4) if lags else 0.0
+
+        return {
+            "accepted": self.accepted,
+            "processed": self.processed,
+            "duplicates": self.duplicates,
+            "replays_skipped": self.replays_skipped,
+            "queued": self._update_queue.qsize() if self._update_queue else 0,
+            "awaiting_processing": len(self._received),
+            "lag_seconds": {
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(self.max_lag, 4)
+            }
+        }
+
+
+update_intake = UpdateIntake(
+    max_seen=Config.UPDATE_DEDUPE_MAX_ENTRIES,
+    ttl_seconds=Config.UPDATE_DEDUPE_TTL_SECONDS
+)
+
+
+async def claim_update(update: Update, context) -> None:
+    """First handler for every update; stops processing of already-handled updates."""
+    if not await update_intake.claim(update.update_id):
+        raise ApplicationHandlerStop
@@ -0,0 +1,129 @@
+"""
+Concurrent Telegram update processing with per-chat ordering.
+
+The bot application hands every update to ChatOrderedUpdateProcessor, which
+runs updates from different chats in parallel (up to UPDATE_CONCURRENCY at a
+time) while updates from the same chat run one after another, in arrival
+order. That keeps per-chat state such as lesson progress, user_data and the
+email ConversationHandler consistent without making one slow learner hold
+up everyone else.
+
+Per-chat locks only exist while a chat has updates running or waiting, so
+memory is bounded by in-flight chats rather than by all chats ever seen.
+
+Everything happens in do_process_update(), the extension point PTB provides.
+PTB's own semaphore, taken before do_process_update(), therefore bounds the
+updates admitted (UPDATE_MAX_PENDING, running or waiting for their chat),
+while a separate slot semaphore, taken after the chat lock, bounds the
+updates actually running (UPDATE_CONCURRENCY).
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Dict, Any, Optional
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+
+class _ChatLock:
+    """A lock and the number of updates holding or waiting for it"""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """Processes updates concurrently across chats and sequentially within one"""
+
+    def __init__(self, max_concurrent_updates: int, max_pending_updates: int = 1024):
+        """
+        Args:
+            max_concurrent_updates: Updates running at once
+            max_pending_updates: Updates admitted at once, including those waiting for their chat
+        """
+        super().__init__(max(max_pending_updates, max_concurrent_updates))
+        self.max_running_updates = max_concurrent_updates
+        self._slots = asyncio.Semaphore(max_concurrent_updates)
+        self._chats: Dict[int, _ChatLock] = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.processed = 0
+        self.serialized = 0
+
+    @staticmethod
+    def _chat_key(update: object) -> Optional[int]:
+        if not isinstance(update, Update):
+            return None
+        if update.effective_chat is not None:
+            return update.effective_chat.id
+        if update.effective_user is not None:
+            return update.effective_user.id
+        return None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        """
+        Wait for the chat's previous updates, then for a free slot, then run the update.
+
+        The chat lock is taken before the slot, so updates queued behind a
+        busy chat do not occupy slots other chats could use. asyncio.Lock
+        wakes waiters first-in first-out, which preserves arrival order
+        within a chat.
+        """
+        key = self._chat_key(update)
+        if key is None:
+            await self._run(coroutine)
+            return
+
+        chat = self._chats.get(key)
+        if chat is None:
+            chat = self._chats[key] = _ChatLock()
+        chat.users += 1
+        if chat.lock.locked():
+            self.serialized += 1
+        try:
+            async with chat.lock:
+                await self._run(coroutine)
+        finally:
+            chat.users -= 1
+            if chat.users == 0:
+                # Idle chat: drop its lock
+                del self._chats[key]
+
+    async def _run(self, coroutine: Awaitable[Any]) -> None:
+        async with self._slots:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                await coroutine
+            finally:
+                self.in_flight -= 1
+                self.processed += 1
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent_updates": self.max_running_updates,
+            "max_pending_updates": self.max_concurrent_updates,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "active_chats": len(self._chats),
+            "processed": self.processed,
+            "serialized_behind_same_chat": self.serialized
+        }
+
+
+update_processor = ChatOrderedUpdateProcessor(
+    max(1, Config.UPDATE_CONCURRENCY),
+    max_pending_updates=max(1, Config.UPDATE_MAX_PENDING)
+)
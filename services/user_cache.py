@@ -0,0 +1,118 @@
+"""
+User identity cache shared by the API and bot handlers.
+
+User documents are looked up by user_id, email and telegram_id several times
+while handling a single request or Telegram update. UserCache keeps them at two
+levels:
+
+- a request/update scope (a dict held in a ContextVar) that lives only as long
+  as one HTTP request or one Telegram update, and
+- a small process-wide LRU with a short TTL.
+
+Every UserManager mutator invalidates the user's entries in both levels, so a
+write is never followed by a stale read in the same process. The short TTL
+bounds staleness caused by writes from other processes.
+"""
+
+import copy
+import logging
+from contextvars import ContextVar
+from typing import Dict, Any, Optional
+from services.cache import LRUTTLCache
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+# Identity fields a user document can be looked up by
+IDENTITY_FIELDS = ("user_id", "email", "telegram_id")
+
+_request_scope: ContextVar[Optional[Dict[str, Dict[str, Any]]]] = ContextVar(
+    "user_cache_request_scope", default=None
+)
+
+
+def _key(field: str, value: Any) -> str:
+    return f"{field}:{value}"
+
+
+class UserCache:
+    """Two-level cache of user documents keyed by every identity they carry"""
+
+    _process_cache = LRUTTLCache(
+        max_entries=Config.USER_CACHE_MAX_ENTRIES,
+        ttl_seconds=Config.USER_CACHE_TTL_SECONDS
+    )
+
+    @staticmethod
+    def begin_scope() -> None:
+        """Start a fresh request/update scope for the current context."""
+        _request_scope.set({})
+
+    @staticmethod
+    def get(field: str, value: Any) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached user document.
+
+        Args:
+            field: One of IDENTITY_FIELDS
+            value: The identity value
+
+        Returns:
+            A copy of the cached document, or None on a miss
+        """
+        key = _key(field, value)
+        scope = _request_scope.get()
+        user = scope.get(key) if scope is not None else None
+        if user is None:
+            user = UserCache._process_cache.get(key)
+            if user is None:
+                return None
+            if scope is not None:
+                UserCache._store_in_scope(scope, user)
+        # Callers mutate the documents they get back
+        return copy.deepcopy(user)
+
+    @staticmethod
+    def put(user: Dict[str, Any]) -> None:
+        """Cache a user document under each identity it carries."""
+        user = copy.deepcopy(user)
+        user.pop('_id', None)
+        scope = _request_scope.get()
+        if scope is not None:
+            UserCache._store_in_scope(scope, user)
+        for field in IDENTITY_FIELDS:
+            if user.get(field) is not None:
+                UserCache._process_cache.set(_key(field, user[field]), user)
+
+    @staticmethod
+    def invalidate(field: str, value: Any) -> None:
+        """
+        Drop a user from both levels, under every identity the cached copy had.
+
+        Args:
+            field: The identity the write was keyed on
+            value: The identity value
+        """
+        key = _key(field, value)
+        scope = _request_scope.get()
+        keys = {key}
+        for cached in (scope.get(key) if scope is not None else None,
+                       UserCache._process_cache.get(key)):
+            if cached:
+                keys.update(
+                    _key(f, cached[f]) for f in IDENTITY_FIELDS if cached.get(f) is not None
+                )
+        for k in keys:
+            UserCache._process_cache.delete(k)
+            if scope is not None:
+                scope.pop(k, None)
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        return UserCache._process_cache.stats()
+
+    @staticmethod
+    def _store_in_scope(scope: Dict[str, Dict[str, Any]], user: Dict[str, Any]) -> None:
+        for field in IDENTITY_FIELDS:
+            if user.get(field) is not None:
+                scope[_key(field, user[field])] = user
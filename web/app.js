@@ -903,8 +903,8 @@ async function fetchProgress() {
     }
 }
 
-// Fetch journal entries
-async function fetchJournal(page = 1, perPage = 10) {
+// Fetch journal entries; cursor is a next_cursor/prev_cursor from the previous page
+async function fetchJournal(cursor = null, page = 1, perPage = 10) {
     const token = getAuthToken();
     if (!token) {
         showError("Please log in first.");
@@ -916,7 +916,9 @@ async function fetchJournal(page = 1, perPage = 10) {
     journalList.innerHTML = '<div class="has-text-centered">Loading journal entries...</div>';
 
     try {
-        const response = await fetch(`${API_BASE_URL}/journal?page=${page}&per_page=${perPage}`, {
+        const params = new URLSearchParams({ per_page: perPage });
+        if (cursor) params.set('cursor', cursor);
+        const response = await fetch(`${API_BASE_URL}/journal?${params}`, {
             headers: {
                 "Authorization": `Bearer ${token}`,
                 "Content-Type": "application/json"
@@ -980,60 +982,27 @@ async function fetchJournal(page = 1, perPage = 10) {
             // Update pagination controls
             if (data.pagination) {
                 paginationContainer.classList.remove('is-hidden');
-                const { current_page, total_pages } = data.pagination;
+                const { next_cursor, prev_cursor, total_pages } = data.pagination;
 
                 // Update Previous/Next buttons
                 const prevButton = paginationContainer.querySelector('.pagination-previous');
                 const nextButton = paginationContainer.querySelector('.pagination-next');
                 
-                prevButton.disabled = current_page <= 1;
-                nextButton.disabled = current_page >= total_pages;
+                prevButton.disabled = !prev_cursor;
+                nextButton.disabled = !next_cursor;
                 
-                prevButton.onclick = () => fetchJournal(current_page - 1, perPage);
-                nextButton.onclick = () => fetchJournal(current_page + 1, perPage);
+                prevButton.onclick = () => prev_cursor && fetchJournal(prev_cursor, Math.max(1, page - 1), perPage);
+                nextButton.onclick = () => next_cursor && fetchJournal(next_cursor, page + 1, perPage);
 
-                // Generate page numbers
+                // Pages are reached by stepping through cursors, so only the current position is shown
                 const paginationList = paginationContainer.querySelector('.pagination-list');
                 paginationList.innerHTML = '';
-
-                // Helper function to add page number
-                const addPageNumber = (pageNum) => {
-                    const li = document.createElement('li');
-                    const a = document.createElement('a');
-                    a.className = `pagination-link ${pageNum === current_page ? 'is-current' : ''}`;
-                    a.textContent = pageNum;
-                    a.onclick = () => fetchJournal(pageNum, perPage);
-                    li.appendChild(a);
-                    paginationList.appendChild(li);
-                };
-
-                // Add ellipsis element
-                const addEllipsis = () => {
-                    const li = document.createElement('li');
-                    const span = document.createElement('span');
-                    span.className = 'pagination-ellipsis';
-                    span.innerHTML = '&hellip;';
-                    li.appendChild(span);
-                    paginationList.appendChild(li);
-                };
-
-                // Generate page numbers with ellipsis
-                if (total_pages <= 7) {
-                    for (let i = 1; i <= total_pages; i++) {
-                        addPageNumber(i);
-                    }
-                } else {
-                    addPageNumber(1);
-                    if (current_page > 3) addEllipsis();
-                    
-                    for (let i = Math.max(2, current_page - 1); 
-                         i <= Math.min(total_pages - 1, current_page + 1); i++) {
-                        addPageNumber(i);
-                    }
-                    
-                    if (current_page < total_pages - 2) addEllipsis();
-                    addPageNumber(total_pages);
-                }
+                const li = document.createElement('li');
+                const span = document.createElement('span');
+                span.className = 'pagination-link is-current';
+                span.textContent = `Page ${page} of ${Math.max(page, total_pages)}`;
+                li.appendChild(span);
+                paginationList.appendChild(li);
             } else {
                 paginationContainer.classList.add('is-hidden');
             }